@@ -5,6 +5,13 @@ import seaborn as sns
 from datetime import datetime
 from sklearn.linear_model import LinearRegression
 
+try:
+    from Scripts.procesador_pib_gasto import pib_gasto_a_largo, COMPONENTES_RELEVANTES
+    from Scripts.cache_analisis import CacheAnalisis
+except ImportError:
+    from procesador_pib_gasto import pib_gasto_a_largo, COMPONENTES_RELEVANTES
+    from cache_analisis import CacheAnalisis
+
 class AnalizadorCrecimientoPIB_Final:
     """
     Versión final específicamente adaptada a la estructura real de los datasets
@@ -16,6 +23,15 @@ class AnalizadorCrecimientoPIB_Final:
         self.datos_tasa_crecimiento = None
         self.datos_incidencia = None
 
+        # Resultados memorizados por huella de los datos cargados
+        self.cache = CacheAnalisis()
+
+    def _usar_cache(self, clave, calcular):
+        """Resultado memorizado para el contenido actual de los datos (también si se modifican en sitio)"""
+        datos = (self.datos_pib_gasto, self.datos_imae, self.datos_tasa_crecimiento, self.datos_incidencia)
+        self.cache.establecer_huella(CacheAnalisis.calcular_huella(*datos))
+        return self.cache.obtener(clave, calcular)
+
     def cargar_datos(self):
         """Carga todos los datasets"""
         try:
@@ -34,64 +50,22 @@ class AnalizadorCrecimientoPIB_Final:
         """
         Procesa el dataset complejo de PIB por componentes de gasto
         Estructura: Cada año tiene 4 columnas (trimestres: E-M, E-J, E-S, E-D)
+        Devuelve formato largo tipado (Componente y Trimestre_Texto categóricos)
         """
         if self.datos_pib_gasto is None:
             return None
 
-        datos = self.datos_pib_gasto.copy()
-
-        # Eliminar filas vacías
-        datos = datos.dropna(subset=['COMPONENTES'])
-        datos = datos[datos['COMPONENTES'].str.strip() != '']
-
-        # Mapeo de años y sus columnas correspondientes
-        años_config = {
-            '2018': [1, 2, 3, 4],    # Columnas 1-4: 2018 E-M, E-J, E-S, E-D
-            '2019': [5, 6, 7, 8],    # Columnas 5-8: 2019
-            '2020': [9, 10, 11, 12], # Columnas 9-12: 2020
-            '2021': [13, 14, 15, 16], # Columnas 13-16: 2021
-            '2022': [17, 18, 19, 20], # Columnas 17-20: 2022
-            '2023': [21, 22, 23, 24], # Columnas 21-24: 2023
-            '2024': [25, 26, 27, 28], # Columnas 25-28: 2024
-            '2025': [29, 30, 31, 32]  # Columnas 29-32: 2025
-        }
-
-        trimestres = ['E-M', 'E-J', 'E-S', 'E-D']
-        datos_largos = []
-
-        for _, fila in datos.iterrows():
-            componente = fila['COMPONENTES']
-
-            for año, indices in años_config.items():
-                for i, idx in enumerate(indices):
-                    if idx < len(fila):
-                        valor = fila.iloc[idx]
-                        if pd.notna(valor) and str(valor).strip() != '':
-                            try:
-                                datos_largos.append({
-                                    'Año': int(año),
-                                    'Trimestre': i + 1,
-                                    'Trimestre_Texto': trimestres[i],
-                                    'Componente': componente,
-                                    'Valor_Indice': float(valor)
-                                })
-                            except (ValueError, TypeError):
-                                continue
-
-        df_resultado = pd.DataFrame(datos_largos)
-
-        # Filtrar solo componentes relevantes
-        componentes_relevantes = [
-            'Consumo Final', 'Consumo Privado', 'Consumo Público',
-            'Formación Bruta de Capital Fijo', 'Exportaciones', 'Importaciones',
-            'Producto Interno Bruto'
-        ]
-        df_resultado = df_resultado[df_resultado['Componente'].isin(componentes_relevantes)]
-
-        return df_resultado.sort_values(['Año', 'Trimestre'])
+        # Años y trimestres se detectan del encabezado (sin años fijos)
+        return self._usar_cache('pib_largo',
+                                lambda: pib_gasto_a_largo(self.datos_pib_gasto, COMPONENTES_RELEVANTES))
 
     def calcular_crecimiento_anual_pib(self):
         """Calcula crecimiento anual del PIB desde datos de componentes"""
+        if self.datos_pib_gasto is None:
+            return None
+        return self._usar_cache('crecimiento_anual', self._calcular_crecimiento_anual_pib)
+
+    def _calcular_crecimiento_anual_pib(self):
         datos_pib = self.procesar_pib_gasto()
         if datos_pib is None:
             return None
@@ -111,6 +85,11 @@ class AnalizadorCrecimientoPIB_Final:
 
     def calcular_crecimiento_trimestral_pib(self):
         """Calcula crecimiento trimestral del PIB"""
+        if self.datos_pib_gasto is None:
+            return None
+        return self._usar_cache('crecimiento_trimestral', self._calcular_crecimiento_trimestral_pib)
+
+    def _calcular_crecimiento_trimestral_pib(self):
         datos_pib = self.procesar_pib_gasto()
         if datos_pib is None:
             return None
@@ -131,7 +110,9 @@ class AnalizadorCrecimientoPIB_Final:
         """Analiza crecimiento usando IMAE (datos mensuales confiables)"""
         if self.datos_imae is None:
             return None
+        return self._usar_cache('imae', self._analizar_imae_crecimiento)
 
+    def _analizar_imae_crecimiento(self):
         datos = self.datos_imae.copy()
 
         # Usar datos desestacionalizados (más confiables)
@@ -167,7 +148,9 @@ class AnalizadorCrecimientoPIB_Final:
         """Analiza tasas de crecimiento históricas"""
         if self.datos_tasa_crecimiento is None:
             return None
+        return self._usar_cache('tasas_historicas', self._analizar_tasas_historicas)
 
+    def _analizar_tasas_historicas(self):
         datos = self.datos_tasa_crecimiento.copy()
 
         # Usar PIB Referencia 2018 (serie más consistente)
@@ -193,6 +176,9 @@ class AnalizadorCrecimientoPIB_Final:
 
     def generar_tabla_resumen_completa(self):
         """Genera tabla resumen unificando todas las fuentes"""
+        return self._usar_cache('resumen', self._generar_tabla_resumen_completa)
+
+    def _generar_tabla_resumen_completa(self):
         resumen_data = []
 
         # 1. Desde PIB componentes de gasto (trimestral)
@@ -302,7 +288,7 @@ class AnalizadorCrecimientoPIB_Final:
             datos_filtrados = datos_pib[datos_pib['Componente'].isin(componentes_visualizar)]
 
             # Promedio anual por componente
-            datos_anuales = datos_filtrados.groupby(['Año', 'Componente'])['Valor_Indice'].mean().reset_index()
+            datos_anuales = datos_filtrados.groupby(['Año', 'Componente'], observed=True)['Valor_Indice'].mean().reset_index()
 
             for componente in componentes_visualizar:
                 datos_comp = datos_anuales[datos_anuales['Componente'] == componente]
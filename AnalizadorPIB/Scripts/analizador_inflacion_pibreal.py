@@ -5,12 +5,20 @@ import seaborn as sns
 from datetime import datetime
 from sklearn.linear_model import LinearRegression
 
+try:
+    from Scripts.procesador_pib_gasto import pib_gasto_a_largo
+    from Scripts.indice_precios import indice_precios, CadenaIndicePrecios
+except ImportError:
+    from procesador_pib_gasto import pib_gasto_a_largo
+    from indice_precios import indice_precios, CadenaIndicePrecios
+
 class AnalizadorInflacionPIBReal:
 
     def __init__(self):
         self.datos_inflacion = None
         self.datos_pib_nominal = None
         self.pib_real_calculado = None
+        self.cadena_precios = None
 
     def cargar_datos_inflacion_ejemplo(self):
 
@@ -34,60 +42,27 @@ class AnalizadorInflacionPIBReal:
             return None
 
         try:
-            # Procesar la estructura compleja del dataset
-            datos = datos_pib_gasto.copy()
-
-            # Encontrar la fila del PIB total
-            fila_pib = datos[datos['COMPONENTES'] == 'Producto Interno Bruto']
-            if len(fila_pib) == 0:
+            # Mismo parser vectorizado que el analizador de crecimiento
+            if not (datos_pib_gasto['COMPONENTES'] == 'Producto Interno Bruto').any():
                 print("No se encontro 'Producto Interno Bruto' en los datos")
                 return None
 
-            fila_pib = fila_pib.iloc[0]
-
-            # Mapeo de anos y sus columnas
-            anos_config = {
-                2018: [1, 2, 3, 4],    # Columnas 1-4: 2018
-                2019: [5, 6, 7, 8],    # Columnas 5-8: 2019
-                2020: [9, 10, 11, 12], # Columnas 9-12: 2020
-                2021: [13, 14, 15, 16], # Columnas 13-16: 2021
-                2022: [17, 18, 19, 20], # Columnas 17-20: 2022
-                2023: [21, 22, 23, 24], # Columnas 21-24: 2023
-                2024: [25, 26, 27, 28], # Columnas 25-28: 2024
-                2025: [29, 30, 31, 32]  # Columnas 29-32: 2025
-            }
-
-            pib_data = []
-            trimestres = ['E-M', 'E-J', 'E-S', 'E-D']
-
-            for ano, indices in anos_config.items():
-                for i, idx in enumerate(indices):
-                    if idx < len(fila_pib):
-                        valor = fila_pib.iloc[idx]
-                        if pd.notna(valor) and str(valor).strip() != '':
-                            try:
-                                # Convertir a numerico - estos son indices base 2018
-                                valor_indice = float(valor)
-
-                                # Convertir indice a valor nominal aproximado
-                                pib_nominal = valor_indice * 10000  # Factor de escala
-
-                                pib_data.append({
-                                    'Ano': ano,
-                                    'Trimestre': i + 1,
-                                    'Trimestre_Texto': trimestres[i],
-                                    'PIB_Nominal_Millones': pib_nominal,
-                                    'Indice_Base_2018': valor_indice
-                                })
-                            except (ValueError, TypeError) as e:
-                                print(f"Error procesando valor: {valor}, error: {e}")
-                                continue
-
-            if not pib_data:
+            pib = pib_gasto_a_largo(datos_pib_gasto, ['Producto Interno Bruto'])
+            # Solo la primera fila del PIB, como antes
+            pib = pib.drop_duplicates(['Año', 'Trimestre'])
+
+            if pib.empty:
                 print("No se pudieron extraer datos del PIB")
                 return None
 
-            df_resultado = pd.DataFrame(pib_data)
+            df_resultado = pd.DataFrame({
+                'Ano': pib['Año'].astype(int),
+                'Trimestre': pib['Trimestre'].astype(int),
+                'Trimestre_Texto': pib['Trimestre_Texto'],
+                # Convertir indice a valor nominal aproximado
+                'PIB_Nominal_Millones': pib['Valor_Indice'] * 10000,  # Factor de escala
+                'Indice_Base_2018': pib['Valor_Indice']
+            })
             print(f"Datos de PIB nominal extraidos: {len(df_resultado)} registros")
             return df_resultado.sort_values(['Ano', 'Trimestre'])
 
@@ -125,9 +100,6 @@ class AnalizadorInflacionPIBReal:
             # Ordenar por ano
             datos_combinados = datos_combinados.sort_values('Ano').reset_index(drop=True)
 
-            # Calcular indice de precios (ano base = 100)
-            datos_combinados['Indice_Precios'] = 100.0
-
             # Encontrar posicion del ano base
             base_mask = datos_combinados['Ano'] == ano_base
 
@@ -138,17 +110,12 @@ class AnalizadorInflacionPIBReal:
 
             base_idx = datos_combinados[base_mask].index[0]
 
-            # Calcular indice de precios hacia adelante (anos posteriores al base)
-            for i in range(base_idx + 1, len(datos_combinados)):
-                inflacion = datos_combinados.loc[i, 'Inflacion_Anual_%']
-                indice_anterior = datos_combinados.loc[i-1, 'Indice_Precios']
-                datos_combinados.loc[i, 'Indice_Precios'] = indice_anterior * (1 + inflacion/100)
-
-            # Calcular indice de precios hacia atras (anos anteriores al base)
-            for i in range(base_idx - 1, -1, -1):
-                inflacion_siguiente = datos_combinados.loc[i+1, 'Inflacion_Anual_%']
-                indice_siguiente = datos_combinados.loc[i+1, 'Indice_Precios']
-                datos_combinados.loc[i, 'Indice_Precios'] = indice_siguiente / (1 + inflacion_siguiente/100)
+            # Indice de precios (ano base = 100) encadenado con productos acumulados
+            inflacion = datos_combinados['Inflacion_Anual_%'].to_numpy()
+            datos_combinados['Indice_Precios'] = indice_precios(inflacion, base=base_idx)
+
+            # Cadena completa para consultar otros anos base sin recalcular
+            self.cadena_precios = CadenaIndicePrecios(inflacion, periodos=datos_combinados['Ano'].tolist())
 
             # Calcular PIB real (PIB nominal ajustado por inflacion)
             datos_combinados['PIB_Real_Millones'] = (
@@ -0,0 +1,61 @@
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from Scripts.indice_precios import indice_precios, CadenaIndicePrecios
+except ImportError:
+    from indice_precios import indice_precios, CadenaIndicePrecios
+
+# Compara la cadena de indices de precios vectorizada con los bucles .loc
+# originales de calcular_pib_real, en los datos de ejemplo y en 500 series
+# sinteticas de 600 periodos (p. ej. regiones con datos mensuales).
+
+
+def indice_con_bucles(inflacion, base_idx):
+    """Version original de calcular_pib_real (solo la parte del indice)"""
+    datos = pd.DataFrame({'Inflacion_Anual_%': inflacion})
+    datos['Indice_Precios'] = 100.0
+    for i in range(base_idx + 1, len(datos)):
+        inflacion_i = datos.loc[i, 'Inflacion_Anual_%']
+        indice_anterior = datos.loc[i-1, 'Indice_Precios']
+        datos.loc[i, 'Indice_Precios'] = indice_anterior * (1 + inflacion_i/100)
+    for i in range(base_idx - 1, -1, -1):
+        inflacion_siguiente = datos.loc[i+1, 'Inflacion_Anual_%']
+        indice_siguiente = datos.loc[i+1, 'Indice_Precios']
+        datos.loc[i, 'Indice_Precios'] = indice_siguiente / (1 + inflacion_siguiente/100)
+    return datos['Indice_Precios'].to_numpy()
+
+
+if __name__ == "__main__":
+    # 1. Datos de ejemplo (cargar_datos_inflacion_ejemplo): identicos para cualquier ano base
+    ejemplo = np.array([2.0, 2.2, 0.9, 3.3, 8.3, 7.8, 4.9, 1.8])
+    for base in range(len(ejemplo)):
+        assert np.array_equal(indice_con_bucles(ejemplo, base), indice_precios(ejemplo, base))
+    print("Datos de ejemplo: resultados identicos para todos los anos base")
+
+    # 2. Series sinteticas
+    rng = np.random.default_rng(0)
+    inflacion = rng.normal(3, 2, size=(500, 600))
+    base = 300
+
+    inicio = time.perf_counter()
+    anterior = np.vstack([indice_con_bucles(serie, base) for serie in inflacion[:5]])
+    t_bucles = (time.perf_counter() - inicio) / 5 * len(inflacion)
+
+    inicio = time.perf_counter()
+    nuevo = indice_precios(inflacion, base)
+    t_vector = time.perf_counter() - inicio
+    assert np.array_equal(anterior, nuevo[:5])
+
+    cadena = CadenaIndicePrecios(inflacion)
+    inicio = time.perf_counter()
+    for periodo in range(0, 600, 50):
+        cadena.indice(periodo)
+    t_rebase = (time.perf_counter() - inicio) / 12
+    assert np.allclose(cadena.indice(base), nuevo, rtol=1e-12)
+
+    print(f"Sintetico ({inflacion.shape[0]} series x {inflacion.shape[1]} periodos):")
+    print(f"  Bucles .loc (estimado): {t_bucles * 1000:10.1f} ms")
+    print(f"  Productos acumulados:   {t_vector * 1000:10.2f} ms  ({t_bucles / t_vector:.0f}x mas rapido)")
+    print(f"  Cambio de ano base:     {t_rebase * 1000:10.2f} ms por base")
@@ -0,0 +1,94 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    from Scripts.procesador_pib_gasto import pib_gasto_a_largo, TRIMESTRES
+except ImportError:
+    from procesador_pib_gasto import pib_gasto_a_largo, TRIMESTRES
+
+# Compara el parser vectorizado (melt) con los bucles originales (iterrows)
+# en el dataset real y en una tabla sintética de 50 años x 200 componentes.
+
+RUTA_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Datasets', 'pib_gasto_2018.csv')
+
+
+def procesar_con_bucles(datos, años_config):
+    """Versión original de procesar_pib_gasto (sin el filtro de componentes)"""
+    datos = datos.dropna(subset=['COMPONENTES'])
+    datos = datos[datos['COMPONENTES'].str.strip() != '']
+
+    datos_largos = []
+    for _, fila in datos.iterrows():
+        componente = fila['COMPONENTES']
+        for año, indices in años_config.items():
+            for i, idx in enumerate(indices):
+                if idx < len(fila):
+                    valor = fila.iloc[idx]
+                    if pd.notna(valor) and str(valor).strip() != '':
+                        try:
+                            datos_largos.append({
+                                'Año': int(año),
+                                'Trimestre': i + 1,
+                                'Trimestre_Texto': TRIMESTRES[i],
+                                'Componente': componente,
+                                'Valor_Indice': float(valor)
+                            })
+                        except (ValueError, TypeError):
+                            continue
+    return pd.DataFrame(datos_largos).sort_values(['Año', 'Trimestre'], kind='stable')
+
+
+def config_años(primer_año, n_años):
+    """años_config equivalente al original: columnas 1-4 para el primer año, 5-8 el siguiente..."""
+    return {str(primer_año + k): [1 + 4 * k + i for i in range(4)] for k in range(n_años)}
+
+
+def tabla_sintetica(n_años=50, n_componentes=200, primer_año=1975, seed=0):
+    """Misma forma que pib_gasto_2018.csv: año en la primera columna de cada bloque, 'Unnamed' en el resto."""
+    rng = np.random.default_rng(seed)
+    columnas = ['COMPONENTES']
+    for k in range(n_años):
+        columnas += [str(primer_año + k)] + [f'Unnamed: {1 + 4 * k + i}' for i in range(1, 4)]
+    valores = 100 + rng.normal(0, 5, size=(n_componentes, n_años * 4)).cumsum(axis=1)
+    datos = pd.DataFrame(valores, columns=columnas[1:])
+    datos.insert(0, 'COMPONENTES', [f'Componente {i}' for i in range(n_componentes)])
+    # Fila de trimestres y fila vacía como en el archivo real
+    encabezado = pd.DataFrame([[np.nan] + TRIMESTRES * n_años, [np.nan] * (n_años * 4 + 1)], columns=columnas)
+    return pd.concat([encabezado, datos], ignore_index=True)
+
+
+def normalizar(df):
+    df = df.astype({'Año': int, 'Trimestre': int, 'Trimestre_Texto': str, 'Componente': str})
+    return df.sort_values(['Año', 'Trimestre', 'Componente']).reset_index(drop=True)
+
+
+def medir(funcion, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    # 1. Dataset real: mismos resultados
+    real = pd.read_csv(RUTA_DATASET, encoding='utf-8')
+    anterior = procesar_con_bucles(real, config_años(2018, 8))
+    nuevo = pib_gasto_a_largo(real)
+    pd.testing.assert_frame_equal(normalizar(anterior), normalizar(nuevo), check_dtype=False)
+    print(f"Dataset real: {len(nuevo)} registros, resultados idénticos")
+
+    # 2. Tabla sintética 50 años x 200 componentes
+    sintetica = tabla_sintetica()
+    anterior, t_bucles = medir(lambda: procesar_con_bucles(sintetica, config_años(1975, 50)), repeticiones=1)
+    nuevo, t_melt = medir(lambda: pib_gasto_a_largo(sintetica))
+    pd.testing.assert_frame_equal(normalizar(anterior), normalizar(nuevo), check_dtype=False)
+
+    print(f"Sintético ({len(nuevo)} registros):")
+    print(f"  Bucles iterrows: {t_bucles * 1000:9.1f} ms")
+    print(f"  melt vectorizado: {t_melt * 1000:8.1f} ms  ({t_bucles / t_melt:.0f}x más rápido)")
+    print(f"  Memoria: {anterior.memory_usage(deep=True).sum() / 1e6:.1f} MB -> "
+          f"{nuevo.memory_usage(deep=True).sum() / 1e6:.1f} MB (tipos categóricos)")
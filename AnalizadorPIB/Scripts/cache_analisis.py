@@ -0,0 +1,125 @@
+import os
+import hashlib
+import pandas as pd
+
+# Versión del formato/cálculo de los resultados guardados. Subirla al cambiar
+# la lectura de los CSV o cualquier análisis derivado (analizador_crecimiento_pib,
+# procesador_pib_gasto): los resultados en disco de la versión anterior dejan de usarse.
+VERSION_CACHE = 1
+
+
+class CacheAnalisis:
+    """
+    Memoización de resultados de análisis por huella de contenido.
+    - La huella es un SHA-256 de VERSION_CACHE y del contenido de los
+      DataFrames cargados (no de la ruta): mismos datos y mismo código ->
+      mismos resultados reutilizados
+    - Cada resultado se guarda en memoria y también en disco para que al
+      reabrir la aplicación no se recalcule: los DataFrames en Parquet y los
+      diccionarios (DataFrames + estadísticas) con pickle
+    - Al cambiar los datos, los resultados viejos se descartan solos
+    """
+
+    def __init__(self, directorio='.cache/analizador_pib'):
+        self.directorio = directorio
+        self.memoria = {}
+        self.huella = None
+        self.disco_activo = True
+
+        # Estadísticas
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.calculos = 0
+
+    @staticmethod
+    def calcular_huella(*dataframes):
+        """SHA-256 de VERSION_CACHE y del contenido (valores, índice y columnas) de los DataFrames"""
+        h = hashlib.sha256()
+        h.update(f"version={VERSION_CACHE}".encode('utf-8'))
+        for df in dataframes:
+            if df is None:
+                h.update(b'None')
+                continue
+            h.update(repr(list(df.columns)).encode('utf-8'))
+            h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return h.hexdigest()
+
+    def establecer_huella(self, huella):
+        """Activa la huella de los datos actuales; si cambió, limpia lo anterior"""
+        if huella != self.huella:
+            self.memoria.clear()
+            self.huella = huella
+            self._limpiar_disco(conservar=huella)
+
+    def _ruta(self, clave, extension='parquet'):
+        return os.path.join(self.directorio, f"{self.huella[:16]}_{clave}.{extension}")
+
+    def obtener(self, clave, calcular):
+        """Devuelve el resultado de `clave` para los datos actuales, calculándolo solo si hace falta"""
+        if self.huella is None:
+            return calcular()
+
+        if clave in self.memoria:
+            self.aciertos_memoria += 1
+            return self._copia(self.memoria[clave])
+
+        for ruta, leer in ((self._ruta(clave), pd.read_parquet), (self._ruta(clave, 'pkl'), pd.read_pickle)):
+            if not (self.disco_activo and os.path.exists(ruta)):
+                continue
+            try:
+                resultado = leer(ruta)
+                self.memoria[clave] = resultado
+                self.aciertos_disco += 1
+                return self._copia(resultado)
+            except Exception as e:
+                print(f"Cache: no se pudo leer {ruta}: {e}")
+
+        resultado = calcular()
+        self.calculos += 1
+        if resultado is None:
+            return None
+
+        self.memoria[clave] = resultado
+        if self.disco_activo and isinstance(resultado, (pd.DataFrame, dict)):
+            try:
+                os.makedirs(self.directorio, exist_ok=True)
+                if isinstance(resultado, pd.DataFrame):
+                    resultado.to_parquet(self._ruta(clave))
+                else:
+                    # Parquet solo guarda tablas; los diccionarios mezclan tablas y escalares
+                    pd.to_pickle(resultado, self._ruta(clave, 'pkl'))
+            except ImportError as e:
+                # Sin pyarrow/fastparquet: solo caché en memoria
+                print(f"Cache en disco desactivada: {e}")
+                self.disco_activo = False
+            except Exception as e:
+                print(f"Cache: no se pudo guardar {clave}: {e}")
+        return self._copia(resultado)
+
+    @staticmethod
+    def _copia(resultado):
+        # Quien llama puede modificar su DataFrame sin tocar el de la caché
+        if isinstance(resultado, pd.DataFrame):
+            return resultado.copy()
+        if isinstance(resultado, dict):
+            return {k: v.copy() if isinstance(v, pd.DataFrame) else v for k, v in resultado.items()}
+        return resultado
+
+    def _limpiar_disco(self, conservar):
+        if not os.path.isdir(self.directorio):
+            return
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(('.parquet', '.pkl')) and not nombre.startswith(conservar[:16]):
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError:
+                    pass
+
+    def estadisticas(self):
+        return {
+            'huella': self.huella[:16] if self.huella else None,
+            'en_memoria': len(self.memoria),
+            'aciertos_memoria': self.aciertos_memoria,
+            'aciertos_disco': self.aciertos_disco,
+            'calculos': self.calculos
+        }
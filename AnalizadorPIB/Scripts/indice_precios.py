@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def factores_inflacion(inflacion):
+    """1 + inflacion/100 como arreglo 2-D (series x periodos)"""
+    inflacion = np.asarray(inflacion, dtype='float64')
+    return 1 + np.atleast_2d(inflacion) / 100
+
+
+def indice_precios(inflacion, base=0):
+    """
+    Indice de precios encadenado (periodo `base` = 100) a partir de la
+    inflacion de cada periodo. Acepta una serie (1-D) o varias a la vez
+    (2-D: series x periodos, p. ej. regiones o componentes).
+    - Hacia adelante: I[i] = I[i-1] * (1 + inf[i]/100)  -> producto acumulado
+    - Hacia atras:    I[i] = I[i+1] / (1 + inf[i+1]/100) -> division acumulada
+    Mismas operaciones y en el mismo orden que el calculo fila por fila,
+    por lo que el resultado es identico.
+    """
+    unidimensional = np.ndim(inflacion) == 1
+    factores = factores_inflacion(inflacion)
+    n_series, n_periodos = factores.shape
+    if not 0 <= base < n_periodos:
+        raise IndexError(f"Periodo base fuera de rango: {base}")
+
+    inicio = np.full((n_series, 1), 100.0)
+    adelante = np.multiply.accumulate(np.hstack([inicio, factores[:, base + 1:]]), axis=1)
+    # Divisores en orden inverso: inf[base], inf[base-1], ..., inf[1]
+    atras = np.divide.accumulate(np.hstack([inicio, factores[:, base:0:-1]]), axis=1)
+
+    indice = np.hstack([atras[:, :0:-1], adelante])
+    return indice[0] if unidimensional else indice
+
+
+class CadenaIndicePrecios:
+    """
+    Cadena de indices de precios calculada una sola vez (base = primer periodo).
+    Cambiar el periodo base es solo reescalar: indice(base) divide la cadena
+    entre su valor en ese periodo, sin volver a encadenar la inflacion.
+    """
+
+    def __init__(self, inflacion, periodos=None):
+        self.unidimensional = np.ndim(inflacion) == 1
+        self.cadena = np.atleast_2d(indice_precios(inflacion, base=0))
+        n_periodos = self.cadena.shape[1]
+        self.periodos = list(periodos) if periodos is not None else list(range(n_periodos))
+        if len(self.periodos) != n_periodos:
+            raise ValueError("La cantidad de periodos no coincide con la inflacion")
+
+    def posicion(self, periodo):
+        try:
+            return self.periodos.index(periodo)
+        except ValueError:
+            raise KeyError(f"Periodo no encontrado: {periodo}") from None
+
+    def indice(self, periodo_base=None):
+        """Indice con `periodo_base` = 100 (None = primer periodo)"""
+        base = 0 if periodo_base is None else self.posicion(periodo_base)
+        if base == 0:
+            indice = self.cadena.copy()
+        else:
+            indice = self.cadena * (100.0 / self.cadena[:, base:base + 1])
+        return indice[0] if self.unidimensional else indice
+
+    def deflactar(self, valores_nominales, periodo_base=None):
+        """Valores reales = nominales * 100 / indice (mismas dimensiones que la cadena)"""
+        return np.asarray(valores_nominales, dtype='float64') * 100 / self.indice(periodo_base)
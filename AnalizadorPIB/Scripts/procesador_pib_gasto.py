@@ -0,0 +1,57 @@
+import pandas as pd
+
+TRIMESTRES = ['E-M', 'E-J', 'E-S', 'E-D']
+
+COMPONENTES_RELEVANTES = [
+    'Consumo Final', 'Consumo Privado', 'Consumo Público',
+    'Formación Bruta de Capital Fijo', 'Exportaciones', 'Importaciones',
+    'Producto Interno Bruto'
+]
+
+
+def mapear_columnas_periodo(columnas):
+    """
+    Deriva Año y Trimestre de cada columna a partir del encabezado:
+    '2018', 'Unnamed: 2', ..., '2021 (p)', ... -> el año aparece solo en la
+    primera columna de cada bloque y las siguientes son sus trimestres.
+    Detecta cualquier cantidad de años.
+    """
+    columnas = pd.Index(columnas)
+    años = columnas.to_series(index=range(len(columnas))).str.extract(r'(\d{4})', expand=False).ffill()
+    mapa = pd.DataFrame({'columna': columnas, 'Año': años})
+    mapa = mapa.dropna(subset=['Año'])
+    mapa['Año'] = mapa['Año'].astype('int16')
+    mapa['Trimestre'] = (mapa.groupby('Año').cumcount() + 1).astype('int8')
+    return mapa[mapa['Trimestre'] <= len(TRIMESTRES)]
+
+
+def pib_gasto_a_largo(datos_pib_gasto, componentes=None):
+    """
+    Convierte pib_gasto_2018.csv (ancho: un bloque de 4 trimestres por año)
+    en formato largo: Año, Trimestre, Trimestre_Texto, Componente, Valor_Indice.
+    Todo vectorizado con melt; `componentes` filtra los componentes (None = todos).
+    """
+    if datos_pib_gasto is None:
+        return None
+
+    datos = datos_pib_gasto.dropna(subset=['COMPONENTES'])
+    datos = datos[datos['COMPONENTES'].str.strip() != '']
+    if componentes is not None:
+        datos = datos[datos['COMPONENTES'].isin(componentes)]
+
+    mapa = mapear_columnas_periodo(datos.columns[1:])
+
+    largo = datos.melt(id_vars='COMPONENTES', value_vars=list(mapa['columna']),
+                       var_name='columna', value_name='Valor_Indice')
+    largo['Valor_Indice'] = pd.to_numeric(largo['Valor_Indice'], errors='coerce')
+    largo = largo.dropna(subset=['Valor_Indice']).merge(mapa, on='columna', how='left')
+
+    resultado = pd.DataFrame({
+        'Año': largo['Año'],
+        'Trimestre': largo['Trimestre'],
+        'Trimestre_Texto': pd.Categorical.from_codes(largo['Trimestre'] - 1, categories=TRIMESTRES, ordered=True),
+        'Componente': largo['COMPONENTES'].astype('category'),
+        'Valor_Indice': largo['Valor_Indice'].astype('float64')
+    })
+    # Orden estable: dentro de cada trimestre se conserva el orden del archivo
+    return resultado.sort_values(['Año', 'Trimestre'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,98 @@
+# benchmark_nlp.py
+# Compara el puntuador de palabras clave de una sola pasada (core.nlp) con los
+# bucles originales (una regex / un texto.count por palabra) sobre el corpus de
+# observaciones. Ejecutar desde la raiz del proyecto: python benchmark_nlp.py
+
+import re
+import time
+import pandas as pd
+
+from core.nlp import (
+    extraer_features,
+    quitar_acentos,
+    limpiar_texto,
+    PUNTUADOR_AREAS
+)
+from core.config import (
+    PALABRAS_POS,
+    PALABRAS_NEG,
+    PALABRAS_CIENCIA,
+    PALABRAS_NUMERO,
+    PALABRAS_SOCIAL,
+    RIESGO_EXPR,
+    MODIFICADORES
+)
+
+
+def score_keywords_original(texto, palabras, modificadores=None):
+    texto = quitar_acentos(texto.lower())
+    palabras = [quitar_acentos(p.lower()) for p in palabras]
+
+    total = 0
+    for p in palabras:
+        for m in re.finditer(r'\b' + re.escape(p) + r'\b', texto):
+            total += 1
+            if modificadores:
+                start = max(0, m.start()-15)
+                contexto = texto[start:m.start()]
+                if any(mod in contexto for mod in modificadores):
+                    total += 0.5
+    return total
+
+
+def extraer_features_original(texto):
+    texto = texto.lower()
+    feats = {}
+    for p in PALABRAS_POS:
+        feats[f"pos_{p}"] = texto.count(p)
+    for n in PALABRAS_NEG:
+        feats[f"neg_{n}"] = texto.count(n)
+    feats["longitud"] = len(texto)
+    feats["num_palabras"] = len(texto.split())
+    feats["ratio_neg"] = sum(feats[f"neg_{n}"] for n in PALABRAS_NEG) / (feats["num_palabras"] + 1)
+    return feats
+
+
+def areas_original(texto):
+    return (
+        score_keywords_original(texto, PALABRAS_CIENCIA, MODIFICADORES),
+        score_keywords_original(texto, PALABRAS_NUMERO, MODIFICADORES),
+        score_keywords_original(texto, PALABRAS_SOCIAL, MODIFICADORES),
+        score_keywords_original(texto, RIESGO_EXPR)
+    )
+
+
+def areas_una_pasada(texto):
+    p = PUNTUADOR_AREAS.puntuar(texto)
+    return p["ciencia"], p["numero"], p["social"], p["riesgo"]
+
+
+def medir(funcion, textos, repeticiones=3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = [funcion(t) for t in textos]
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+
+if __name__ == "__main__":
+    obs = pd.read_csv("datasets/observaciones.csv")["observacion"].astype(str)
+    entrenamiento = pd.read_csv("datasets/nlp_observaciones_entrenamiento.csv")["texto"].astype(str)
+
+    # Textos por observacion y por estudiante (como en build_master_dataset)
+    textos = obs.tolist() + entrenamiento.tolist()
+    textos += pd.read_csv("datasets/observaciones.csv").groupby("id_estudiante")["observacion"].apply(" ".join).tolist()
+    textos_area = [quitar_acentos(limpiar_texto(t)) for t in textos]
+
+    antes, t_antes = medir(extraer_features_original, textos)
+    despues, t_despues = medir(extraer_features, textos)
+    assert antes == despues
+    print(f"extraer_features ({len(textos)} textos): "
+          f"{t_antes * 1000:.1f} ms -> {t_despues * 1000:.1f} ms ({t_antes / t_despues:.1f}x)")
+
+    antes, t_antes = medir(areas_original, textos_area)
+    despues, t_despues = medir(areas_una_pasada, textos_area)
+    assert antes == despues
+    print(f"Lexicos de areas + riesgo: "
+          f"{t_antes * 1000:.1f} ms -> {t_despues * 1000:.1f} ms ({t_antes / t_despues:.1f}x)")
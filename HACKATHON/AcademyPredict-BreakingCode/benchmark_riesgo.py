@@ -0,0 +1,59 @@
+# benchmark_riesgo.py
+# Compara el calculo de Rd fila por fila (df.apply + calcular_riesgo) con el
+# motor vectorizado de core/models_riesgo.py en 50k estudiantes sinteticos,
+# y mide un barrido de sensibilidad con todas las combinaciones de pesos.
+# Ejecutar desde la raiz del proyecto: python benchmark_riesgo.py
+
+import time
+import numpy as np
+import pandas as pd
+
+from core.models_riesgo import (
+    calcular_riesgo,
+    calcular_riesgos_df,
+    generar_pesos,
+    sensibilidad_pesos
+)
+
+
+def estudiantes_sinteticos(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "asistencia": rng.uniform(50, 100, n),
+        "nota_promedio": rng.uniform(40, 100, n),
+        "F": rng.uniform(0, 1, n),
+        "CS": rng.uniform(0, 1, n),
+        "observaciones": ""
+    })
+    df.loc[rng.choice(n, n // 100, replace=False), "nota_promedio"] = np.nan  # sin notas
+    return df
+
+
+if __name__ == "__main__":
+    df = estudiantes_sinteticos()
+
+    inicio = time.perf_counter()
+    por_fila = df.apply(
+        lambda r: pd.Series(calcular_riesgo(r, None, F=r["F"])),
+        axis=1
+    )
+    t_apply = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    Rd, F = calcular_riesgos_df(df, None, F=df["F"])
+    t_vector = time.perf_counter() - inicio
+
+    assert np.allclose(por_fila[0].to_numpy(), Rd, atol=1e-3, equal_nan=True)
+    assert np.allclose(por_fila[1].to_numpy(), F, atol=1e-3)
+    print(f"Rd de {len(df)} estudiantes:")
+    print(f"  df.apply por fila: {t_apply * 1000:9.1f} ms")
+    print(f"  vectorizado:       {t_vector * 1000:9.2f} ms  ({t_apply / t_vector:.0f}x mas rapido)")
+
+    pesos = generar_pesos(0.05)
+    inicio = time.perf_counter()
+    por_pesos, frecuencia = sensibilidad_pesos(
+        df["asistencia"], df["nota_promedio"], df["F"], df["CS"], pesos
+    )
+    t_barrido = time.perf_counter() - inicio
+    print(f"Barrido de {len(pesos)} combinaciones de pesos x {len(df)} estudiantes: {t_barrido:.2f} s")
+    print(por_pesos.sort_values("alto_riesgo", ascending=False).head())
@@ -1,23 +1,19 @@
 # core/build_dataset.py
 
 import os
+import hashlib
 import pandas as pd
 import numpy as np
 
 from core.data_loader import load_base_data
 from core.nlp import (
-    puntaje_ambiente,
+    puntajes_ambiente,
     limpiar_texto,
     quitar_acentos,
-    score_keywords
+    PUNTUADOR_AREAS,
+    MODEL_PATH
 )
-from core.config import (
-    PALABRAS_CIENCIA,
-    PALABRAS_NUMERO,
-    PALABRAS_SOCIAL,
-    MODIFICADORES
-)
-from core.models_riesgo import calcular_riesgo
+from core.models_riesgo import calcular_riesgos_df
 
 # Paths
 
@@ -38,19 +34,87 @@ def calc_scores(obs_list):
     texto = limpiar_texto(" ".join(obs_list))
     texto = quitar_acentos(texto)
 
-    sc = score_keywords(texto, PALABRAS_CIENCIA, MODIFICADORES)
-    sn = score_keywords(texto, PALABRAS_NUMERO, MODIFICADORES)
-    ss = score_keywords(texto, PALABRAS_SOCIAL, MODIFICADORES)
+    # Los tres lexicos en una sola pasada sobre el texto
+    p = PUNTUADOR_AREAS.puntuar(texto)
+    sc, sn, ss = p["ciencia"], p["numero"], p["social"]
 
     return max(0, sc), max(0, sn), max(0, ss)
 
+def std_por_grupo(valores, codigos, n_grupos):
+    """Desviacion estandar poblacional (como np.std) de `valores` agrupados por `codigos`"""
+    conteo = np.bincount(codigos, minlength=n_grupos)
+    con_datos = np.maximum(conteo, 1)
+    media = np.bincount(codigos, weights=valores, minlength=n_grupos) / con_datos
+    desvio = valores - media[codigos]
+    var = np.bincount(codigos, weights=desvio * desvio, minlength=n_grupos) / con_datos
+    # Con una sola observacion no hay variabilidad
+    return np.where(conteo > 1, np.sqrt(var), 0.0)
+
+# Huellas por estudiante (modo incremental)
+
+def _huella_tabla(df, ids, columnas=None):
+    """
+    uint64 por estudiante a partir de sus filas en `df`: cambia si cambia
+    cualquier valor o el orden de sus filas (p. ej. el de sus observaciones).
+    """
+    huellas = np.zeros(len(ids), dtype="uint64")
+    if df.empty:
+        return huellas
+    if columnas is not None:
+        df = df[["id_estudiante"] + columnas]
+
+    codigos = pd.Categorical(df["id_estudiante"], categories=ids).codes
+    df = df[codigos >= 0]
+    codigos = codigos[codigos >= 0]
+
+    filas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    posicion = df.groupby("id_estudiante").cumcount().to_numpy()
+    saladas = pd.util.hash_pandas_object(
+        pd.DataFrame({"fila": filas, "posicion": posicion}), index=False
+    ).to_numpy()
+
+    np.add.at(huellas, codigos, saladas)  # suma modulo 2**64
+    return huellas
+
+def _huella_modelo(modelo_nlp, path=MODEL_PATH):
+    """
+    Huella del modelo NLP a partir de su archivo en disco (cargar_modelo_nlp
+    siempre lo guarda ahi). No se usa pickle.dumps del objeto: cambia despues
+    de la primera prediccion y haria recalcular a todos en cada corrida.
+    """
+    if modelo_nlp is None:
+        return 0
+    if not os.path.exists(path):
+        return 1  # modelo sin archivo: solo se distingue de "sin modelo"
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return int.from_bytes(h.digest()[:8], "little")
+
+def huellas_estudiantes(est, rend, obs, cs, modelo_nlp=None):
+    """
+    Huella de las entradas de cada estudiante (estudiantes, rendimiento del
+    periodo, observaciones y contexto_formulario) y del modelo NLP: si el
+    modelo cambia, cambian todas y se recalcula a todos.
+    """
+    ids = est["id_estudiante"].drop_duplicates()
+    partes = pd.DataFrame({
+        "est": _huella_tabla(est, ids),
+        "rend": _huella_tabla(rend, ids, ["P1", "P2", "P3", "P4", "CF", "asistencia"]),
+        "obs": _huella_tabla(obs, ids, ["observacion"]),
+        "cs": _huella_tabla(cs, ids),
+        "modelo": np.full(len(ids), _huella_modelo(modelo_nlp), dtype="uint64")
+    })
+    return pd.Series(
+        pd.util.hash_pandas_object(partes, index=False).to_numpy(),
+        index=ids.to_numpy()
+    )
+
 # Builder principal
 
-def build_master_dataset(
-    anio_academico="2025-2026",
-    semestre=1,
-    modelo_nlp=None
-):
+def _cargar_entradas(anio_academico, semestre):
     data = load_base_data()
 
     est = data["est"]
@@ -70,6 +134,12 @@ def build_master_dataset(
         (rend["semestre"] == semestre)
     ]
 
+    return est, rend, obs, cs
+
+def _construir_master(est, rend, obs, cs, modelo_nlp, guardar_procesados=True):
+    rend = rend.copy()
+    cs = cs.copy()
+
     periodos = ["P1", "P2", "P3", "P4"]
     rend["nota"] = rend["CF"].fillna(rend[periodos].mean(axis=1))
 
@@ -84,7 +154,8 @@ def build_master_dataset(
     )
 
     rend_agg["var_nota"] = rend_agg["var_nota"].fillna(0)
-    rend_agg.to_csv(f"{PROC_PATH}/rendimiento_agg.csv", index=False)
+    if guardar_procesados:
+        rend_agg.to_csv(f"{PROC_PATH}/rendimiento_agg.csv", index=False)
 
     # OBSERVACIONES 
     obs_agg = (
@@ -93,21 +164,29 @@ def build_master_dataset(
         .reset_index()
     )
 
-    obs_agg["F"] = obs_agg["observacion"].apply(
-        lambda x: puntaje_ambiente(" ".join(x), modelo_nlp)
-        if isinstance(x, list) else 0.5
+    # Puntaje de ambiente por lotes: el texto completo de cada estudiante (F)
+    # y cada observacion individual (var_F) se puntuan en un solo predict_proba
+    obs_validas = obs.dropna(subset=["id_estudiante"])
+    codigos = pd.Categorical(
+        obs_validas["id_estudiante"], categories=obs_agg["id_estudiante"]
+    ).codes
+
+    n_est = len(obs_agg)
+    puntajes = puntajes_ambiente(
+        [" ".join(x) for x in obs_agg["observacion"]] +
+        obs_validas["observacion"].tolist(),
+        modelo_nlp
     )
 
-    obs_agg["var_F"] = obs_agg["observacion"].apply( # variablidad del contexto, ambiente segun las observaciones
-        lambda x: np.std([
-            puntaje_ambiente(o, modelo_nlp) for o in x
-        ]) if isinstance(x, list) and len(x) > 1 else 0
-    )
+    obs_agg["F"] = puntajes[:n_est]
+    # variablidad del contexto, ambiente segun las observaciones
+    obs_agg["var_F"] = std_por_grupo(puntajes[n_est:], codigos, n_est)
 
     obs_agg["num_obs"] = obs_agg["observacion"].apply(len)
-    obs_agg[["score_ciencia", "score_num", "score_social"]] = (
-        obs_agg["observacion"]
-        .apply(lambda x: pd.Series(calc_scores(x)))
+    obs_agg[["score_ciencia", "score_num", "score_social"]] = pd.DataFrame(
+        [calc_scores(x) for x in obs_agg["observacion"]],
+        columns=["score_ciencia", "score_num", "score_social"],
+        index=obs_agg.index
     )
 
     obs_agg["observaciones"] = obs_agg["observacion"].apply(
@@ -115,13 +194,15 @@ def build_master_dataset(
     )
 
     obs_agg.drop(columns=["observacion"], inplace=True)
-    obs_agg.to_csv(f"{PROC_PATH}/observaciones_agg.csv", index=False)
+    if guardar_procesados:
+        obs_agg.to_csv(f"{PROC_PATH}/observaciones_agg.csv", index=False)
 
     # CONTEXTO SOCIAL 
     if "CS_fuente" not in cs.columns:
         cs["CS_fuente"] = "formulario"
 
-    cs.to_csv(f"{PROC_PATH}/contexto_formulario.csv", index=False)
+    if guardar_procesados:
+        cs.to_csv(f"{PROC_PATH}/contexto_formulario.csv", index=False)
 
     cs["CS"] = pd.to_numeric(cs["CS"], errors="coerce")
     cs["CS"] = cs["CS"].clip(0, 1)
@@ -135,16 +216,99 @@ def build_master_dataset(
     )
 
     df["CS"] = df["CS"].fillna(0.5)
+    df["F"] = df["F"].fillna(0.5) # sin observaciones
 
-    # RIESGO 
-    df[["Rd", "F"]] = df.apply(
-        lambda r: pd.Series(calcular_riesgo(r, modelo_nlp)),
-        axis=1
-    )
+    # RIESGO (columnas completas, reutiliza F ya puntuado sin volver al modelo NLP)
+    df["Rd"], df["F"] = calcular_riesgos_df(df, modelo_nlp, F=df["F"])
+
+    return df
+
+def _rutas_master(anio_academico, semestre):
+    base = f"{MASTER_PATH}/df_master_{anio_academico}_{semestre}"
+    return f"{base}.csv", f"{base}.parquet"
+
+def build_master_dataset(
+    anio_academico="2025-2026",
+    semestre=1,
+    modelo_nlp=None,
+    incremental=False
+):
+    if incremental:
+        return build_master_incremental(anio_academico, semestre, modelo_nlp)["path"]
+
+    est, rend, obs, cs = _cargar_entradas(anio_academico, semestre)
+    df = _construir_master(est, rend, obs, cs, modelo_nlp)
 
     # SAVE MASTER 
-    fname = f"df_master_{anio_academico}_{semestre}.csv"
-    path = f"{MASTER_PATH}/{fname}"
+    path, store = _rutas_master(anio_academico, semestre)
     df.to_csv(path, index=False)
 
+    # Deja el almacen columnar listo para las siguientes corridas incrementales
+    try:
+        df.assign(huella=huellas_estudiantes(est, rend, obs, cs, modelo_nlp)[df["id_estudiante"]].to_numpy()) \
+          .to_parquet(store, index=False)
+    except ImportError:
+        pass  # sin pyarrow: solo CSV
+
     return path
+
+def build_master_incremental(
+    anio_academico="2025-2026",
+    semestre=1,
+    modelo_nlp=None
+):
+    """
+    Recalcula solo los estudiantes cuyas entradas cambiaron (huella distinta
+    a la guardada), los inserta/actualiza en el almacen Parquet del periodo y
+    reexporta el CSV maestro. Devuelve un reporte de lo reconstruido.
+    Los CSV intermedios de datasets/processed solo se escriben en la corrida completa.
+    """
+    est, rend, obs, cs = _cargar_entradas(anio_academico, semestre)
+    huellas = huellas_estudiantes(est, rend, obs, cs, modelo_nlp)
+    path, store = _rutas_master(anio_academico, semestre)
+
+    if os.path.exists(store):
+        anterior = pd.read_parquet(store)
+        previas = anterior.set_index("id_estudiante")["huella"]
+        anterior = anterior.drop(columns=["huella"])
+    else:
+        anterior = None
+        previas = pd.Series(dtype="uint64")
+
+    ids = huellas.index
+    existentes = ids.isin(previas.index)
+    nuevos = ids[~existentes]
+    comunes = ids[existentes]
+    modificados = comunes[huellas[comunes].to_numpy() != previas[comunes].to_numpy()]
+    eliminados = previas.index[~previas.index.isin(ids)]
+    sucios = nuevos.append(modificados)
+
+    partes = []
+    if anterior is not None:
+        partes.append(anterior[anterior["id_estudiante"].isin(ids) & ~anterior["id_estudiante"].isin(sucios)])
+    if len(sucios):
+        de_sucios = lambda d: d[d["id_estudiante"].isin(sucios)]
+        partes.append(_construir_master(
+            de_sucios(est), de_sucios(rend), de_sucios(obs), de_sucios(cs),
+            modelo_nlp, guardar_procesados=False
+        ))
+
+    if len(sucios) or len(eliminados) or not os.path.exists(path):
+        df = pd.concat(partes, ignore_index=True)
+        # Mismo orden que estudiantes.csv
+        orden = np.argsort(ids.get_indexer(df["id_estudiante"]), kind="stable")
+        df = df.iloc[orden].reset_index(drop=True)
+
+        df.assign(huella=huellas[df["id_estudiante"]].to_numpy()).to_parquet(store, index=False)
+        df.to_csv(path, index=False)
+
+    return {
+        "path": path,
+        "store": store,
+        "total": len(ids),
+        "recalculados": len(sucios),
+        "nuevos": nuevos.tolist(),
+        "modificados": modificados.tolist(),
+        "eliminados": eliminados.tolist(),
+        "sin_cambios": len(comunes) - len(modificados)
+    }
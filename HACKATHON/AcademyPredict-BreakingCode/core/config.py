@@ -92,3 +92,11 @@ PALABRAS_SOCIAL = [
     "lider","equipo","comunicacion","debate",
     "argumenta","expresa","oratoria"
 ]
+
+# Pesos de la formula de riesgo de desercion (Rd)
+PESOS_RIESGO = {
+    "asistencia": 0.25,
+    "nota": 0.25,
+    "ambiente": 0.25,
+    "contexto": 0.25
+}
@@ -1,14 +1,7 @@
 from core.nlp import (
     limpiar_texto,
     quitar_acentos,
-    score_keywords
-)
-from core.config import (
-    PALABRAS_CIENCIA,
-    PALABRAS_NUMERO,
-    PALABRAS_SOCIAL,
-    MODIFICADORES,
-    RIESGO_EXPR
+    PUNTUADOR_AREAS
 )
 
 
@@ -20,11 +13,11 @@ def calc_scores(obs_list):
     texto = limpiar_texto(texto)
     texto = quitar_acentos(texto)
 
-    sc = score_keywords(texto, PALABRAS_CIENCIA, MODIFICADORES)
-    sn = score_keywords(texto, PALABRAS_NUMERO, MODIFICADORES)
-    ss = score_keywords(texto, PALABRAS_SOCIAL, MODIFICADORES)
+    # Lexicos de areas y expresiones de riesgo en una sola pasada
+    p = PUNTUADOR_AREAS.puntuar(texto)
+    sc, sn, ss = p["ciencia"], p["numero"], p["social"]
 
-    riesgo = score_keywords(texto, RIESGO_EXPR)
+    riesgo = p["riesgo"]
 
     sc -= riesgo * 0.2
     sn -= riesgo * 0.2
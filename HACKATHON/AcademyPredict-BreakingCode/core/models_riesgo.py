@@ -1,16 +1,114 @@
-from core.nlp import puntaje_ambiente
+import itertools
+import numpy as np
+import pandas as pd
 
-def calcular_riesgo(row, modelo_nlp):
+from core.nlp import puntaje_ambiente, puntajes_ambiente
+from core.config import PESOS_RIESGO
+
+FACTORES = ["asistencia", "nota", "ambiente", "contexto"]
+
+def _vector_pesos(pesos=None):
+    pesos = {**PESOS_RIESGO, **(pesos or {})}
+    return np.array([pesos[f] for f in FACTORES], dtype="float64")
+
+def calcular_riesgo(row, modelo_nlp, F=None, pesos=None):
     A = row["asistencia"]
     N = row["nota_promedio"]
-    F = puntaje_ambiente(row["observaciones"], modelo_nlp)
+    if F is None: # F ya puntuado por lotes (build_master_dataset) o se calcula aqui
+        F = puntaje_ambiente(row["observaciones"], modelo_nlp)
     CS = row['CS']
+    w = _vector_pesos(pesos)
 
     Rd = (
-        0.25 * (1 - A / 100) +
-        0.25 * max(0, 75 - N) / 100 +
-        0.25 * (1 - F) +
-        0.25 * (1 - CS)
+        w[0] * (1 - A / 100) +
+        w[1] * max(0, 75 - N) / 100 +
+        w[2] * (1 - F) +
+        w[3] * (1 - CS)
     )
 
     return round(Rd,3), round(F,3)
+
+
+# Motor vectorizado: columnas completas en lugar de fila por fila
+
+def componentes_riesgo(A, N, F, CS):
+    """Matriz 4 x estudiantes con cada termino de Rd antes de ponderar"""
+    A, N, F, CS = (np.asarray(x, dtype="float64") for x in (A, N, F, CS))
+    return np.vstack([
+        1 - A / 100,
+        np.fmax(0, 75 - N) / 100, # fmax: nota faltante -> 0, igual que max(0, nan)
+        1 - F,
+        1 - CS
+    ])
+
+def riesgo_vectorizado(A, N, F, CS, pesos=None):
+    """Rd de todos los estudiantes a la vez (mismo calculo que calcular_riesgo)"""
+    A, N, F, CS = (np.asarray(x, dtype="float64") for x in (A, N, F, CS))
+    w = _vector_pesos(pesos)
+    return (
+        w[0] * (1 - A / 100) +
+        w[1] * np.fmax(0, 75 - N) / 100 +
+        w[2] * (1 - F) +
+        w[3] * (1 - CS)
+    )
+
+def calcular_riesgos_df(df, modelo_nlp=None, F=None, pesos=None):
+    """
+    Rd y F (redondeados a 3 decimales) para un DataFrame completo.
+    Si no se pasa F, las observaciones se puntuan en un solo predict_proba.
+    """
+    if F is None:
+        F = puntajes_ambiente(df["observaciones"], modelo_nlp)
+    F = np.asarray(F, dtype="float64")
+
+    Rd = riesgo_vectorizado(df["asistencia"], df["nota_promedio"], F, df["CS"], pesos)
+    return np.round(Rd, 3), np.round(F, 3)
+
+
+# Analisis de sensibilidad (what-if) de los pesos
+
+def generar_pesos(paso=0.05):
+    """Todas las combinaciones de 4 pesos multiplos de `paso` que suman 1"""
+    n = int(round(1 / paso))
+    combinaciones = [
+        (a, b, c, n - a - b - c)
+        for a, b, c in itertools.product(range(n + 1), repeat=3)
+        if a + b + c <= n
+    ]
+    return np.array(combinaciones, dtype="float64") / n
+
+def barrido_pesos(A, N, F, CS, pesos):
+    """
+    Rd de todos los estudiantes para cada combinacion de pesos (k x 4)
+    en un solo producto: devuelve una matriz k x estudiantes.
+    """
+    return np.asarray(pesos, dtype="float64") @ componentes_riesgo(A, N, F, CS)
+
+def sensibilidad_pesos(A, N, F, CS, pesos=None, umbral=0.6, bloque=2_000_000):
+    """
+    Evalua miles de combinaciones de pesos sobre todos los estudiantes.
+    Devuelve:
+    - por_pesos: una fila por combinacion (pesos, Rd promedio, alumnos sobre el umbral)
+    - frecuencia_alto: fraccion de combinaciones en que cada estudiante supera el umbral
+    Se procesa por bloques de combinaciones para acotar memoria (~bloque valores a la vez).
+    """
+    pesos = generar_pesos() if pesos is None else np.asarray(pesos, dtype="float64")
+    comp = componentes_riesgo(A, N, F, CS)
+    n_est = comp.shape[1]
+
+    promedio = np.empty(len(pesos))
+    alto = np.empty(len(pesos), dtype="int64")
+    veces_alto = np.zeros(n_est, dtype="int64")
+
+    paso = max(1, bloque // max(n_est, 1))
+    for i in range(0, len(pesos), paso):
+        Rd = pesos[i:i + paso] @ comp
+        sobre = Rd > umbral
+        promedio[i:i + paso] = np.nanmean(Rd, axis=1) if n_est else np.nan
+        alto[i:i + paso] = sobre.sum(axis=1)
+        veces_alto += sobre.sum(axis=0)
+
+    por_pesos = pd.DataFrame(pesos, columns=[f"w_{f}" for f in FACTORES])
+    por_pesos["Rd_promedio"] = promedio
+    por_pesos["alto_riesgo"] = alto
+    return por_pesos, veces_alto / max(len(pesos), 1)
@@ -1,6 +1,7 @@
 import re
 import pickle
 import os
+import numpy as np
 import pandas as pd
 from scipy.sparse import hstack
 from sklearn.feature_extraction import DictVectorizer
@@ -8,10 +9,19 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.svm import LinearSVC
 from sklearn.model_selection import train_test_split
-from core.config import PALABRAS_POS, PALABRAS_NEG
+from core.config import (
+    PALABRAS_POS,
+    PALABRAS_NEG,
+    PALABRAS_CIENCIA,
+    PALABRAS_NUMERO,
+    PALABRAS_SOCIAL,
+    RIESGO_EXPR,
+    MODIFICADORES
+)
 from nltk.corpus import stopwords
 import nltk
 import unicodedata
+from collections import Counter
 
 MODEL_PATH = "modelo_riesgo.pkl"
 
@@ -38,17 +48,133 @@ def quitar_acentos(texto):
         if unicodedata.category(c) != 'Mn'
     )
 
+def _es_palabra(c):
+    return c.isalnum() or c == "_"
+
+def _regex_trie(palabras):
+    """Alternancia en forma de trie: en cada posicion encuentra la palabra mas larga"""
+    trie = {}
+    for p in palabras:
+        nodo = trie
+        for c in p:
+            nodo = nodo.setdefault(c, {})
+        nodo[""] = True  # fin de palabra
+
+    def _a_regex(nodo):
+        ramas = [re.escape(c) + _a_regex(hijo) for c, hijo in sorted(nodo.items()) if c]
+        if not ramas:
+            return ""
+        cuerpo = "(?:" + "|".join(ramas) + ")"
+        return cuerpo + "?" if "" in nodo else cuerpo
+
+    return _a_regex(trie)
+
+
+class BuscadorPalabras:
+    """
+    Automata (una sola regex en trie) que busca todas las palabras de una
+    lista en UNA pasada sobre el texto, en lugar de una pasada por palabra.
+    - limites=True: palabra exacta, como re.finditer(r'\b' + p + r'\b')
+    - limites=False: subcadena, como texto.count(p)
+    Cada palabra cuenta sus apariciones sin solaparse consigo misma (igual que
+    finditer / count), pero palabras distintas si pueden solaparse entre si.
+    Supone palabras que empiezan y terminan en letra (como las de config.py).
+    """
+
+    def __init__(self, palabras, limites=True):
+        self.palabras = sorted({p for p in palabras if p})
+        self.limites = limites
+        inicio = r"(?<!\w)" if limites else ""
+        self.patron = re.compile(inicio + "(?=(" + _regex_trie(self.palabras) + "))")
+        # Las palabras que empiezan en la misma posicion son prefijos de la mas larga
+        self.prefijos = {
+            p: [q for q in self.palabras if p.startswith(q)] for p in self.palabras
+        }
+
+    def ocurrencias(self, texto):
+        """(palabra, inicio) de cada aparicion, en orden de posicion"""
+        fin = {}
+        n = len(texto)
+        for m in self.patron.finditer(texto):
+            inicio = m.start()
+            for p in self.prefijos[m.group(1)]:
+                final = inicio + len(p)
+                if self.limites and final < n and _es_palabra(texto[final]):
+                    continue
+                if fin.get(p, 0) > inicio:
+                    continue
+                fin[p] = final
+                yield p, inicio
+
+    def contar(self, texto):
+        return Counter(p for p, _ in self.ocurrencias(texto))
+
+
+class PuntuadorLexicos:
+    """
+    Puntua varios lexicos a la vez con un solo BuscadorPalabras:
+    +1 por palabra encontrada y +0.5 si hay un modificador en los `ventana`
+    caracteres previos (solo para los lexicos en `con_modificadores`).
+    Palabras y modificadores se normalizan una vez, al construirlo.
+    """
+
+    def __init__(self, lexicos, modificadores=None, con_modificadores=None, ventana=15):
+        self.nombres = list(lexicos)
+        # palabra normalizada -> {lexico: veces que aparece en su lista}
+        self.lexicos_de = {}
+        for nombre, palabras in lexicos.items():
+            for p in palabras:
+                p = quitar_acentos(p.lower())
+                self.lexicos_de.setdefault(p, Counter())[nombre] += 1
+        self.buscador = BuscadorPalabras(self.lexicos_de, limites=True)
+
+        self.modificadores = None
+        if modificadores:
+            self.modificadores = re.compile("|".join(re.escape(m) for m in modificadores))
+        self.con_modificadores = set(self.nombres if con_modificadores is None else con_modificadores)
+        self.ventana = ventana
+
+    def puntuar(self, texto):
+        texto = quitar_acentos(texto.lower())
+        puntajes = dict.fromkeys(self.nombres, 0)
+        for palabra, inicio in self.buscador.ocurrencias(texto):
+            modificado = None
+            for nombre, veces in self.lexicos_de[palabra].items():
+                puntajes[nombre] += veces
+                if self.modificadores is None or nombre not in self.con_modificadores:
+                    continue
+                if modificado is None:
+                    # Chequear si antes de la palabra hay un modificador
+                    modificado = self.modificadores.search(
+                        texto, max(0, inicio - self.ventana), inicio
+                    ) is not None
+                if modificado:
+                    puntajes[nombre] += 0.5 * veces  # ponderación extra
+        return puntajes
+
+
+_CONTADOR_FEATURES = BuscadorPalabras(PALABRAS_POS + PALABRAS_NEG, limites=False)
+_FEATURES_CERO = dict.fromkeys(
+    [f"pos_{p}" for p in PALABRAS_POS] + [f"neg_{n}" for n in PALABRAS_NEG], 0
+)
+_CLAVES_DE = {p: [] for p in _CONTADOR_FEATURES.palabras}
+for _p in dict.fromkeys(PALABRAS_POS):
+    _CLAVES_DE[_p].append(f"pos_{_p}")
+for _n in dict.fromkeys(PALABRAS_NEG):
+    _CLAVES_DE[_n].append(f"neg_{_n}")
+_VECES_NEG = Counter(PALABRAS_NEG)
 
 def extraer_features(texto):
     texto = texto.lower()
-    feats = {}
-    for p in PALABRAS_POS:
-        feats[f"pos_{p}"] = texto.count(p)
-    for n in PALABRAS_NEG:
-        feats[f"neg_{n}"] = texto.count(n)
+    conteos = _CONTADOR_FEATURES.contar(texto)
+    # Solo se tocan las palabras encontradas; el resto queda en 0
+    feats = dict(_FEATURES_CERO)
+    for p, c in conteos.items():
+        for clave in _CLAVES_DE[p]:
+            feats[clave] = c
     feats["longitud"] = len(texto)
     feats["num_palabras"] = len(texto.split())
-    feats["ratio_neg"] = sum(feats[f"neg_{n}"] for n in PALABRAS_NEG) / (feats["num_palabras"] + 1)
+    feats["ratio_neg"] = sum(c * _VECES_NEG[p] for p, c in conteos.items()) / (feats["num_palabras"] + 1)
     return feats
 
 
@@ -103,24 +229,53 @@ def puntaje_ambiente(texto, modelo_nlp=None):
 
     return float(clf.predict_proba(X)[0][1])
 
-def score_keywords(texto, palabras, modificadores=None):
 
-    texto = quitar_acentos(texto.lower())
-    palabras = [quitar_acentos(p.lower()) for p in palabras]
-    
-    total = 0
-    for p in palabras:
-        # Buscar palabra exacta
-        matches = re.finditer(r'\b' + re.escape(p) + r'\b', texto)
-        for m in matches:
-            total += 1
-            if modificadores:
-                # Chequear si antes de la palabra hay un modificador
-                start = max(0, m.start()-15)
-                contexto = texto[start:m.start()]
-                if any(mod in contexto for mod in modificadores):
-                    total += 0.5  # ponderación extra
-    return total
+def puntajes_ambiente(textos, modelo_nlp=None):
+    """
+    Version por lotes de puntaje_ambiente: todos los textos van en una sola
+    matriz dispersa y se puntuan con un unico predict_proba.
+    Textos vacios o nulos (y sin modelo) -> 0.5, igual que puntaje_ambiente.
+    """
+    textos = list(textos)
+    puntajes = np.full(len(textos), 0.5)
+    if modelo_nlp is None:
+        return puntajes
+
+    validos = [i for i, t in enumerate(textos) if isinstance(t, str) and t]
+    if not validos:
+        return puntajes
+
+    clf, tfidf, vec = modelo_nlp
+    limpios = [limpiar_texto(textos[i]) for i in validos]
+
+    X_tfidf = tfidf.transform(limpios)
+    X_manual = vec.transform([extraer_features(t) for t in limpios])
+    X = hstack([X_tfidf, X_manual]).tocsr()
+
+    puntajes[validos] = clf.predict_proba(X)[:, 1]
+    return puntajes
+
+# Lexicos de areas + expresiones de riesgo, puntuados en una sola pasada
+PUNTUADOR_AREAS = PuntuadorLexicos(
+    {
+        "ciencia": PALABRAS_CIENCIA,
+        "numero": PALABRAS_NUMERO,
+        "social": PALABRAS_SOCIAL,
+        "riesgo": RIESGO_EXPR
+    },
+    MODIFICADORES,
+    con_modificadores=("ciencia", "numero", "social")
+)
+
+_PUNTUADORES = {}
+
+def score_keywords(texto, palabras, modificadores=None):
+    # El puntuador de cada lista se construye una sola vez
+    clave = (tuple(palabras), tuple(modificadores or ()))
+    puntuador = _PUNTUADORES.get(clave)
+    if puntuador is None:
+        puntuador = _PUNTUADORES[clave] = PuntuadorLexicos({"total": palabras}, modificadores)
+    return puntuador.puntuar(texto)["total"]
 
 
 def score_riesgo(texto, riesgo_expr):
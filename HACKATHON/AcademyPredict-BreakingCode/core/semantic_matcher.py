@@ -1,28 +1,119 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 import nltk
 from nltk.corpus import stopwords
 
+from core.perfil_textual import generar_perfil_textual
+
 nltk.download("stopwords", quiet=True)
 
 STOPWORDS_ES = stopwords.words("spanish")
 
-def recomendar_areas(perfil_texto, df_areas, top_k=5):
-    corpus = [perfil_texto] + df_areas["texto_area"].astype(str).tolist()
+AREAS_PATH = "datasets/areas_estudio.csv"
+INDEX_PATH = "datasets/areas_estudio_index.pkl"
+
+def texto_areas(df_areas):
+    if "texto_area" in df_areas.columns:
+        return df_areas["texto_area"].astype(str)
+    return df_areas["nombre_area"].astype(str) + ". " + df_areas["descripcion"].astype(str)
+
+def huella_areas(textos):
+    return hashlib.sha256("\n".join(textos).encode("utf-8")).hexdigest()
+
+
+class IndiceAreas:
+    """
+    TF-IDF de las areas ajustado UNA vez (solo con los textos de las areas),
+    asi los puntajes de distintos estudiantes son comparables entre si.
+    Los perfiles solo se transforman; la matriz de areas no se recalcula.
+    `afinidad` es la similitud coseno sin escalar (cada pagina decide como mostrarla).
+    """
+
+    def __init__(self, df_areas):
+        textos = texto_areas(df_areas).tolist()
+        self.huella = huella_areas(textos)
+        self.areas = df_areas.drop(columns=["texto_area"], errors="ignore").reset_index(drop=True)
+
+        self.vectorizer = TfidfVectorizer(
+            stop_words=STOPWORDS_ES,
+            ngram_range=(1, 2),
+            min_df=1
+        )
+        self.matriz = self.vectorizer.fit_transform(textos)  # areas x terminos
+
+    def afinidades(self, perfiles):
+        """Matriz perfiles x areas de similitudes coseno en un solo producto disperso (filas TF-IDF normalizadas)"""
+        P = self.vectorizer.transform(list(perfiles))
+        return (P @ self.matriz.T).toarray()
+
+    def recomendar(self, perfil_texto, top_k=5):
+        df_areas = self.areas.copy()
+        df_areas["afinidad"] = self.afinidades([perfil_texto])[0]
+        return df_areas.sort_values("afinidad", ascending=False).head(top_k)
+
+    def recommend_all(self, df_master, top_k=5):
+        """Top-k areas de TODOS los estudiantes (formato largo: una fila por estudiante y area)"""
+        perfiles = df_master.apply(generar_perfil_textual, axis=1)
+        afinidad = self.afinidades(perfiles)
 
-    vectorizer = TfidfVectorizer(
-        stop_words=STOPWORDS_ES,
-        ngram_range=(1, 2),
-        min_df=1
-    )
+        top_k = min(top_k, afinidad.shape[1])
+        orden = np.argsort(-afinidad, axis=1, kind="stable")[:, :top_k]
 
-    X = vectorizer.fit_transform(corpus)
+        filas = np.repeat(np.arange(len(df_master)), top_k)
+        cols = orden.ravel()
 
-    perfil_vec = X[0]
-    areas_vecs = X[1:]
+        resultado = (
+            df_master[["id_estudiante", "nombre_estudiante"]]
+            .iloc[filas]
+            .reset_index(drop=True)
+        )
+        resultado["ranking"] = np.tile(np.arange(1, top_k + 1), len(df_master))
+        resultado = pd.concat([resultado, self.areas.iloc[cols].reset_index(drop=True)], axis=1)
+        resultado["afinidad"] = afinidad[filas, cols]
+        return resultado
 
-    scores = (areas_vecs @ perfil_vec.T).toarray().ravel()
+    def guardar(self, path=INDEX_PATH):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+
+_indices = {}
+
+def cargar_indice_areas(df_areas=None, path=INDEX_PATH):
+    """
+    Indice de areas: en memoria -> desde disco (junto a areas_estudio.csv) -> se ajusta y guarda.
+    Si el CSV de areas cambio, el indice guardado se descarta y se vuelve a ajustar.
+    """
+    if df_areas is None:
+        df_areas = pd.read_csv(AREAS_PATH)
+
+    huella = huella_areas(texto_areas(df_areas).tolist())
+    if huella in _indices:
+        return _indices[huella]
+
+    indice = None
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                indice = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError, AttributeError):
+            indice = None
+
+    if indice is None or indice.huella != huella:
+        indice = IndiceAreas(df_areas)
+        indice.guardar(path)
+
+    _indices[huella] = indice
+    return indice
+
+
+def recomendar_areas(perfil_texto, df_areas, top_k=5):
+    return cargar_indice_areas(df_areas).recomendar(perfil_texto, top_k)
 
-    df_areas = df_areas.copy()
-    df_areas["afinidad"] = scores / scores.max() * 0.95 if scores.max() > 0 else 0
 
-    return df_areas.sort_values("afinidad", ascending=False).head(top_k)
\ No newline at end of file
+def recommend_all(df_master, df_areas=None, top_k=5):
+    return cargar_indice_areas(df_areas).recommend_all(df_master, top_k)
@@ -3,7 +3,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 import seaborn as sns
-from core.build_dataset import build_master_dataset
+from core.build_dataset import build_master_dataset, build_master_incremental
 from core.nlp import cargar_modelo_nlp
 
 # configuracion streamlit
@@ -12,20 +12,38 @@ st.set_page_config(page_title="Gestion de Estudiantes", page_icon="👥", layout
 
 st.subheader("⚙️ Dataset maestro")
 
+completo = st.checkbox("Reconstruir todo (ignorar cambios detectados)")
+
 if st.button("🔄 Regenerar dataset académico"):
     with st.spinner("Procesando datos académicos..."):
         modelo_nlp = cargar_modelo_nlp()
 
-        path = build_master_dataset(
-            anio_academico="2025-2026",
-            semestre=1,
-            modelo_nlp=modelo_nlp
-        )
+        if completo:
+            path = build_master_dataset(
+                anio_academico="2025-2026",
+                semestre=1,
+                modelo_nlp=modelo_nlp
+            )
+            st.session_state["reporte_master"] = f"Reconstruccion completa: {path}"
+        else:
+            # Solo recalcula los estudiantes cuyas entradas cambiaron
+            reporte = build_master_incremental(
+                anio_academico="2025-2026",
+                semestre=1,
+                modelo_nlp=modelo_nlp
+            )
+            st.session_state["reporte_master"] = (
+                f"{reporte['recalculados']} de {reporte['total']} estudiantes recalculados "
+                f"(nuevos: {len(reporte['nuevos'])}, modificados: {len(reporte['modificados'])}, "
+                f"eliminados: {len(reporte['eliminados'])}) → {reporte['path']}"
+            )
 
-    st.success("Dataset generado correctamente")
-    st.code(path)
     st.rerun()
 
+if "reporte_master" in st.session_state:
+    st.success("Dataset generado correctamente")
+    st.code(st.session_state["reporte_master"])
+
 # carga y preproceso
 @st.cache_data(show_spinner=False)
 def load_datasets():
@@ -5,7 +5,7 @@ import numpy as np
 
 from core.data_loader import load_master, load_areas
 from core.perfil_textual import generar_perfil_textual
-from core.semantic_matcher import recomendar_areas
+from core.semantic_matcher import cargar_indice_areas
 
 # CONFIG STREAMLIT
 
@@ -23,10 +23,17 @@ st.caption("Basado en perfil academico, contexto social y observaciones")
 df = load_master()
 areas = load_areas()
 
-areas["texto_area"] = (
-    areas["nombre_area"].astype(str) + ". " +
-    areas["descripcion"].astype(str)
-)
+# Indice de areas ajustado una vez (se guarda junto a areas_estudio.csv)
+@st.cache_resource
+def load_indice_areas():
+    return cargar_indice_areas(areas)
+
+# Recomendaciones de todos los estudiantes en un solo producto de matrices
+@st.cache_data
+def load_recomendaciones(df_master):
+    return load_indice_areas().recommend_all(df_master, top_k=5)
+
+recomendaciones = load_recomendaciones(df)
 
 # SELECCIoN ESTUDIANTE
 
@@ -62,7 +69,12 @@ st.write(perfil_texto)
 
 st.subheader("🎯 Areas academicas recomendadas")
 
-ranking = recomendar_areas(perfil_texto, areas)
+ranking = recomendaciones[recomendaciones["id_estudiante"] == row["id_estudiante"]].copy()
+
+# `afinidad` es el coseno sin escalar (comparable entre estudiantes); para
+# mostrarla se escala por estudiante, con su mejor area en 95%
+maximo = ranking["afinidad"].max()
+ranking["afinidad"] = ranking["afinidad"] / maximo * 0.95 if maximo > 0 else 0.0
 
 top = ranking.head(3)
 
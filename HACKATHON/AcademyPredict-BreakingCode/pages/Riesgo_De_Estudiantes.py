@@ -6,7 +6,7 @@ import matplotlib.pyplot as plt
 
 from core.data_loader import load_base_data
 from core.nlp import cargar_modelo_nlp, MODEL_PATH
-from core.models_riesgo import calcular_riesgo
+from core.models_riesgo import calcular_riesgos_df, sensibilidad_pesos
 
 
 # config streamlit
@@ -71,10 +71,7 @@ modelo_nlp = cargar_modelo_nlp()
 def calcular_riesgos(df, modelo_nlp):
     df = df.copy()
 
-    df[["Rd", "F"]] = df.apply(
-        lambda row: pd.Series(calcular_riesgo(row, modelo_nlp)),
-        axis=1
-    )
+    df["Rd"], df["F"] = calcular_riesgos_df(df, modelo_nlp)
 
     return df.sort_values("Rd", ascending=False).reset_index(drop=True)
 
@@ -136,6 +133,29 @@ st.dataframe(
 )
 
 
+# sensibilidad de los pesos
+
+st.subheader("🧪 Sensibilidad a los pesos de Rd")
+
+with st.expander("Ver estudiantes en alto riesgo bajo distintas ponderaciones"):
+    por_pesos, frecuencia = sensibilidad_pesos(
+        df_riesgo["asistencia"], df_riesgo["nota_promedio"],
+        df_riesgo["F"], df_riesgo["CS"]
+    )
+    st.caption(
+        f"{len(por_pesos)} combinaciones de pesos (paso 0.05, suman 1) "
+        f"evaluadas sobre {len(df_riesgo)} estudiantes"
+    )
+
+    df_sens = df_riesgo[["id_estudiante", "nombre_estudiante", "Rd"]].copy()
+    df_sens["% combinaciones con Rd > 0.6"] = frecuencia
+    st.dataframe(
+        df_sens.sort_values("% combinaciones con Rd > 0.6", ascending=False)
+        .style.format({"Rd": "{:.1%}", "% combinaciones con Rd > 0.6": "{:.1%}"}),
+        use_container_width=True
+    )
+
+
 # consulta por estudiante
 
 st.subheader("🔎 Consulta individual")
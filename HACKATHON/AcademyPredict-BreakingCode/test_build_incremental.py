@@ -0,0 +1,30 @@
+# test_build_incremental.py
+# Comprueba que dos corridas incrementales seguidas sin cambios en los datos
+# ni en el modelo NLP no recalculan a ningun estudiante (la huella del modelo
+# no debe cambiar despues de usarlo). El almacen se escribe en un directorio
+# temporal. Ejecutar desde la raiz del proyecto: python test_build_incremental.py
+
+import tempfile
+
+import core.build_dataset as build_dataset
+from core.nlp import cargar_modelo_nlp
+
+
+if __name__ == "__main__":
+    build_dataset.MASTER_PATH = tempfile.mkdtemp()
+    modelo_nlp = cargar_modelo_nlp()
+
+    primera = build_dataset.build_master_incremental(modelo_nlp=modelo_nlp)
+    assert primera["recalculados"] == primera["total"], primera
+
+    # Mismo objeto ya usado para predecir: misma huella
+    segunda = build_dataset.build_master_incremental(modelo_nlp=modelo_nlp)
+    assert segunda["recalculados"] == 0, segunda
+    assert segunda["sin_cambios"] == segunda["total"], segunda
+
+    # Modelo recargado desde disco: tambien la misma huella
+    tercera = build_dataset.build_master_incremental(modelo_nlp=cargar_modelo_nlp())
+    assert tercera["recalculados"] == 0, tercera
+
+    print(f"{primera['total']} estudiantes, {segunda['recalculados']} recalculados en la segunda corrida")
+    print("OK")
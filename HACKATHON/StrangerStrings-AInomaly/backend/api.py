@@ -1,16 +1,15 @@
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 import uvicorn
 import os
 import psutil
-import cv2
 import threading
+import asyncio
 import json
-import glob
 from datetime import datetime
-import time
+from typing import Optional
 
 app = FastAPI()
 
@@ -40,10 +39,17 @@ app.mount("/recordings", StaticFiles(directory=RECORDINGS_DIR), name="recordings
 # Global variables
 from camera_manager import RTSPStream
 from source.vision.pose_service import PoseService
+from source.vision.inference_engine import get_shared_engine
+from source.vision.adaptive_rate import load_governor
+from camera_pipeline import CameraPipeline, STREAM_PROFILES, DEFAULT_PROFILE
+from source.services.event_bus import EventBus
 
 # Global variables
 active_cameras = {} # {id: RTSPStream}
 pose_services = {} # {id: PoseService}
+pipelines = {} # {id: CameraPipeline}
+pipelines_lock = threading.Lock()
+event_bus = EventBus() # Alerts, posture changes and camera state for /events
 SETTINGS_FILE = "settings.json"
 CAMERAS_FILE = "cameras.json"
 RECORDINGS_DIR = "recordings"
@@ -59,92 +65,120 @@ def get_camera_config(camera_id: str):
                     return cam
     return None
 
-def generate_frames(camera_id: str):
-    global active_cameras
-    
-    # Initialize camera if not valid
-    if camera_id not in active_cameras or not active_cameras[camera_id].running:
-        config = get_camera_config(camera_id)
-        if not config:
-            return 
-            
-        src = config["source"]
-        
-        # Check if enabled
-        if not config.get("enabled", True):
-             # If disabled, yield blank or just return to close stream
-             return
-
-        # Handle Integer indices for webcams vs Strings for RTSP
-        if isinstance(src, str) and src.isdigit():
-            src = int(src)
-            
-        # Create and start threaded stream manager
-        stream = RTSPStream(src, name=f"Cam_{camera_id}")
-        
-        stream.start()
-        active_cameras[camera_id] = stream
-    
-    stream_manager = active_cameras[camera_id]
-    
-    while True:
-        # Check enabled status again in loop (though stream closed by toggle usually)
-        if not stream_manager.running:
-             break
+def get_inference_engine():
+    """
+    Shared batched YOLO engine. Batch size and latency budget are read from
+    settings.json ("inference_max_batch", "inference_latency_ms").
+    """
+    settings = {}
+    if os.path.exists(SETTINGS_FILE):
+        try:
+            with open(SETTINGS_FILE, 'r') as f:
+                settings = json.load(f)
+        except Exception:
+            pass
+
+    return get_shared_engine(
+        max_batch_size=settings.get("inference_max_batch", 8),
+        latency_budget=settings.get("inference_latency_ms", 30) / 1000.0
+    )
+
+def get_pipeline(camera_id: str):
+    """
+    Returns the running CameraPipeline for a camera, creating the stream,
+    vision service and pipeline on first use. Shared by all viewers.
+    """
+    with pipelines_lock:
+        pipeline = pipelines.get(camera_id)
+        if pipeline is not None and pipeline.running:
+            return pipeline
+
+        # Initialize camera if not valid
+        if camera_id not in active_cameras or not active_cameras[camera_id].running:
+            config = get_camera_config(camera_id)
+            if not config:
+                return None
+
+            src = config["source"]
+
+            # Check if enabled
+            if not config.get("enabled", True):
+                 # If disabled, just return to close stream
+                 return None
+
+            # Handle Integer indices for webcams vs Strings for RTSP
+            if isinstance(src, str) and src.isdigit():
+                src = int(src)
+
+            # Create and start threaded stream manager
+            def on_state_change(connected, camera_id=camera_id):
+                event_bus.publish({
+                    "type": "camera_state",
+                    "camera_id": camera_id,
+                    "state": "connected" if connected else "reconnecting"
+                })
+
+            stream = RTSPStream(src, name=f"Cam_{camera_id}", on_state_change=on_state_change)
+
+            stream.start()
+            active_cameras[camera_id] = stream
 
-        # Get latest frame from thread buffer
-        success, frame = stream_manager.read()
-        
-        if not success:
-            # If manager is reconnecting or failed, yield a placeholder blank frame
-            # rather than breaking, so the HTTP stream stays alive for the browser
-            
-            # Create a black blank frame 640x360
-            import numpy as np
-            blank_frame = np.zeros((360, 640, 3), np.uint8)
-            ret, buffer = cv2.imencode('.jpg', blank_frame)
-            if ret:
-                frame_bytes = buffer.tobytes()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            
-            time.sleep(1.0) # Slow update for placeholder
-            continue
-            
-        # Process frame with Vision System (Throttled inside PoseService)
         if camera_id not in pose_services:
-            pose_services[camera_id] = PoseService(camera_id=camera_id, alert_manager=alert_manager)
-        
-        try:
-            frame = pose_services[camera_id].process_frame(frame)
-        except Exception as e:
-            print(f"Vision processing error: {e}")
-            
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+            pose_services[camera_id] = PoseService(camera_id=camera_id, alert_manager=alert_manager,
+                                                   engine=get_inference_engine(), event_bus=event_bus)
 
+        pipeline = CameraPipeline(camera_id, active_cameras[camera_id], pose_services[camera_id])
+        pipeline.start()
+        pipelines[camera_id] = pipeline
+        return pipeline
 
-@app.get("/video_feed")
-def video_feed(id: str):
-    print(f"DEBUG: video_feed requested for ID: {id}")
-    return StreamingResponse(generate_frames(id), media_type="multipart/x-mixed-replace; boundary=frame")
+def stop_pipeline(camera_id: str):
+    with pipelines_lock:
+        pipeline = pipelines.pop(camera_id, None)
+    if pipeline:
+        pipeline.stop()
+        event_bus.publish({"type": "camera_state", "camera_id": camera_id, "state": "stopped"})
 
-import asyncio
+def generate_frames(camera_id: str, profile: str = DEFAULT_PROFILE):
+    pipeline = get_pipeline(camera_id)
+    if pipeline is None:
+        return
+
+    # Fan out from the shared pipeline: no inference/encoding per viewer
+    yield from pipeline.subscribe(profile)
+
+
+@app.get("/video_feed")
+def video_feed(id: str, profile: str = DEFAULT_PROFILE):
+    # profile: "thumb" (grid views), "sd" or "full"
+    if profile not in STREAM_PROFILES:
+        profile = DEFAULT_PROFILE
+    print(f"DEBUG: video_feed requested for ID: {id} ({profile})")
+    return StreamingResponse(generate_frames(id, profile), media_type="multipart/x-mixed-replace; boundary=frame")
 
 @app.get("/events")
-async def sse_events():
+async def sse_events(request: Request):
+    # Resume after reconnect: EventSource sends back the last id it saw
+    last_event_id = request.headers.get("last-event-id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    subscriber = await event_bus.subscribe(last_event_id)
+
     async def event_generator():
-        while True:
-            try:
-                while not alert_manager.notification_queue.empty():
-                    item = alert_manager.notification_queue.get_nowait()
-                    yield f"data: {json.dumps(item)}\n\n"
-            except Exception as e:
-                print(f"SSE Error: {e}")
-            
-            await asyncio.sleep(0.5)
+        try:
+            while True:
+                try:
+                    event_id, item = await asyncio.wait_for(subscriber.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep-alive comment (also detects closed clients)
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"id: {event_id}\ndata: {json.dumps(item)}\n\n"
+        finally:
+            event_bus.unsubscribe(subscriber)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -232,6 +266,8 @@ def toggle_camera(camera_id: str):
             json.dump(cameras, f, indent=4)
             
         # If disabled, force stop the stream
+        if not new_status:
+            stop_pipeline(camera_id)
         if not new_status and camera_id in active_cameras:
             active_cameras[camera_id].stop()
             active_cameras[camera_id].stop()
@@ -257,6 +293,7 @@ def delete_camera(camera_id: str):
             json.dump(cameras, f, indent=4)
             
         # Stop stream if active
+        stop_pipeline(camera_id)
         if camera_id in active_cameras:
             active_cameras[camera_id].stop()
             active_cameras[camera_id].stop()
@@ -269,73 +306,84 @@ def delete_camera(camera_id: str):
             
     return {"status": "deleted"}
 
+def _recording_item(entry, index=0):
+    return {
+        "id": index,
+        "name": entry["name"],
+        "date": datetime.fromtimestamp(entry["ctime"]).strftime('%Y-%m-%d %H:%M'),
+        "size": f"{round(entry['size'] / (1024 * 1024), 2)} MB"
+    }
+
+def _snapshot_item(entry):
+    return {
+        "name": entry["name"],
+        "url": f"/snapshots/{entry['name']}",
+        "date": datetime.fromtimestamp(entry["ctime"]).strftime('%Y-%m-%d %H:%M:%S'),
+        "size": f"{round(entry['size'] / 1024, 1)} KB"
+    }
+
+def _media_page(kind, formatter, page, page_size, date_from, date_to):
+    page = max(1, page)
+    page_size = max(1, min(page_size, 500))
+    try:
+        entries, total = alert_manager.media_catalog.list(kind, page=page, page_size=page_size,
+                                                          date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        return {"error": str(e)}
+    offset = (page - 1) * page_size
+    return {
+        "items": [formatter(e, offset + i) for i, e in enumerate(entries)],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": (total + page_size - 1) // page_size
+    }
+
+# Listings come from the in-memory media catalog (no glob/stat per request)
 @app.get("/recordings")
-def get_recordings():
-    files = glob.glob(os.path.join(RECORDINGS_DIR, "*.mp4"))
-    data = []
-    for i, f in enumerate(files):
-        stats = os.stat(f)
-        size_mb = round(stats.st_size / (1024 * 1024), 2)
-        created = datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M')
-        name = os.path.basename(f)
-        data.append({
-            "id": i,
-            "name": name,
-            "date": created,
-            "size": f"{size_mb} MB"
-        })
-    return data
-
-    return data
+def get_recordings(date_from: Optional[str] = None, date_to: Optional[str] = None):
+    try:
+        entries, _ = alert_manager.media_catalog.list("recordings", date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        return {"error": str(e)}
+    return [_recording_item(e, i) for i, e in enumerate(entries)]
+
+@app.get("/api/recordings")
+def get_recordings_page(page: int = 1, page_size: int = 50,
+                        date_from: Optional[str] = None, date_to: Optional[str] = None):
+    return _media_page("recordings", _recording_item, page, page_size, date_from, date_to)
 
 @app.delete("/api/recordings/{filename}")
 def delete_recording(filename: str):
-    # Security: prevent directory traversal
-    filename = os.path.basename(filename) 
-    file_path = os.path.join(RECORDINGS_DIR, filename)
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
+    # Security: prevent directory traversal (basename inside the catalog)
+    try:
+        if alert_manager.media_catalog.delete("recordings", filename):
             return {"status": "deleted"}
-        except Exception as e:
-            return {"error": f"Error del sistema: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Error del sistema: {str(e)}"}
     return {"error": "File not found"}
 
 @app.get("/snapshots")
-def get_snapshots():
-    if not os.path.exists(SNAPSHOTS_DIR):
-        return []
-    
-    files = glob.glob(os.path.join(SNAPSHOTS_DIR, "*.jpg"))
-    data = []
-    # Sort files by creation time descending
-    files.sort(key=os.path.getctime, reverse=True)
-    
-    for f in files:
-        stats = os.stat(f)
-        size_kb = round(stats.st_size / 1024, 1)
-        created = datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-        name = os.path.basename(f)
-        
-        data.append({
-            "name": name,
-            "url": f"/snapshots/{name}",
-            "date": created,
-            "size": f"{size_kb} KB"
-        })
-    return data
+def get_snapshots(date_from: Optional[str] = None, date_to: Optional[str] = None):
+    try:
+        entries, _ = alert_manager.media_catalog.list("snapshots", date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        return {"error": str(e)}
+    return [_snapshot_item(e) for e in entries]
+
+@app.get("/api/snapshots")
+def get_snapshots_page(page: int = 1, page_size: int = 50,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None):
+    return _media_page("snapshots", lambda e, i: _snapshot_item(e), page, page_size, date_from, date_to)
 
 @app.delete("/api/snapshots/{filename}")
 def delete_snapshot(filename: str):
-    # Security: prevent directory traversal
-    filename = os.path.basename(filename) 
-    file_path = os.path.join(SNAPSHOTS_DIR, filename)
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
+    # Security: prevent directory traversal (basename inside the catalog)
+    try:
+        if alert_manager.media_catalog.delete("snapshots", filename):
             return {"status": "deleted"}
-        except Exception as e:
-            return {"error": f"Error del sistema: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Error del sistema: {str(e)}"}
     return {"error": "File not found"}
 
 @app.get("/settings")
@@ -353,7 +401,7 @@ def update_settings(settings: dict):
 
 # --- Alerts Management Endpoints ---
 from source.services.alert_manager import AlertManager
-alert_manager = AlertManager()
+alert_manager = AlertManager(event_bus=event_bus)
 
 @app.get("/alerts/settings")
 def get_alert_settings():
@@ -364,8 +412,18 @@ def update_alert_settings(settings: dict):
     return alert_manager.update_settings(settings)
 
 @app.get("/alerts/history")
-def get_alert_history():
-    return alert_manager.get_history()
+def get_alert_history(camera: Optional[str] = None, event: Optional[str] = None,
+                      date_from: Optional[str] = None, date_to: Optional[str] = None,
+                      limit: int = 100, offset: int = 0):
+    return alert_manager.get_history(limit=limit, offset=offset, camera=camera, event=event,
+                                     date_from=date_from, date_to=date_to)
+
+@app.get("/alerts/history/page")
+def get_alert_history_page(page: int = 1, page_size: int = 50,
+                           camera: Optional[str] = None, event: Optional[str] = None,
+                           date_from: Optional[str] = None, date_to: Optional[str] = None):
+    return alert_manager.get_history_page(page=page, page_size=page_size, camera=camera, event=event,
+                                          date_from=date_from, date_to=date_to)
 
 @app.delete("/alerts/history/{alert_id}")
 def delete_alert(alert_id: str):
@@ -375,7 +433,6 @@ def delete_alert(alert_id: str):
     return {"error": "Alert not found"}, 404
 
 from pydantic import BaseModel
-from typing import Optional
 
 class TestAlertConfig(BaseModel):
     telegram_token: Optional[str] = None
@@ -402,7 +459,8 @@ import shutil
 @app.get("/status")
 def get_system_status():
     # System Stats (non-blocking)
-    cpu = psutil.cpu_percent(interval=None)
+    # Shared sample: the same reading drives the inference backoff
+    cpu = load_governor.get_cpu()
     ram = psutil.virtual_memory().percent
     
     # Camera Status
@@ -414,11 +472,30 @@ def get_system_status():
             
     cam_status = f"{active_count} Activas" if active_count > 0 else "Standby"
     
-    # Storage Usage (Percentage of partition where . is located)
-    # If RECORDINGS_DIR doesn't exist, use current dir
+    # Storage Usage from the media catalog (share of the configured quota).
+    # Free space still comes from the partition where recordings live.
+    media = alert_manager.media_catalog.get_stats()
+    settings = alert_manager.get_settings()
+    quota_bytes = sum((settings.get(f"{kind}_max_gb", 0) or 0) * (1024 ** 3) for kind in ("recordings", "snapshots"))
+    used_bytes = sum(media[kind]["bytes"] for kind in ("recordings", "snapshots"))
+
     target_dir = RECORDINGS_DIR if os.path.exists(RECORDINGS_DIR) else "."
     total, used, free = shutil.disk_usage(target_dir)
-    storage_percent = round((used / total) * 100, 1)
+    if quota_bytes:
+        storage_percent = round(used_bytes / quota_bytes * 100, 1)
+    else:
+        storage_percent = round((used / total) * 100, 1)
+
+    # Shared inference engine stats (only if a camera already started it)
+    inference = get_inference_engine().get_stats() if pose_services else None
+    if inference is not None:
+        inference["cpu_backoff"] = round(load_governor.backoff_factor(), 2)
+
+    # Effective per-camera inference rate
+    cameras = {cam_id: service.get_stats() for cam_id, service in list(pose_services.items())}
+    for cam_id, pipeline in list(pipelines.items()):
+        if cam_id in cameras:
+            cameras[cam_id]["stream"] = pipeline.get_stats()
 
     return {
         "connected": True,
@@ -429,8 +506,14 @@ def get_system_status():
         },
         "storage": {
             "percent": storage_percent,
-            "free_gb": round(free / (1024**3), 1)
-        }
+            "free_gb": round(free / (1024**3), 1),
+            "media": media
+        },
+        "inference": inference,
+        "cameras": cameras,
+        "recordings": alert_manager.get_recording_stats(),
+        "notifications": alert_manager.dispatcher.get_stats(),
+        "events": event_bus.get_stats()
     }
 
 if __name__ == "__main__":
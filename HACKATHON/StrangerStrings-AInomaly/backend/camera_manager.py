@@ -1,18 +1,30 @@
 import cv2
+import numpy as np
 import threading
 import time
 import os
 
 class RTSPStream:
-    def __init__(self, source, name="Camera"):
+    def __init__(self, source, name="Camera", ring_size=4, on_state_change=None):
         self.source = source
         self.name = name
+        self.on_state_change = on_state_change # callback(connected: bool)
         self.stream = None
-        self.frame = None
         self.running = False
         self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
         self.thread = None
         self.last_read_time = 0
+
+        # Preallocated ring of frame buffers (allocated on first frame / size change).
+        # Frames are decoded straight into the next slot: no per-frame allocation.
+        # A slot is reused after `ring_size` frames, so consumers that keep a
+        # frame longer than that must copy it.
+        self.ring_size = max(2, ring_size)
+        self.ring = None
+        self.ring_seq = [0] * self.ring_size
+        self.ring_ts = [0.0] * self.ring_size
+        self.seq = 0 # Sequence number of the latest frame (monotonic, 0 = none yet)
         
         # Connection status
         self.connected = False
@@ -42,6 +54,15 @@ class RTSPStream:
         self.thread.start()
         return self
 
+    def _set_connected(self, connected):
+        changed = connected != self.connected
+        self.connected = connected
+        if changed and self.on_state_change:
+            try:
+                self.on_state_change(connected)
+            except Exception as e:
+                print(f"[CAM] State callback error for {self.name}: {e}")
+
     def _update(self):
         retry_delay = 1
         max_retry_delay = 30
@@ -49,7 +70,7 @@ class RTSPStream:
         while self.running:
             try:
                 if self.stream is None or not self.stream.isOpened():
-                    self.connected = False
+                    self._set_connected(False)
                     self.is_reconnecting = True
                     
                     # Logic differentiation based on source type
@@ -93,7 +114,7 @@ class RTSPStream:
                         # Set low buffer size to minimize latency
                         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                         self.stream = cap
-                        self.connected = True
+                        self._set_connected(True)
                         self.is_reconnecting = False
                         self.last_read_time = time.time() # Reset watchdog
                         retry_delay = 1 # Reset off
@@ -106,40 +127,79 @@ class RTSPStream:
 
                 if self.connected and (time.time() - self.last_read_time) > 5.0 and self.last_read_time > 0:
                     print(f"[CAM] Watchdog: No frames for 5s from {self.name}. Reconnecting...")
-                    self.connected = False
+                    self._set_connected(False)
                     if self.stream:
                         self.stream.release()
                     continue
 
-                # Read frame
-                ret, frame = self.stream.read()
+                # Read frame directly into the next ring slot
+                slot = (self.seq + 1) % self.ring_size
+                buffer = self.ring[slot] if self.ring is not None else None
+                with self.lock:
+                    # Slot is about to be overwritten
+                    self.ring_seq[slot] = 0
+                ret, frame = self.stream.read(buffer) if buffer is not None else self.stream.read()
                 
                 if ret:
                     # Debug print for first frame or occasionally
                     # print(f"DEBUG: Frame received from {self.name}: {frame.shape}")
-                    with self.lock:
-                        self.frame = frame
-                        self.last_read_time = time.time()
+                    if self.ring is None or self.ring[0].shape != frame.shape:
+                        # First frame or resolution change: (re)allocate the ring once
+                        self.ring = [np.empty_like(frame) for _ in range(self.ring_size)]
+                        buffer = None
+                    if frame is not buffer:
+                        # Backend could not decode in place; copy into the slot
+                        np.copyto(self.ring[slot], frame)
+                    with self.new_frame:
+                        self.seq += 1
+                        self.ring_seq[slot] = self.seq
+                        self.ring_ts[slot] = time.time()
+                        self.last_read_time = self.ring_ts[slot]
+                        self.new_frame.notify_all()
                 else:
                     print(f"[CAM] Frame read failed for {self.name} (Ret: {ret}). Reconnecting...")
-                    self.connected = False
+                    self._set_connected(False)
                     if self.stream:
                         self.stream.release()
                     time.sleep(1) # Brief pause before reconnect loop takes over
                     
             except Exception as e:
                 print(f"[CAM] Error in thread for {self.name}: {e}")
-                self.connected = False
+                self._set_connected(False)
                 if self.stream:
                     self.stream.release()
                 time.sleep(retry_delay)
 
     def read(self):
+        """Latest frame (may be one already seen). Prefer wait_for_next()."""
+        with self.lock:
+            if self.seq == 0:
+                return False, None
+            return True, self.ring[self.seq % self.ring_size]
+
+    def wait_for_next(self, after_seq=0, timeout=1.0):
+        """
+        Blocks until a frame newer than `after_seq` is captured.
+        Returns (seq, timestamp, frame) or (after_seq, None, None) on timeout.
+        `frame` is a view into the ring buffer (zero-copy): do not modify it,
+        and copy it if it must outlive the next `ring_size - 1` frames.
+        """
+        with self.new_frame:
+            self.new_frame.wait_for(lambda: self.seq > after_seq or not self.running, timeout=timeout)
+            if self.seq <= after_seq:
+                return after_seq, None, None
+            slot = self.seq % self.ring_size
+            return self.seq, self.ring_ts[slot], self.ring[slot]
+
+    def is_valid(self, seq):
+        """True while the ring slot holding `seq` has not been overwritten."""
         with self.lock:
-            return self.frame is not None, self.frame
+            return seq > 0 and self.ring_seq[seq % self.ring_size] == seq
 
     def stop(self):
         self.running = False
+        with self.new_frame:
+            self.new_frame.notify_all()
         if self.thread:
             self.thread.join(timeout=1.0)
         if self.stream:
@@ -0,0 +1,196 @@
+import cv2
+import numpy as np
+import threading
+import time
+
+# Output tiers for /video_feed?profile=...
+# width=None keeps the native resolution, max_fps=None encodes every frame
+STREAM_PROFILES = {
+    "thumb": {"width": 320, "quality": 60, "max_fps": 5},
+    "sd": {"width": 640, "quality": 75, "max_fps": 15},
+    "full": {"width": None, "quality": 90, "max_fps": None},
+}
+DEFAULT_PROFILE = "full"
+
+class CameraPipeline:
+    """
+    Single background processing loop per camera.
+    Consumes frames from an RTSPStream, runs pose inference + alerting ONCE
+    and publishes the annotated frame as JPEG. Any number of MJPEG viewers
+    fan out from the published frame, so CPU cost does not grow with viewers.
+
+    Encoded frames are cached per output profile, keyed by the capture
+    sequence number: each profile that has at least one viewer is encoded
+    at most once per new frame.
+    """
+    def __init__(self, camera_id, stream, pose_service):
+        self.camera_id = camera_id
+        self.stream = stream
+        self.pose_service = pose_service
+        self.running = False
+        self.thread = None
+
+        # Published output (protected by the condition)
+        # {profile: {"seq": capture seq, "version": publish counter, "jpeg": bytes}}
+        self.cond = threading.Condition()
+        self.version = 0
+        self.cache = {}
+        self.subscribers = {profile: 0 for profile in STREAM_PROFILES}
+
+        # Per-profile encoder state (pipeline thread only)
+        self.resize_buffers = {} # {profile: preallocated resized frame}
+        self.last_encode_time = {profile: 0 for profile in STREAM_PROFILES}
+        self.encoded_frames = {profile: 0 for profile in STREAM_PROFILES}
+
+        # Placeholder shown while the stream is (re)connecting
+        self.placeholder_interval = 1.0
+        self.last_placeholder_time = 0
+        self.placeholder_jpeg = None
+
+    def start(self):
+        if self.running:
+            return self
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"Pipeline_{self.camera_id}")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        # Wake up any viewer waiting for a frame so it can exit
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def _encode(self, profile, frame):
+        config = STREAM_PROFILES[profile]
+        h, w = frame.shape[:2]
+        width = config["width"]
+
+        if width and w > width:
+            size = (width, max(1, int(h * width / w)))
+            buffer = self.resize_buffers.get(profile)
+            if buffer is None or buffer.shape[:2] != (size[1], size[0]):
+                buffer = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+                self.resize_buffers[profile] = buffer
+            frame = cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_AREA)
+
+        ret, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config["quality"]])
+        if not ret:
+            return None
+        return encoded.tobytes()
+
+    def _publish_frame(self, seq, frame):
+        with self.cond:
+            watched = [p for p, count in self.subscribers.items() if count > 0]
+
+        now = time.time()
+        encoded = {}
+        for profile in watched:
+            max_fps = STREAM_PROFILES[profile]["max_fps"]
+            if max_fps and now - self.last_encode_time[profile] < 1.0 / max_fps:
+                continue
+            jpeg = self._encode(profile, frame)
+            if jpeg is not None:
+                encoded[profile] = jpeg
+                self.last_encode_time[profile] = now
+                self.encoded_frames[profile] += 1
+
+        if encoded:
+            self._publish(seq, encoded)
+
+    def _publish(self, seq, encoded):
+        with self.cond:
+            self.version += 1
+            for profile, jpeg in encoded.items():
+                self.cache[profile] = {"seq": seq, "version": self.version, "jpeg": jpeg}
+            self.cond.notify_all()
+
+    def _get_placeholder(self):
+        if self.placeholder_jpeg is None:
+            # Black blank frame 640x360
+            blank_frame = np.zeros((360, 640, 3), np.uint8)
+            ret, buffer = cv2.imencode('.jpg', blank_frame)
+            if ret:
+                self.placeholder_jpeg = buffer.tobytes()
+        return self.placeholder_jpeg
+
+    def _run(self):
+        last_seq = 0
+        work = None # Preallocated working copy we annotate (ring slots stay pristine)
+
+        while self.running and self.stream.running:
+            # Only genuinely new frames: no duplicate inference or encoding
+            seq, _, frame = self.stream.wait_for_next(last_seq, timeout=self.placeholder_interval)
+
+            if frame is None:
+                # Keep HTTP streams alive with a slow placeholder while reconnecting
+                now = time.time()
+                if not self.stream.connected and now - self.last_placeholder_time >= self.placeholder_interval:
+                    placeholder = self._get_placeholder()
+                    if placeholder is not None:
+                        self._publish(last_seq, {profile: placeholder for profile in STREAM_PROFILES})
+                    self.last_placeholder_time = now
+                continue
+            last_seq = seq
+
+            if work is None or work.shape != frame.shape:
+                work = np.empty_like(frame)
+            np.copyto(work, frame)
+            frame = work
+
+            try:
+                frame = self.pose_service.process_frame(frame)
+            except Exception as e:
+                print(f"[Pipeline] Vision processing error on Cam {self.camera_id}: {e}")
+
+            self._publish_frame(seq, frame)
+
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+
+    def wait_for_frame(self, profile, last_version, timeout=2.0):
+        """
+        Blocks until a frame newer than `last_version` is published for `profile`.
+        Returns (version, jpeg_bytes) or (last_version, None) on timeout/stop.
+        """
+        def current_version():
+            entry = self.cache.get(profile)
+            return entry["version"] if entry else 0
+
+        with self.cond:
+            self.cond.wait_for(lambda: current_version() != last_version or not self.running, timeout=timeout)
+            entry = self.cache.get(profile)
+            if entry is None or entry["version"] == last_version:
+                return last_version, None
+            return entry["version"], entry["jpeg"]
+
+    def subscribe(self, profile=DEFAULT_PROFILE):
+        """Generator yielding multipart MJPEG chunks for one viewer."""
+        if profile not in STREAM_PROFILES:
+            profile = DEFAULT_PROFILE
+
+        with self.cond:
+            self.subscribers[profile] += 1
+        try:
+            last_version = 0
+            while self.running:
+                last_version, jpeg = self.wait_for_frame(profile, last_version)
+                if jpeg is None:
+                    continue
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+        finally:
+            with self.cond:
+                self.subscribers[profile] -= 1
+
+    def get_stats(self):
+        with self.cond:
+            viewers = dict(self.subscribers)
+        return {
+            "viewers": viewers,
+            "encoded_frames": dict(self.encoded_frames)
+        }
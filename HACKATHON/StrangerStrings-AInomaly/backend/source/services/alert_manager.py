@@ -1,25 +1,52 @@
 import os
 import json
 import time
-import requests
-import threading
 import cv2
-import queue
 import uuid
+from collections import deque
 from datetime import datetime
 
+try:
+    from .recording_writer import RecordingWriter
+    from .alert_store import AlertHistoryStore
+    from .notification_dispatcher import NotificationDispatcher, DEFAULT_API_BASE
+    from .media_catalog import MediaCatalog
+except ImportError:
+    # Fallback for direct execution
+    from recording_writer import RecordingWriter
+    from alert_store import AlertHistoryStore
+    from notification_dispatcher import NotificationDispatcher, DEFAULT_API_BASE
+    from media_catalog import MediaCatalog
+
+RECORDING_FPS = 20.0
+RECORDING_JPEG_QUALITY = 90 # Buffered/queued clip frames are kept JPEG-encoded (~20x smaller than raw BGR)
+
 class AlertManager:
-    def __init__(self, settings_file="alerts_settings.json", history_file="alerts_history.json"):
+    def __init__(self, settings_file="alerts_settings.json", history_file="alerts_history.json", history_db="alerts_history.db", outbox_db="alerts_outbox.db", event_bus=None):
         self.settings_file = settings_file
-        self.history_file = history_file
-        self.notification_queue = queue.Queue()
+        self.history_file = history_file # Legacy JSON history, imported once into the DB
+        self.event_bus = event_bus # Pushes alerts to /events (SSE) clients
         self.settings = self._load_settings()
-        self.history = self._load_history()
+        self.history_store = AlertHistoryStore(history_db, legacy_json=history_file)
+
+        # Index of recordings/snapshots (scanned once, kept current on write/delete)
+        self.media_catalog = MediaCatalog(get_policy=lambda: self.settings).scan()
+
+        # Pooled, retrying Telegram delivery with a persistent outbox
+        self.dispatcher = NotificationDispatcher(
+            lambda: self.settings,
+            db_path=outbox_db,
+            workers=self.settings.get("dispatcher_workers", 4),
+            on_group_done=self._on_delivery_done
+        ).start()
         
         # State tracking
         self.camera_cooldowns = {} # {camera_id: last_alert_timestamp}
         self.ongoing_falls = {} # {camera_id: {start_time: float, alerted: bool}}
-        self.active_recordings = {} # {camera_id: {writer: cv2.VideoWriter, path: str, start_time: float}}
+        self.active_recordings = {} # {camera_id: {writer: RecordingWriter, path: str, start_time: float}}
+        self.pre_event_buffers = {} # {camera_id: deque of JPEG frames from the last N seconds}
+        self.last_frame_time = {} # {camera_id: timestamp of last sampled frame}
+        self.recording_stats = {"written": 0, "dropped": 0} # Totals of finished clips
         
     def _load_settings(self):
         defaults = {
@@ -30,7 +57,16 @@ class AlertManager:
             "cooldown": 60, 
             "attach_image": True,
             "save_snapshot": True,
-            "notification_duration": 5
+            "notification_duration": 5,
+            "pre_event_seconds": 3, # Seconds before the detection included in each clip
+            "recording_queue_size": 100, # Max frames waiting for the disk writer (raised to fit the pre-event buffer)
+            "recording_queue_mb": 64, # Max memory (JPEG frames) waiting for the disk writer, per clip
+            "telegram_api_base": DEFAULT_API_BASE, # Point to a local stand-in for testing
+            "dispatcher_workers": 4,
+            # Media retention (0 = unlimited, opt-in: limits delete existing clips)
+            "recordings_max_gb": 0,
+            "snapshots_max_gb": 0,
+            "media_max_age_days": 0
         }
 
         settings = defaults.copy()
@@ -92,36 +128,6 @@ class AlertManager:
         with open(self.settings_file, 'w') as f:
             json.dump(self.settings, f, indent=4)
 
-    def _load_history(self):
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r') as f:
-                    history = json.load(f)
-                    # Backfill IDs if missing
-                    modified = False
-                    for h in history:
-                        if "id" not in h:
-                            h["id"] = str(uuid.uuid4())
-                            modified = True
-                    
-                    if modified:
-                        # Save back immediately if we added IDs
-                        with open(self.history_file, 'w') as out:
-                            json.dump(history, out, indent=4)
-                            
-                    return history
-            except:
-                pass
-        return []
-
-    def _save_history(self):
-        # Keep last 100 alerts
-        if len(self.history) > 100:
-            self.history = self.history[-100:]
-            
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f, indent=4)
-
     def get_settings(self):
         return self.settings
 
@@ -130,9 +136,22 @@ class AlertManager:
         self._save_settings()
         return self.settings
 
-    def get_history(self):
-        # Sort by date desc
-        return sorted(self.history, key=lambda x: x['date'], reverse=True)
+    def get_history(self, limit=100, offset=0, **filters):
+        # Newest first, filtered by camera / event / date_from / date_to
+        return self.history_store.query(limit=limit, offset=offset, **filters)
+
+    def get_history_page(self, page=1, page_size=50, **filters):
+        page = max(1, page)
+        page_size = max(1, min(page_size, 500))
+        total = self.history_store.count(**filters)
+        items = self.history_store.query(limit=page_size, offset=(page - 1) * page_size, **filters)
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size
+        }
 
 
     def discover_users(self, token=None):
@@ -142,8 +161,8 @@ class AlertManager:
             
         users = {}
         try:
-            url = f"https://api.telegram.org/bot{token}/getUpdates"
-            response = requests.get(url, timeout=10)
+            url = f"{self._api_base()}/bot{token}/getUpdates"
+            response = self.dispatcher.session.get(url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("ok"):
@@ -173,8 +192,8 @@ class AlertManager:
 
     def _fetch_chat_id(self, token):
         try:
-            url = f"https://api.telegram.org/bot{token}/getUpdates"
-            response = requests.get(url, timeout=10)
+            url = f"{self._api_base()}/bot{token}/getUpdates"
+            response = self.dispatcher.session.get(url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("ok") and data.get("result"):
@@ -188,18 +207,21 @@ class AlertManager:
             print(f"Error fetching updates: {e}")
         return None
 
+    def _api_base(self):
+        return (self.settings.get("telegram_api_base") or DEFAULT_API_BASE).rstrip("/")
+
     def _send_telegram_msg(self, token, chat_id, text, image=None):
         try:
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
+            url = f"{self._api_base()}/bot{token}/sendMessage"
             data = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
             
             if image is not None:
-                url = f"https://api.telegram.org/bot{token}/sendPhoto"
+                url = f"{self._api_base()}/bot{token}/sendPhoto"
                 files = {'photo': image}
                 data = {"chat_id": chat_id, "caption": text, "parse_mode": "HTML"}
-                response = requests.post(url, data=data, files=files, timeout=10)
+                response = self.dispatcher.session.post(url, data=data, files=files, timeout=10)
             else:
-                response = requests.post(url, data=data, timeout=10)
+                response = self.dispatcher.session.post(url, data=data, timeout=10)
                 
             if response.status_code == 200:
                 return True, "Enviado"
@@ -270,6 +292,17 @@ class AlertManager:
             f"<b>Hora:</b> {timestamp}\n"
         )
 
+        # Live notification for the desktop app
+        if self.event_bus:
+            self.event_bus.publish({
+                "type": "alert",
+                "camera_id": camera_id,
+                "camera": camera_name,
+                "message": event_type,
+                "confidence": confidence,
+                "duration": self.settings.get("notification_duration", 5)
+            })
+
         image_bytes = None
         snapshot_path = None
         
@@ -288,13 +321,12 @@ class AlertManager:
                          snapshot_path = os.path.join(snapshots_dir, filename)
                          with open(snapshot_path, "wb") as f:
                              f.write(image_bytes)
+                         self.media_catalog.add("snapshots", snapshot_path)
             except Exception as e:
                 print(f"Error preparing snapshot: {e}")
 
-        # Send in background thread to not block vision loop
-        threading.Thread(target=self._dispatch_alert, 
-                         args=(msg, image_bytes, camera_id, camera_name, event_type, snapshot_path)
-        ).start()
+        # Queue for the dispatcher pool (never blocks the vision loop)
+        self._dispatch_alert(msg, image_bytes, camera_id, camera_name, event_type, snapshot_path)
 
     def _dispatch_alert(self, msg, image_bytes, camera_id, camera_name, event_type, snapshot_path):
         token = self.settings.get("telegram_token")
@@ -304,37 +336,42 @@ class AlertManager:
             print("[AlertManager] No token/chat_ids configured.")
             return
 
-        # Send to all recipients
-        any_success = False
-        details_log = []
-        
-        for chat_id in chat_ids:
-            success, response_text = self._send_telegram_msg(token, chat_id, msg, image_bytes)
-            if success:
-                any_success = True
-            details_log.append(f"{chat_id}: {'OK' if success else 'ERR'}")
-
-        # Log to history
+        # Log to history right away; the status is filled in once every
+        # recipient has been delivered (or gave up after retries)
         entry = {
             "id": str(uuid.uuid4()),
             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "camera": camera_name,
             "event": event_type,
-            "status": "Enviado" if any_success else "Fallido",
-            "details": ", ".join(details_log),
+            "status": "Pendiente",
+            "details": "",
             "snapshot": snapshot_path
         }
-        self.history.append(entry)
-        self._save_history()
-        print(f"[AlertManager] Alerta procesada. Enviada a {len(chat_ids)} destinatarios.")
+        self.history_store.add(entry)
+
+        if image_bytes is not None:
+            self.dispatcher.submit(entry["id"], "sendPhoto", chat_ids,
+                                   {"caption": msg, "parse_mode": "HTML"},
+                                   file_field="photo", file_bytes=image_bytes)
+        else:
+            self.dispatcher.submit(entry["id"], "sendMessage", chat_ids,
+                                   {"text": msg, "parse_mode": "HTML"})
+        print(f"[AlertManager] Alerta en cola para {len(chat_ids)} destinatarios.")
+
+    def _on_delivery_done(self, group_id, results):
+        """Dispatcher callback once all recipients of a notification finished."""
+        any_success = any(ok for _, ok, _ in results)
+        details = ", ".join(f"{chat_id}: {'OK' if ok else 'ERR'}" for chat_id, ok, _ in results)
+
+        if group_id.startswith("video:"):
+            print(f"[AlertManager] Video enviado a Telegram ({details}).")
+            return
+
+        self.history_store.update(group_id, status="Enviado" if any_success else "Fallido", details=details)
+        print(f"[AlertManager] Alerta procesada. Enviada a {len(results)} destinatarios.")
 
     def delete_alert(self, alert_id):
-        initial_len = len(self.history)
-        self.history = [a for a in self.history if a.get("id") != alert_id]
-        if len(self.history) < initial_len:
-            self._save_history()
-            return True
-        return False
+        return self.history_store.delete(alert_id)
 
     def start_recording(self, camera_id, frame):
         if not self.settings.get("enabled", False):
@@ -353,59 +390,98 @@ class AlertManager:
             filename = f"event_{camera_id}_{timestamp}.mp4"
             filepath = os.path.join(recordings_dir, filename)
             
-            height, width = frame.shape[:2]
-            # 'avc1' is H.264, best for HTML5/Electron playback. 
-            # If this fails, try 'vp80' or 'mp4v' (but mp4v often fails in browser)
-            try:
-                fourcc = cv2.VideoWriter_fourcc(*'avc1') 
-                writer = cv2.VideoWriter(filepath, fourcc, 20.0, (width, height))
-                if not writer.isOpened():
-                    # Fallback if avc1 is not supported on this OS
-                    print("[AlertManager] H.264 codec not found, falling back to mp4v")
-                    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                    writer = cv2.VideoWriter(filepath, fourcc, 20.0, (width, height))
-            except:
-                 fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                 writer = cv2.VideoWriter(filepath, fourcc, 20.0, (width, height))
+            # The whole pre-event buffer is queued at once: the queue must hold it
+            # (plus a second of live frames) or drop-oldest would discard it unwritten
+            pre_event = self.pre_event_buffers.pop(camera_id, None)
+            max_queue = max(self.settings.get("recording_queue_size", 100),
+                            len(pre_event or []) + int(RECORDING_FPS))
+
+            # The writer opens the file (and probes codecs) on its own thread
+            writer = RecordingWriter(
+                filepath,
+                fps=RECORDING_FPS,
+                max_queue=max_queue,
+                max_queue_bytes=int(self.settings.get("recording_queue_mb", 64) * 1024 * 1024)
+            ).start()
+
+            # Pre-event buffer first, so the clip shows the moments before the fall
+            if pre_event:
+                for buffered in pre_event:
+                    writer.write(buffered)
+            elif frame is not None:
+                writer.write(self._encode_frame(frame))
             
             self.active_recordings[camera_id] = {
                 "writer": writer,
                 "path": filepath,
-                "start_time": time.time(),
-                "frames": 0
+                "start_time": time.time()
             }
             print(f"[AlertManager] Recording started for {camera_id}: {filepath}")
         except Exception as e:
             print(f"[AlertManager] Failed to start recording: {e}")
 
     def write_frame(self, camera_id, frame):
-        if camera_id in self.active_recordings:
-            try:
-                rec = self.active_recordings[camera_id]
-                rec["writer"].write(frame)
-                rec["frames"] += 1
-            except Exception as e:
-                print(f"Error writing frame: {e}")
+        if not self.settings.get("enabled", False) or frame is None:
+            return
+
+        # Sample at the clip frame rate so recordings play back in real time
+        now = time.time()
+        if now - self.last_frame_time.get(camera_id, 0) < 1.0 / RECORDING_FPS:
+            return
+        self.last_frame_time[camera_id] = now
+
+        # The caller reuses its frame buffer: keep our own (compressed) copy
+        frame = self._encode_frame(frame)
+        if frame is None:
+            return
+
+        rec = self.active_recordings.get(camera_id)
+        if rec:
+            rec["writer"].write(frame)
+            return
+
+        buffer = self.pre_event_buffers.get(camera_id)
+        max_frames = int(self.settings.get("pre_event_seconds", 3) * RECORDING_FPS)
+        if buffer is None or buffer.maxlen != max_frames:
+            buffer = deque(buffer or [], maxlen=max_frames)
+            self.pre_event_buffers[camera_id] = buffer
+        if max_frames > 0:
+            buffer.append(frame)
+
+    @staticmethod
+    def _encode_frame(frame):
+        """JPEG copy of a BGR frame for the pre-event buffer / writer queue (decoded by the writer)."""
+        success, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, RECORDING_JPEG_QUALITY])
+        return buffer if success else None
 
     def stop_recording(self, camera_id, camera_name="Cámara"):
         if camera_id not in self.active_recordings:
             return
 
         rec = self.active_recordings.pop(camera_id)
-        try:
-            rec["writer"].release()
-            duration = time.time() - rec["start_time"]
-            print(f"[AlertManager] Recording stopped for {camera_id}. Duration: {duration:.1f}s")
+
+        def on_finished(writer):
+            self.recording_stats["written"] += writer.written
+            self.recording_stats["dropped"] += writer.dropped
+            print(f"[AlertManager] Recording stopped for {camera_id}. Duration: {writer.duration:.1f}s "
+                  f"({writer.written} frames, {writer.dropped} dropped)")
+            self.media_catalog.add("recordings", writer.filepath)
             
             # Send via Telegram
-            self._send_video_alert(rec["path"], camera_name, duration)
-        except Exception as e:
-            print(f"[AlertManager] Error stopping recording: {e}")
+            self._send_video_alert(writer.filepath, camera_name, writer.duration)
 
-    def _send_video_alert(self, filepath, camera_name, duration):
-        threading.Thread(target=self._dispatch_video, args=(filepath, camera_name, duration)).start()
+        # Flushing and closing the file happens on the writer thread
+        rec["writer"].on_finished = on_finished
+        rec["writer"].close()
+
+    def get_recording_stats(self):
+        return {
+            "written": self.recording_stats["written"],
+            "dropped": self.recording_stats["dropped"],
+            "active": {cam_id: rec["writer"].get_stats() for cam_id, rec in list(self.active_recordings.items())}
+        }
 
-    def _dispatch_video(self, filepath, camera_name, duration):
+    def _send_video_alert(self, filepath, camera_name, duration):
         token = self.settings.get("telegram_token")
         chat_ids = self.settings.get("telegram_chat_ids", [])
         
@@ -414,14 +490,7 @@ class AlertManager:
             
         msg = f"🎥 <b>Evento Registrado</b>\n<b>Cámara:</b> {camera_name}\n<b>Duración:</b> {duration:.1f}s"
         
-        try:
-            with open(filepath, 'rb') as video:
-                files = {'video': video}
-                for chat_id in chat_ids:
-                    video.seek(0) 
-                    url = f"https://api.telegram.org/bot{token}/sendVideo"
-                    data = {"chat_id": chat_id, "caption": msg, "parse_mode": "HTML"}
-                    requests.post(url, data=data, files={'video': video}, timeout=60)
-            print(f"[AlertManager] Video enviado a Telegram.")
-        except Exception as e:
-            print(f"[AlertManager] Error enviando video: {e}")
+        # Video is read from disk at send time (not copied into the outbox)
+        self.dispatcher.submit(f"video:{uuid.uuid4()}", "sendVideo", chat_ids,
+                               {"caption": msg, "parse_mode": "HTML"},
+                               file_field="video", file_path=filepath)
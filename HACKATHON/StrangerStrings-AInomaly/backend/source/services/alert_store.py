@@ -0,0 +1,132 @@
+import os
+import json
+import sqlite3
+import threading
+import uuid
+
+class AlertHistoryStore:
+    """
+    Embedded SQLite store for the alert history.
+    Inserts are O(1) (no full-file rewrite, no 100 alert cap) and queries
+    use indexes on date, camera and event type, so months of history from
+    many cameras stay fast to filter and paginate.
+    Dates are stored as "YYYY-MM-DD HH:MM:SS" strings, which sort correctly.
+    """
+    COLUMNS = ("id", "date", "camera", "event", "status", "details", "snapshot")
+
+    def __init__(self, db_path="alerts_history.db", legacy_json="alerts_history.json"):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._migrate_json(legacy_json)
+
+    def _create_schema(self):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id TEXT PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    camera TEXT,
+                    event TEXT,
+                    status TEXT,
+                    details TEXT,
+                    snapshot TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_date ON alerts(date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_camera_date ON alerts(camera, date)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_event_date ON alerts(event, date)")
+
+    def _migrate_json(self, legacy_json):
+        """One-time import of the old alerts_history.json (tracked with user_version)."""
+        with self.lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= 1:
+            return
+
+        imported = 0
+        if legacy_json and os.path.exists(legacy_json):
+            try:
+                with open(legacy_json, 'r') as f:
+                    history = json.load(f)
+                for h in history:
+                    # Backfill IDs if missing
+                    h.setdefault("id", str(uuid.uuid4()))
+                self.add_many(history)
+                imported = len(history)
+            except Exception as e:
+                print(f"[AlertHistoryStore] Could not import {legacy_json}: {e}")
+
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA user_version = 1")
+        if imported:
+            print(f"[AlertHistoryStore] Imported {imported} alerts from {legacy_json}")
+
+    def _row(self, entry):
+        return tuple(entry.get(col) for col in self.COLUMNS)
+
+    def add(self, entry):
+        self.add_many([entry])
+
+    def add_many(self, entries):
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO alerts ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                [self._row(e) for e in entries]
+            )
+
+    def update(self, alert_id, **fields):
+        fields = {k: v for k, v in fields.items() if k in self.COLUMNS and k != "id"}
+        if not fields:
+            return False
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self.lock, self.conn:
+            cur = self.conn.execute(f"UPDATE alerts SET {assignments} WHERE id = ?", (*fields.values(), alert_id))
+        return cur.rowcount > 0
+
+    def delete(self, alert_id):
+        with self.lock, self.conn:
+            cur = self.conn.execute("DELETE FROM alerts WHERE id = ?", (alert_id,))
+        return cur.rowcount > 0
+
+    def _where(self, camera=None, event=None, date_from=None, date_to=None):
+        clauses, params = [], []
+        if camera:
+            clauses.append("camera = ?")
+            params.append(camera)
+        if event:
+            clauses.append("event = ?")
+            params.append(event)
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            # A bare day ("2025-01-31") includes the whole day
+            if len(date_to) == 10:
+                date_to += " 23:59:59"
+            clauses.append("date <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self, limit=100, offset=0, **filters):
+        """Newest first. Filters: camera, event, date_from, date_to."""
+        where, params = self._where(**filters)
+        sql = f"SELECT * FROM alerts {where} ORDER BY date DESC LIMIT ? OFFSET ?"
+        with self.lock:
+            rows = self.conn.execute(sql, (*params, int(limit), int(offset))).fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM alerts {where}", params).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from collections import deque
+
+class Subscriber:
+    def __init__(self, queue_size, last_id):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.last_id = last_id
+        self.dropped = 0
+
+class EventBus:
+    """
+    Push-based pub/sub for the /events SSE endpoint.
+    - publish() is thread-safe (vision, alert and capture threads call it)
+    - every subscriber gets EVERY event through its own bounded queue
+      (a slow client loses its oldest events, it never blocks the others)
+    - a small replay buffer lets clients resume from Last-Event-ID
+    """
+    def __init__(self, replay_size=200, queue_size=100):
+        self.queue_size = queue_size
+        self.replay = deque(maxlen=replay_size) # [(id, event)]
+        self.next_id = 1
+        self.lock = threading.Lock()
+        self.loop = None
+        self.subscribers = set()
+
+    def publish(self, event):
+        """Publish a dict from any thread. Returns the event id."""
+        with self.lock:
+            event_id = self.next_id
+            self.next_id += 1
+            self.replay.append((event_id, event))
+            loop = self.loop
+
+        if loop is not None and not loop.is_closed():
+            # Wake the event loop right away: no polling delay
+            loop.call_soon_threadsafe(self._fanout, event_id, event)
+        return event_id
+
+    def _fanout(self, event_id, event):
+        # Runs on the event loop thread
+        for sub in list(self.subscribers):
+            self._deliver(sub, event_id, event)
+
+    def _deliver(self, sub, event_id, event):
+        if event_id <= sub.last_id:
+            return # Already delivered through the replay
+        if sub.queue.full():
+            sub.queue.get_nowait()
+            sub.dropped += 1
+        sub.queue.put_nowait((event_id, event))
+        sub.last_id = event_id
+
+    async def subscribe(self, last_event_id=None):
+        """
+        Register a client. If `last_event_id` is given, buffered events newer
+        than it are queued first (resume after reconnect). Ids newer than the
+        last published one are ignored.
+        """
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.get_running_loop()
+            backlog = list(self.replay)
+            current = self.next_id - 1
+
+        if last_event_id is None or last_event_id > current:
+            # An id from the future comes from before a backend restart (the
+            # counter started over): treat it as a fresh subscription
+            sub = Subscriber(self.queue_size, current)
+        else:
+            sub = Subscriber(self.queue_size, last_event_id)
+            for event_id, event in backlog:
+                self._deliver(sub, event_id, event)
+
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+
+    def get_stats(self):
+        return {
+            "subscribers": len(self.subscribers),
+            "last_event_id": self.next_id - 1,
+            "replay_size": len(self.replay)
+        }
@@ -0,0 +1,167 @@
+import os
+import bisect
+import threading
+import time
+from datetime import datetime
+
+# kind -> (directory, extension)
+MEDIA_KINDS = {
+    "recordings": ("recordings", ".mp4"),
+    "snapshots": ("snapshots", ".jpg"),
+}
+
+class MediaCatalog:
+    """
+    In-process index of recordings and snapshots.
+    Directories are scanned ONCE at startup; afterwards AlertManager and the
+    delete endpoints keep it current, so listings never glob/stat the disk.
+    Entries are kept sorted by creation time for cheap date-range pages.
+
+    `get_policy()` returns the retention settings:
+      recordings_max_gb / snapshots_max_gb (0 = unlimited)
+      media_max_age_days (0 = keep forever)
+    """
+    def __init__(self, kinds=None, get_policy=None):
+        self.kinds = kinds or MEDIA_KINDS
+        self.get_policy = get_policy or (lambda: {})
+        self.lock = threading.RLock()
+        self.entries = {kind: {} for kind in self.kinds} # {kind: {name: {"name", "size", "ctime"}}}
+        self.order = {kind: [] for kind in self.kinds} # {kind: sorted [(ctime, name)]}
+        self.total_bytes = {kind: 0 for kind in self.kinds}
+        self.deleted_by_retention = 0
+
+    def scan(self):
+        """Index every existing file (startup only)."""
+        with self.lock:
+            for kind, (directory, ext) in self.kinds.items():
+                self.entries[kind].clear()
+                self.order[kind] = []
+                self.total_bytes[kind] = 0
+                os.makedirs(directory, exist_ok=True)
+                with os.scandir(directory) as it:
+                    for de in it:
+                        if de.is_file() and de.name.lower().endswith(ext):
+                            stats = de.stat()
+                            self._insert(kind, de.name, stats.st_size, stats.st_ctime)
+        self.enforce_retention()
+        return self
+
+    def _insert(self, kind, name, size, ctime):
+        if name in self.entries[kind]:
+            self._discard(kind, name)
+        self.entries[kind][name] = {"name": name, "size": size, "ctime": ctime}
+        bisect.insort(self.order[kind], (ctime, name))
+        self.total_bytes[kind] += size
+
+    def _discard(self, kind, name):
+        entry = self.entries[kind].pop(name, None)
+        if entry is None:
+            return None
+        order = self.order[kind]
+        i = bisect.bisect_left(order, (entry["ctime"], name))
+        if i < len(order) and order[i] == (entry["ctime"], name):
+            del order[i]
+        self.total_bytes[kind] -= entry["size"]
+        return entry
+
+    def path(self, kind, name):
+        return os.path.join(self.kinds[kind][0], os.path.basename(name))
+
+    def add(self, kind, path):
+        """Register a file just written by the application."""
+        try:
+            stats = os.stat(path)
+        except OSError:
+            return
+        with self.lock:
+            self._insert(kind, os.path.basename(path), stats.st_size, stats.st_ctime)
+        self.enforce_retention(kind)
+
+    def delete(self, kind, name):
+        """Delete the file and its index entry. Returns True if the file existed."""
+        name = os.path.basename(name)
+        file_path = self.path(kind, name)
+        existed = os.path.exists(file_path)
+        if existed:
+            os.remove(file_path)
+        with self.lock:
+            self._discard(kind, name)
+        return existed
+
+    def list(self, kind, page=1, page_size=None, date_from=None, date_to=None):
+        """
+        Newest first. `date_from`/`date_to` are "YYYY-MM-DD[ HH:MM[:SS]]" strings.
+        Returns (items, total) where total counts every match in the range.
+        """
+        lo_ts = self._parse_date(date_from, end=False) if date_from else float("-inf")
+        hi_ts = self._parse_date(date_to, end=True) if date_to else float("inf")
+
+        with self.lock:
+            order = self.order[kind]
+            lo = bisect.bisect_left(order, (lo_ts, ""))
+            hi = bisect.bisect_right(order, (hi_ts, "\uffff"))
+            total = max(0, hi - lo)
+
+            if page_size:
+                start = hi - (max(1, page) - 1) * page_size
+                stop = max(lo, start - page_size)
+            else:
+                start, stop = hi, lo
+            items = [dict(self.entries[kind][name]) for _, name in reversed(order[stop:max(stop, start)])]
+        return items, total
+
+    @staticmethod
+    def _parse_date(value, end):
+        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            ts = parsed.timestamp()
+            if end and fmt == "%Y-%m-%d":
+                ts += 86400 - 1e-6 # Whole day
+            return ts
+        raise ValueError(f"Invalid date: {value}")
+
+    def enforce_retention(self, kind=None):
+        """Delete the oldest files while over the age limit or the disk quota."""
+        policy = self.get_policy()
+        max_age_days = policy.get("media_max_age_days", 0) or 0
+        now = time.time()
+
+        for k in ([kind] if kind else list(self.kinds)):
+            max_bytes = (policy.get(f"{k}_max_gb", 0) or 0) * (1024 ** 3)
+            while True:
+                with self.lock:
+                    order = self.order[k]
+                    if not order:
+                        break
+                    ctime, name = order[0]
+                    too_old = max_age_days and now - ctime > max_age_days * 86400
+                    over_quota = max_bytes and self.total_bytes[k] > max_bytes
+                    if not (too_old or over_quota):
+                        break
+                try:
+                    self.delete(k, name)
+                except OSError as e:
+                    print(f"[MediaCatalog] Could not delete {name}: {e}")
+                    with self.lock:
+                        self._discard(k, name)
+                self.deleted_by_retention += 1
+                print(f"[MediaCatalog] Retention: removed {k}/{name}")
+
+    def get_stats(self):
+        policy = self.get_policy()
+        with self.lock:
+            stats = {}
+            for kind in self.kinds:
+                max_gb = policy.get(f"{kind}_max_gb", 0) or 0
+                stats[kind] = {
+                    "count": len(self.entries[kind]),
+                    "bytes": self.total_bytes[kind],
+                    "size_mb": round(self.total_bytes[kind] / (1024 * 1024), 1),
+                    "quota_gb": max_gb,
+                    "quota_percent": round(self.total_bytes[kind] / (max_gb * 1024 ** 3) * 100, 1) if max_gb else None
+                }
+            stats["deleted_by_retention"] = self.deleted_by_retention
+            return stats
@@ -0,0 +1,265 @@
+import heapq
+import json
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_API_BASE = "https://api.telegram.org"
+
+class NotificationDispatcher:
+    """
+    Fixed-size worker pool for Telegram deliveries.
+    - One job per (notification, recipient): recipients are sent in parallel
+    - Shared keep-alive requests.Session (connection pooling)
+    - Retry with exponential backoff + jitter (honours 429 retry_after)
+    - Persistent SQLite outbox: queued deliveries survive restarts
+
+    `get_settings()` must return the alert settings dict; the bot token and
+    "telegram_api_base" (point it to a local stand-in for testing) are read
+    from it at send time.
+    `on_group_done(group_id, results)` is called once every recipient of a
+    notification reached a final state. results = [(chat_id, ok, detail)].
+    """
+    def __init__(self, get_settings, db_path="alerts_outbox.db", workers=4,
+                 max_attempts=5, base_delay=1.0, max_delay=60.0, timeout=30, on_group_done=None):
+        self.get_settings = get_settings
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.on_group_done = on_group_done
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_id TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    chat_id TEXT NOT NULL,
+                    data TEXT,
+                    file_field TEXT,
+                    file_path TEXT,
+                    file_blob BLOB,
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt REAL DEFAULT 0,
+                    state TEXT DEFAULT 'pending',
+                    result TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_group ON outbox(group_id, state)")
+
+        # In-memory schedule of pending deliveries: heap of (next_attempt, job_id)
+        self.schedule = []
+        self.cond = threading.Condition()
+        self.running = False
+        self.threads = []
+
+        # Metrics
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+
+    def start(self):
+        if self.running:
+            return self
+
+        # Reload deliveries left over from a previous run
+        with self.db_lock:
+            rows = self.conn.execute("SELECT id, next_attempt FROM outbox WHERE state = 'pending'").fetchall()
+        with self.cond:
+            for job_id, next_attempt in rows:
+                heapq.heappush(self.schedule, (next_attempt, job_id))
+        if rows:
+            print(f"[Dispatcher] Resuming {len(rows)} queued deliveries from outbox.")
+
+        # Groups whose recipients all finished before the restart
+        with self.db_lock:
+            groups = [r[0] for r in self.conn.execute(
+                "SELECT DISTINCT group_id FROM outbox WHERE group_id NOT IN "
+                "(SELECT group_id FROM outbox WHERE state = 'pending')").fetchall()]
+        for group_id in groups:
+            self._finish_group(group_id)
+
+        self.running = True
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, daemon=True, name=f"Dispatcher_{i}")
+            t.start()
+            self.threads.append(t)
+        return self
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        for t in self.threads:
+            t.join(timeout=1.0)
+
+    def submit(self, group_id, method, chat_ids, data, file_field=None, file_path=None, file_bytes=None):
+        """
+        Queue a Telegram API call (sendMessage, sendPhoto, sendVideo...) for
+        every chat_id. The file is either raw bytes (stored in the outbox) or
+        a path read at send time.
+        """
+        now = time.time()
+        payload = json.dumps(data)
+        with self.db_lock, self.conn:
+            job_ids = []
+            for chat_id in chat_ids:
+                cur = self.conn.execute(
+                    "INSERT INTO outbox (group_id, method, chat_id, data, file_field, file_path, file_blob, next_attempt) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (group_id, method, str(chat_id), payload, file_field, file_path, file_bytes, now)
+                )
+                job_ids.append(cur.lastrowid)
+
+        with self.cond:
+            for job_id in job_ids:
+                heapq.heappush(self.schedule, (now, job_id))
+            self.cond.notify_all()
+        return len(job_ids)
+
+    def _next_job(self):
+        with self.cond:
+            while self.running:
+                if self.schedule:
+                    due, job_id = self.schedule[0]
+                    wait = due - time.time()
+                    if wait <= 0:
+                        heapq.heappop(self.schedule)
+                        return job_id
+                    self.cond.wait(wait)
+                else:
+                    self.cond.wait()
+        return None
+
+    def _worker(self):
+        while self.running:
+            job_id = self._next_job()
+            if job_id is None:
+                continue
+            try:
+                self._process(job_id)
+            except Exception as e:
+                print(f"[Dispatcher] Unexpected error on job {job_id}: {e}")
+
+    def _post(self, method, chat_id, data, file_field, file_path, file_blob):
+        settings = self.get_settings()
+        token = settings.get("telegram_token")
+        if not token:
+            return False, False, "No token configured", None
+
+        api_base = settings.get("telegram_api_base") or DEFAULT_API_BASE
+        url = f"{api_base.rstrip('/')}/bot{token}/{method}"
+        data = dict(data, chat_id=chat_id)
+
+        handle = None
+        try:
+            files = None
+            if file_field and file_blob is not None:
+                files = {file_field: bytes(file_blob)}
+            elif file_field and file_path:
+                handle = open(file_path, 'rb')
+                files = {file_field: handle}
+
+            response = self.session.post(url, data=data, files=files, timeout=self.timeout)
+        except FileNotFoundError as e:
+            return False, False, str(e), None # Nothing to retry
+        except requests.RequestException as e:
+            return False, True, str(e), None
+        finally:
+            if handle:
+                handle.close()
+
+        if response.status_code == 200:
+            return True, False, "OK", None
+
+        retry_after = None
+        if response.status_code == 429:
+            try:
+                retry_after = response.json().get("parameters", {}).get("retry_after")
+            except ValueError:
+                pass
+        # Rate limits and server errors are transient; other 4xx are not
+        retryable = response.status_code == 429 or response.status_code >= 500
+        return False, retryable, f"Error API {response.status_code}: {response.text[:200]}", retry_after
+
+    def _process(self, job_id):
+        with self.db_lock:
+            row = self.conn.execute(
+                "SELECT group_id, method, chat_id, data, file_field, file_path, file_blob, attempts "
+                "FROM outbox WHERE id = ? AND state = 'pending'", (job_id,)
+            ).fetchone()
+        if row is None:
+            return
+
+        group_id, method, chat_id, data, file_field, file_path, file_blob, attempts = row
+        ok, retryable, detail, retry_after = self._post(method, chat_id, json.loads(data or "{}"),
+                                                        file_field, file_path, file_blob)
+        attempts += 1
+
+        if not ok and retryable and attempts < self.max_attempts:
+            delay = retry_after or min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+            delay *= random.uniform(1.0, 1.5) # Jitter avoids synchronized retry storms
+            next_attempt = time.time() + delay
+            with self.db_lock, self.conn:
+                self.conn.execute("UPDATE outbox SET attempts = ?, next_attempt = ?, result = ? WHERE id = ?",
+                                  (attempts, next_attempt, detail, job_id))
+            with self.cond:
+                heapq.heappush(self.schedule, (next_attempt, job_id))
+                self.cond.notify()
+            self.retries += 1
+            print(f"[Dispatcher] {method} to {chat_id} failed ({detail}). Retry {attempts} in {delay:.1f}s")
+            return
+
+        state = "sent" if ok else "failed"
+        if ok:
+            self.sent += 1
+        else:
+            self.failed += 1
+        with self.db_lock, self.conn:
+            self.conn.execute("UPDATE outbox SET attempts = ?, state = ?, result = ?, file_blob = NULL WHERE id = ?",
+                              (attempts, state, detail, job_id))
+            remaining = self.conn.execute("SELECT COUNT(*) FROM outbox WHERE group_id = ? AND state = 'pending'",
+                                          (group_id,)).fetchone()[0]
+        if remaining == 0:
+            self._finish_group(group_id)
+
+    def _finish_group(self, group_id):
+        with self.db_lock, self.conn:
+            rows = self.conn.execute("SELECT chat_id, state, result FROM outbox WHERE group_id = ?",
+                                     (group_id,)).fetchall()
+            # Only one worker gets to report the group
+            deleted = self.conn.execute("DELETE FROM outbox WHERE group_id = ? AND state != 'pending'",
+                                        (group_id,)).rowcount
+        if not rows or deleted == 0:
+            return
+
+        if self.on_group_done:
+            try:
+                self.on_group_done(group_id, [(chat_id, state == "sent", result) for chat_id, state, result in rows])
+            except Exception as e:
+                print(f"[Dispatcher] Error in group callback for {group_id}: {e}")
+
+    def get_stats(self):
+        with self.cond:
+            queued = len(self.schedule)
+        return {
+            "workers": self.workers,
+            "queued": queued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries
+        }
@@ -0,0 +1,124 @@
+import cv2
+import threading
+import time
+from collections import deque
+
+class RecordingWriter:
+    """
+    Dedicated writer thread for one event clip.
+    The vision path only appends frames to a bounded queue; opening the
+    VideoWriter (codec probing) and encoding to disk happen here, so disk
+    or codec stalls never slow down the camera. When the queue is full the
+    OLDEST frame is dropped (backpressure without blocking the producer).
+
+    Frames are BGR arrays or JPEG buffers (1-D uint8, decoded here). The queue
+    is bounded both in frames (`max_queue`) and in bytes (`max_queue_bytes`).
+    """
+    def __init__(self, filepath, fps=20.0, max_queue=100, max_queue_bytes=64 * 1024 * 1024, on_finished=None):
+        self.filepath = filepath
+        self.fps = fps
+        self.max_queue = max_queue
+        self.max_queue_bytes = max_queue_bytes
+        self.on_finished = on_finished
+
+        self.queue = deque()
+        self.queued_bytes = 0
+        self.cond = threading.Condition()
+        self.closed = False
+        self.thread = None
+        self.writer = None
+
+        # Metrics
+        self.written = 0
+        self.dropped = 0
+        self.start_time = time.time()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"RecordingWriter_{self.filepath}")
+        self.thread.start()
+        return self
+
+    def write(self, frame):
+        """Non-blocking. `frame` must not be modified by the caller afterwards."""
+        if frame is None:
+            return
+        with self.cond:
+            if self.closed:
+                return
+            while self.queue and (len(self.queue) >= self.max_queue or
+                                  self.queued_bytes + frame.nbytes > self.max_queue_bytes):
+                self.queued_bytes -= self.queue.popleft().nbytes
+                self.dropped += 1
+            self.queue.append(frame)
+            self.queued_bytes += frame.nbytes
+            self.cond.notify()
+
+    def close(self):
+        """Non-blocking: the thread flushes the queue, releases the file and calls on_finished."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def _open(self, frame):
+        height, width = frame.shape[:2]
+        # 'avc1' is H.264, best for HTML5/Electron playback.
+        # If this fails, try 'vp80' or 'mp4v' (but mp4v often fails in browser)
+        try:
+            fourcc = cv2.VideoWriter_fourcc(*'avc1')
+            writer = cv2.VideoWriter(self.filepath, fourcc, self.fps, (width, height))
+            if not writer.isOpened():
+                # Fallback if avc1 is not supported on this OS
+                print("[RecordingWriter] H.264 codec not found, falling back to mp4v")
+                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                writer = cv2.VideoWriter(self.filepath, fourcc, self.fps, (width, height))
+        except:
+             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+             writer = cv2.VideoWriter(self.filepath, fourcc, self.fps, (width, height))
+        return writer
+
+    def _run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue or self.closed)
+                if not self.queue and self.closed:
+                    break
+                frame = self.queue.popleft()
+                self.queued_bytes -= frame.nbytes
+
+            try:
+                if frame.ndim == 1:
+                    frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+                if self.writer is None:
+                    self.writer = self._open(frame)
+                self.writer.write(frame)
+                self.written += 1
+            except Exception as e:
+                print(f"[RecordingWriter] Error writing frame: {e}")
+
+        try:
+            if self.writer is not None:
+                self.writer.release()
+        except Exception as e:
+            print(f"[RecordingWriter] Error releasing {self.filepath}: {e}")
+
+        if self.on_finished:
+            try:
+                self.on_finished(self)
+            except Exception as e:
+                print(f"[RecordingWriter] Error in finish callback: {e}")
+
+    @property
+    def duration(self):
+        return self.written / self.fps if self.fps else 0.0
+
+    def get_stats(self):
+        with self.cond:
+            queued = len(self.queue)
+            queued_bytes = self.queued_bytes
+        return {
+            "path": self.filepath,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": queued,
+            "queued_mb": round(queued_bytes / (1024 * 1024), 1)
+        }
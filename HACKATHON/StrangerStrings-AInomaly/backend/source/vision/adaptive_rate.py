@@ -0,0 +1,138 @@
+import cv2
+import psutil
+import threading
+import time
+from collections import deque
+
+class MotionGate:
+    """
+    Cheap frame-difference gate: compares a tiny grayscale version of the
+    frame against the one seen at the previous check. Lets us skip YOLO on
+    static scenes (empty hallway).
+    """
+    def __init__(self, width=64, pixel_threshold=25, motion_ratio=0.01):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.motion_ratio = motion_ratio
+        self.prev = None
+
+    def check(self, frame):
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.width / w))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        if self.prev is None or self.prev.shape != gray.shape:
+            self.prev = gray
+            return True
+
+        diff = cv2.absdiff(gray, self.prev)
+        self.prev = gray
+        changed = cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1])
+        return changed >= self.motion_ratio * diff.size
+
+class LoadGovernor:
+    """
+    Process-wide CPU reading (the same one shown in /status).
+    Above `cpu_threshold` every camera backs off its inference rate.
+    """
+    def __init__(self, cpu_threshold=85.0, max_backoff=4.0, sample_interval=1.0):
+        self.cpu_threshold = cpu_threshold
+        self.max_backoff = max_backoff
+        self.sample_interval = sample_interval
+        self.cpu = 0.0
+        self.last_sample = 0
+        self.lock = threading.Lock()
+
+    def get_cpu(self):
+        # psutil.cpu_percent(None) measures since the previous call, so all
+        # readers share one sample instead of resetting each other's window
+        with self.lock:
+            now = time.time()
+            if now - self.last_sample >= self.sample_interval:
+                self.cpu = psutil.cpu_percent(interval=None)
+                self.last_sample = now
+            return self.cpu
+
+    def backoff_factor(self):
+        cpu = self.get_cpu()
+        if cpu <= self.cpu_threshold:
+            return 1.0
+        overload = (cpu - self.cpu_threshold) / max(1.0, 100.0 - self.cpu_threshold)
+        return 1.0 + min(1.0, overload) * (self.max_backoff - 1.0)
+
+load_governor = LoadGovernor()
+
+class AdaptiveScheduler:
+    """
+    Decides the inference interval for one camera:
+    - fall pending ("Posible caida")  -> fast_interval
+    - motion in scene                 -> base_interval
+    - static scene                    -> idle_interval
+    The global CPU backoff stretches the interval, except while a fall is
+    pending (we never want to miss a confirmation).
+    """
+    def __init__(self, base_interval=0.1, idle_interval=1.0, fast_interval=0.05, governor=None, fps_window=5.0):
+        self.base_interval = base_interval
+        self.idle_interval = idle_interval
+        self.fast_interval = fast_interval
+        self.governor = governor or load_governor
+        self.motion_gate = MotionGate()
+
+        self.mode = "idle"
+        self.interval = base_interval
+        self.skipped = 0
+
+        # Timestamps of completed inferences for effective FPS
+        self.fps_window = fps_window
+        self.inference_times = deque()
+        self.lock = threading.Lock()
+
+    def should_infer(self, frame, elapsed, fall_pending):
+        """Called once per frame; `elapsed` is time since the last submission."""
+        if fall_pending:
+            self.mode = "alert"
+            self.interval = self.fast_interval
+            return elapsed > self.interval
+
+        base = self.base_interval * self.governor.backoff_factor()
+
+        # Not due even at the active rate: skip without touching the gate
+        if elapsed <= base:
+            return False
+
+        if self.motion_gate.check(frame):
+            self.mode = "active"
+            self.interval = base
+            return True
+
+        self.mode = "idle"
+        self.interval = max(base, self.idle_interval)
+        if elapsed > self.interval:
+            return True
+
+        self.skipped += 1
+        return False
+
+    def record_inference(self):
+        now = time.time()
+        with self.lock:
+            self.inference_times.append(now)
+            while self.inference_times and now - self.inference_times[0] > self.fps_window:
+                self.inference_times.popleft()
+
+    def effective_fps(self):
+        now = time.time()
+        with self.lock:
+            while self.inference_times and now - self.inference_times[0] > self.fps_window:
+                self.inference_times.popleft()
+            return len(self.inference_times) / self.fps_window
+
+    def get_stats(self):
+        return {
+            "inference_fps": round(self.effective_fps(), 1),
+            "interval_ms": round(self.interval * 1000),
+            "mode": self.mode,
+            "skipped_static": self.skipped
+        }
@@ -23,6 +23,10 @@ class FallDetector:
         # Debug
         self.debug = False
 
+    def is_fall_pending(self):
+        # Posible caída en curso (o cambiando a "Caido"): conviene inferir más rápido
+        return self.fall_state == "Posible" or self.pending_state == "Caido"
+
     def smooth(self, value, hist):
         hist.append(value)
         return sum(hist) / len(hist)
@@ -0,0 +1,153 @@
+from ultralytics import YOLO
+import threading
+import time
+
+DEFAULT_MODEL_PATH = 'backend/models/yolov8n-pose.pt'
+
+class PoseInferenceEngine:
+    """
+    One shared YOLOv8-pose model for every camera.
+    Cameras submit their latest frame; a scheduler thread gathers the pending
+    frames from all cameras and runs them as ONE batch, then routes each
+    result back to the camera's callback (PoseService -> FallDetector).
+
+    - max_batch_size: max frames per model call
+    - latency_budget: max seconds a frame waits for the batch to fill up
+    """
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, max_batch_size=8, latency_budget=0.03, conf=0.5):
+        self.model_path = model_path
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.latency_budget = max(0.0, float(latency_budget))
+        self.conf = conf
+        self.model = None
+        self.disabled = False
+
+        # Latest pending frame per camera: {camera_id: (frame, callback, submitted_at)}
+        self.pending = {}
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+
+        # Stats
+        self.batches = 0
+        self.frames = 0
+        self.last_batch_size = 0
+        self.last_batch_time = 0.0
+
+        try:
+            print("[InferenceEngine] Loading shared YOLOv8n-pose model...")
+            self.model = YOLO(self.model_path)
+            print(f"[InferenceEngine] Model ready (max_batch={self.max_batch_size}, budget={self.latency_budget * 1000:.0f}ms).")
+        except Exception as e:
+            print(f"[InferenceEngine] WARNING: Vision system disabled. Error: {e}")
+            self.disabled = True
+
+    def start(self):
+        if self.running or self.disabled:
+            return self
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="PoseInferenceEngine")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def submit(self, camera_id, frame, callback):
+        """
+        Queue a frame for inference. Only the newest frame per camera is kept:
+        if the camera already has one waiting, it is replaced (latest wins).
+        `callback(result)` is invoked from the engine thread.
+        """
+        if self.disabled:
+            return False
+
+        with self.cond:
+            previous = self.pending.pop(camera_id, None)
+            # Keep the original wait time so replaced frames are not starved
+            submitted_at = previous[2] if previous else time.time()
+            self.pending[camera_id] = (frame, callback, submitted_at)
+            self.cond.notify_all()
+        return True
+
+    def remove(self, camera_id):
+        with self.cond:
+            self.pending.pop(camera_id, None)
+
+    def _collect_batch(self):
+        with self.cond:
+            self.cond.wait_for(lambda: self.pending or not self.running)
+            if not self.running:
+                return []
+
+            # Wait for more cameras until the batch is full or the oldest
+            # pending frame has spent its latency budget
+            oldest = min(item[2] for item in self.pending.values())
+            deadline = oldest + self.latency_budget
+            while self.running and len(self.pending) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+
+            # Oldest submissions first
+            ordered = sorted(self.pending.items(), key=lambda kv: kv[1][2])
+            batch = []
+            for camera_id, (frame, callback, _) in ordered[:self.max_batch_size]:
+                del self.pending[camera_id]
+                batch.append((camera_id, frame, callback))
+            return batch
+
+    def _run(self):
+        while self.running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            frames = [frame for _, frame, _ in batch]
+            start = time.time()
+            try:
+                results = self.model(frames, verbose=False, conf=self.conf)
+            except Exception as e:
+                print(f"[InferenceEngine] Batch inference error: {e}")
+                continue
+
+            self.batches += 1
+            self.frames += len(frames)
+            self.last_batch_size = len(frames)
+            self.last_batch_time = time.time() - start
+
+            for (camera_id, _, callback), result in zip(batch, results):
+                try:
+                    callback(result)
+                except Exception as e:
+                    print(f"[InferenceEngine] Result callback error for Cam {camera_id}: {e}")
+
+    def get_stats(self):
+        with self.cond:
+            pending = len(self.pending)
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "pending": pending,
+            "max_batch_size": self.max_batch_size,
+            "latency_budget_ms": round(self.latency_budget * 1000, 1),
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_time * 1000, 1)
+        }
+
+_shared_engine = None
+_shared_lock = threading.Lock()
+
+def get_shared_engine(**kwargs):
+    """Returns the process-wide engine, creating it on first use."""
+    global _shared_engine
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = PoseInferenceEngine(**kwargs).start()
+        return _shared_engine
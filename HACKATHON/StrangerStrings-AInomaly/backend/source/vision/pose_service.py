@@ -1,84 +1,112 @@
-from ultralytics import YOLO
 import cv2
 import numpy as np
+import threading
 import time
 
 # Use relative imports assuming this is run as part of the backend package
 try:
     from .fall_detector import FallDetector
     from .chatbot import on_event
+    from .inference_engine import get_shared_engine
+    from .adaptive_rate import AdaptiveScheduler
 except ImportError:
     # Fallback for direct execution
     from fall_detector import FallDetector
     from chatbot import on_event
+    from inference_engine import get_shared_engine
+    from adaptive_rate import AdaptiveScheduler
 
 class PoseService:
-    def __init__(self, camera_id="1", alert_manager=None):
+    def __init__(self, camera_id="1", alert_manager=None, engine=None, event_bus=None):
         self.camera_id = camera_id
         self.alert_manager = alert_manager
+        self.event_bus = event_bus # Publishes posture changes to /events
         self.disabled = False
         self.detector = FallDetector()
-        self.model = None
+
+        # Shared batched YOLO engine (one model for all cameras)
+        self.engine = engine or get_shared_engine()
+        if self.engine.disabled:
+            print(f"[PoseService] WARNING: Vision system disabled for Cam {camera_id}.")
+            self.disabled = True
         
         # Caching for performance
         self.last_inference_time = 0
-        self.inference_interval = 0.1 # Run AI every 100ms (10 FPS)
+        # Adaptive rate: motion gate, faster while a fall is pending, CPU backoff
+        self.scheduler = AdaptiveScheduler(base_interval=0.1, idle_interval=1.0, fast_interval=0.05)
         self.last_results = None
         self.last_posture = "Desconocido"
-        
-        try:
-            print(f"[PoseService] Initializing YOLOv8n-pose for Cam {camera_id}...")
-            # Load nano model for speed
-            self.model = YOLO('backend/models/yolov8n-pose.pt') 
-            print(f"[PoseService] YOLOv8n-pose initialized for Cam {camera_id}.")
-        except Exception as e:
-            print(f"[PoseService] WARNING: Vision system disabled. Error: {e}")
-            self.disabled = True
+
+        # Results arrive from the engine thread
+        self.lock = threading.Lock()
+
+    def _on_results(self, result):
+        """Called by the inference engine with this camera's result."""
+        posture = None
+        event = None
+
+        # Analyze posture from valid results
+        if result.keypoints is not None and result.keypoints.xyn.shape[1] >= 17:
+            kpts = result.keypoints.xyn[0] 
+            
+            def get_p(idx):
+                return (float(kpts[idx][0]), float(kpts[idx][1]))
+
+            coords = {
+                "left_shoulder": get_p(5), "right_shoulder": get_p(6),
+                "left_hip": get_p(11), "right_hip": get_p(12),
+                "left_knee": get_p(13), "right_knee": get_p(14),
+                "left_ankle": get_p(15), "right_ankle": get_p(16)
+            }
+
+            posture, event = self.detector.classify_posture(coords)
+
+        with self.lock:
+            self.last_results = [result]
+            previous = self.last_posture
+            if posture is not None:
+                self.last_posture = posture
+
+        if self.event_bus and posture is not None and (posture != previous or event):
+            self.event_bus.publish({
+                "type": "posture",
+                "camera_id": self.camera_id,
+                "posture": posture,
+                "previous": previous,
+                "event": event
+            })
+
+        self.scheduler.record_inference()
+
+        if event:
+            on_event(event, posture)
 
     def process_frame(self, frame):
-        if self.disabled or frame is None or self.model is None:
+        if self.disabled or frame is None:
             return frame
 
         try:
             current_time = time.time()
             
             # --- INFERENCE THROTTLING ---
-            # Only run heavy model inference if enough time has passed
-            if current_time - self.last_inference_time > self.inference_interval:
-                # Run Inference
-                results = self.model(frame, verbose=False, conf=0.5)
-                self.last_results = results
+            # Only submit to the shared engine when the adaptive scheduler says so
+            # (skips static scenes, speeds up on pending falls, backs off on CPU load).
+            # The engine batches this frame with the other cameras' frames.
+            elapsed = current_time - self.last_inference_time
+            if self.scheduler.should_infer(frame, elapsed, self.detector.is_fall_pending()):
+                # Copy: the frame is annotated below while the engine reads it
+                self.engine.submit(self.camera_id, frame.copy(), self._on_results)
                 self.last_inference_time = current_time
-                
-                # Analyze posture from valid results
-                for result in results:
-                    if result.keypoints is not None and result.keypoints.xyn.shape[1] >= 17:
-                        kpts = result.keypoints.xyn[0] 
-                        
-                        def get_p(idx):
-                            return (float(kpts[idx][0]), float(kpts[idx][1]))
-
-                        coords = {
-                            "left_shoulder": get_p(5), "right_shoulder": get_p(6),
-                            "left_hip": get_p(11), "right_hip": get_p(12),
-                            "left_knee": get_p(13), "right_knee": get_p(14),
-                            "left_ankle": get_p(15), "right_ankle": get_p(16)
-                        }
-
-                        posture, event = self.detector.classify_posture(coords)
-                        self.last_posture = posture
-                        
-                        if event:
-                            on_event(event, posture)
-                        
-
-                        break
 
             # --- DRAWING (Always draw using cached results) ---
             
             # Draw Skeleton (if we have results)
-            if self.last_results:
-                for result in self.last_results:
+            with self.lock:
+                last_results = self.last_results
+                posture = self.last_posture
+
+            if last_results:
+                for result in last_results:
                      # We use the built-in plotter on the CURRENT frame
                      # Note: result.plot() creates a new image. We want to draw on 'frame'.
                      # Actually, result.plot() returns the image. 
@@ -111,15 +139,14 @@ class PoseService:
             # Actually, YOLO plot() returns a NEW image.
             # If we are in skipping mode, we haven't updated 'frame'.
             
-            if self.last_results:
+            if last_results:
                  # Re-draw the cached result on the current frame?
                  # result.plot(img=frame) allows drawing on custom image! (Ultralytics feature)
-                 for result in self.last_results:
+                 for result in last_results:
                      frame = result.plot(img=frame)
                      break
 
             # Draw Status Text (Always, using cached posture)
-            posture = self.last_posture
             
             # Colors (BGR) matching Tailwind
             colors = {
@@ -170,6 +197,11 @@ class PoseService:
             
         return frame
 
+    def get_stats(self):
+        stats = self.scheduler.get_stats()
+        stats["posture"] = self.last_posture
+        return stats
+
     def close(self):
-        # Nothing specific to close for YOLO
-        pass
+        # Drop any frame still waiting in the shared engine
+        self.engine.remove(self.camera_id)
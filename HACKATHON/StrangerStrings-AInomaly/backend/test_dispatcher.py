@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+import http.server
+from urllib.parse import parse_qs
+
+# Checks NotificationDispatcher retry/backoff against a local Telegram stand-in:
+# the first two sendMessage calls fail with 500, the third one succeeds.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source', 'services'))
+from notification_dispatcher import NotificationDispatcher
+
+FAILURES = 2
+requests_seen = [] # (time, path, chat_id, text)
+
+class FakeTelegram(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+        form = parse_qs(body)
+        requests_seen.append((time.time(), self.path, form.get('chat_id', [None])[0], form.get('text', [None])[0]))
+
+        failing = len(requests_seen) <= FAILURES
+        status = 500 if failing else 200
+        payload = {"ok": False, "description": "Internal Server Error"} if failing else {"ok": True, "result": {}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FakeTelegram)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+settings = {
+    "telegram_token": "TEST",
+    "telegram_api_base": f"http://127.0.0.1:{server.server_address[1]}"
+}
+
+done = []
+db_path = os.path.join(tempfile.mkdtemp(), 'outbox.db')
+dispatcher = NotificationDispatcher(lambda: settings, db_path=db_path, workers=2, base_delay=0.2,
+                                    on_group_done=lambda group_id, results: done.append((group_id, results))).start()
+
+dispatcher.submit("alert-1", "sendMessage", ["123"], {"text": "Caida detectada"})
+
+# Watch the outbox row while it is being retried
+db = sqlite3.connect(db_path)
+attempts_seen = set()
+deadline = time.time() + 5
+while not done and time.time() < deadline:
+    row = db.execute("SELECT attempts, state FROM outbox WHERE group_id = 'alert-1'").fetchone()
+    if row and row[1] == 'pending':
+        attempts_seen.add(row[0])
+    time.sleep(0.01)
+
+assert done, "group never finished"
+assert attempts_seen >= {1, 2}, f"outbox row was not retried in place: {attempts_seen}"
+
+# 500, 500, 200: three posts in total, then no duplicate delivery
+time.sleep(0.5)
+assert len(requests_seen) == FAILURES + 1, f"expected {FAILURES + 1} posts, got {len(requests_seen)}"
+assert all(r[1] == "/botTEST/sendMessage" and r[2] == "123" for r in requests_seen)
+
+# Exponential backoff: the second wait is longer than the first
+gaps = [b[0] - a[0] for a, b in zip(requests_seen, requests_seen[1:])]
+print("Retry gaps:", [f"{g:.2f}s" for g in gaps])
+assert gaps[0] >= 0.2 and gaps[1] > gaps[0], "backoff did not grow"
+
+assert done == [("alert-1", [("123", True, "OK")])], f"unexpected group result: {done}"
+assert dispatcher.sent == 1 and dispatcher.failed == 0 and dispatcher.retries == FAILURES
+assert db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 0, "delivered row left in the outbox"
+
+dispatcher.stop()
+server.shutdown()
+print("Stats:", dispatcher.get_stats())
+print("OK")
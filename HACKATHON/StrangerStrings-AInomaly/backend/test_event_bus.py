@@ -0,0 +1,42 @@
+import os
+import sys
+import asyncio
+
+# Checks EventBus fan-out and Last-Event-ID resume, including a client that
+# reconnects with an id from before a backend restart
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source', 'services'))
+from event_bus import EventBus
+
+async def drain(sub):
+    await asyncio.sleep(0) # Let call_soon_threadsafe fan-outs run
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+async def main():
+    bus = EventBus(replay_size=10)
+
+    # Fresh bus, browser reconnects with an old (higher) id after a restart
+    stale = await bus.subscribe(500)
+    fresh = await bus.subscribe()
+    bus.publish({"type": "alert", "n": 1})
+    got_stale, got_fresh = await drain(stale), await drain(fresh)
+    assert [e for e, _ in got_stale] == [1], f"stale Last-Event-ID dropped events: {got_stale}"
+    assert [e for e, _ in got_fresh] == [1]
+
+    # Normal resume: only the events after Last-Event-ID are replayed
+    bus.publish({"type": "alert", "n": 2})
+    bus.publish({"type": "alert", "n": 3})
+    resumed = await bus.subscribe(1)
+    assert [e for e, _ in await drain(resumed)] == [2, 3]
+
+    # Resuming at the current id replays nothing and keeps receiving
+    current = await bus.subscribe(3)
+    bus.publish({"type": "alert", "n": 4})
+    assert [e for e, _ in await drain(current)] == [4]
+
+    print("Stats:", bus.get_stats())
+    print("OK")
+
+asyncio.run(main())
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useLocation } from 'react-router-dom';
-import { Bell, History, Settings, Send, Save, AlertTriangle, CheckCircle, Smartphone, X, Trash2 } from 'lucide-react';
+import { Bell, History, Settings, Send, Save, AlertTriangle, CheckCircle, Smartphone, X, Trash2, ChevronLeft, ChevronRight } from 'lucide-react';
 import { useLanguage } from '../context/LanguageContext';
 import { useDialog } from '../context/DialogContext';
 
@@ -20,6 +20,7 @@ const AlertsPage = () => {
         notification_duration: 5
     });
     const [history, setHistory] = useState([]);
+    const [historyPage, setHistoryPage] = useState({ page: 1, pages: 0, total: 0 });
     const [statusMsg, setStatusMsg] = useState("");
     const [testing, setTesting] = useState(false);
     const [scanning, setScanning] = useState(false);
@@ -42,10 +43,21 @@ const AlertsPage = () => {
             .catch(err => console.error("Error fetching settings:", err));
     };
 
-    const fetchHistory = () => {
-        fetch('http://127.0.0.1:8001/alerts/history')
+    const HISTORY_PAGE_SIZE = 50;
+
+    // Paged like the Dashboard: the whole history is reachable, one page at a time
+    const fetchHistory = (page = historyPage.page) => {
+        fetch(`http://127.0.0.1:8001/alerts/history/page?page=${page}&page_size=${HISTORY_PAGE_SIZE}`)
             .then(res => res.json())
-            .then(data => setHistory(data))
+            .then(data => {
+                // Deleting the last rows of the last page: step back to the new last page
+                if (data.items.length === 0 && data.page > 1 && data.pages > 0) {
+                    fetchHistory(data.pages);
+                    return;
+                }
+                setHistory(data.items);
+                setHistoryPage({ page: data.page, pages: data.pages, total: data.total });
+            })
             .catch(err => console.error("Error fetching history:", err));
     };
 
@@ -150,7 +162,7 @@ const AlertsPage = () => {
         fetch(`http://127.0.0.1:8001/alerts/history/${id}`, { method: 'DELETE' })
             .then(async res => {
                 if (res.ok) {
-                    setHistory(prev => prev.filter(item => item.id !== id));
+                    fetchHistory();
                 } else {
                     await alert(t("alerts.error"), { variant: 'danger' });
                 }
@@ -438,7 +450,7 @@ const AlertsPage = () => {
                     <div className="space-y-4">
                         <div className="flex justify-between items-center mb-4">
                             <p className="text-slate-500 dark:text-slate-400 text-sm">{t("alerts.history.showing_latest")}</p>
-                            <button onClick={fetchHistory} className="text-blue-600 dark:text-blue-400 hover:text-blue-500 dark:hover:text-blue-300 text-sm font-medium transition-colors">{t("alerts.history.refresh")}</button>
+                            <button onClick={() => fetchHistory()} className="text-blue-600 dark:text-blue-400 hover:text-blue-500 dark:hover:text-blue-300 text-sm font-medium transition-colors">{t("alerts.history.refresh")}</button>
                         </div>
                         <div className="rounded-xl overflow-hidden border border-slate-200 dark:border-white/5">
                             <table className="w-full text-left">
@@ -496,6 +508,29 @@ const AlertsPage = () => {
                                 </tbody>
                             </table>
                         </div>
+                        {historyPage.pages > 1 && (
+                            <div className="flex justify-between items-center text-sm text-slate-500 dark:text-slate-400">
+                                <span>
+                                    {t("alerts.history.page")} {historyPage.page} {t("alerts.history.of")} {historyPage.pages} · {historyPage.total} {t("alerts.history.total")}
+                                </span>
+                                <div className="flex items-center gap-2">
+                                    <button
+                                        onClick={() => fetchHistory(historyPage.page - 1)}
+                                        disabled={historyPage.page <= 1}
+                                        className="flex items-center gap-1 px-3 py-1.5 rounded-lg hover:bg-slate-100 dark:hover:bg-white/5 disabled:opacity-40 disabled:pointer-events-none transition-colors"
+                                    >
+                                        <ChevronLeft size={16} /> {t("alerts.history.prev")}
+                                    </button>
+                                    <button
+                                        onClick={() => fetchHistory(historyPage.page + 1)}
+                                        disabled={historyPage.page >= historyPage.pages}
+                                        className="flex items-center gap-1 px-3 py-1.5 rounded-lg hover:bg-slate-100 dark:hover:bg-white/5 disabled:opacity-40 disabled:pointer-events-none transition-colors"
+                                    >
+                                        {t("alerts.history.next")} <ChevronRight size={16} />
+                                    </button>
+                                </div>
+                            </div>
+                        )}
                     </div>
                 )}
             </div>
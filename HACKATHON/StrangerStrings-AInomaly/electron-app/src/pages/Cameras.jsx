@@ -10,7 +10,7 @@ const CameraFeed = ({ cam }) => {
     return (
         <>
             <img
-                src={`http://127.0.0.1:8001/video_feed?id=${cam.id}&t=${ts}`}
+                src={`http://127.0.0.1:8001/video_feed?id=${cam.id}&profile=sd&t=${ts}`}
                 alt={cam.name}
                 className="w-full h-full object-cover opacity-90 group-hover:opacity-100 transition-opacity bg-black"
                 onError={(e) => { e.target.style.display = 'none'; e.target.nextSibling.style.display = 'flex'; }}
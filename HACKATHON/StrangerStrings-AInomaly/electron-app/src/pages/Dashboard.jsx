@@ -63,11 +63,11 @@ const Dashboard = () => {
                 .then(data => setStatus(data))
                 .catch(() => setStatus(prev => ({ ...prev, connected: false, camera_status: 'Offline' })));
 
-            fetch('http://127.0.0.1:8001/alerts/history')
+            fetch('http://127.0.0.1:8001/alerts/history/page?page=1&page_size=5')
                 .then(res => res.json())
                 .then(data => {
-                    setAlertsCount(data.length);
-                    setRecentAlerts(data.slice(0, 5));
+                    setAlertsCount(data.total);
+                    setRecentAlerts(data.items);
                 })
                 .catch(e => console.error(e));
 
@@ -80,6 +80,11 @@ export const translations = {
         "alerts.history.showing_latest": "Mostrando últimas alertas",
         "alerts.history.refresh": "Actualizar",
         "alerts.history.empty": "No hay historial de alertas.",
+        "alerts.history.page": "Página",
+        "alerts.history.of": "de",
+        "alerts.history.total": "alertas",
+        "alerts.history.prev": "Anterior",
+        "alerts.history.next": "Siguiente",
 
         "alerts.table.date": "Fecha",
         "alerts.table.camera": "Cámara",
@@ -210,6 +215,11 @@ export const translations = {
         "alerts.history.showing_latest": "Showing recent alerts",
         "alerts.history.refresh": "Refresh",
         "alerts.history.empty": "No alert history.",
+        "alerts.history.page": "Page",
+        "alerts.history.of": "of",
+        "alerts.history.total": "alerts",
+        "alerts.history.prev": "Previous",
+        "alerts.history.next": "Next",
 
         "alerts.table.date": "Date",
         "alerts.table.camera": "Camera",
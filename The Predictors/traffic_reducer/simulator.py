@@ -0,0 +1,146 @@
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# Offline intersection simulator: does the phase policy actually cut waiting time?
+#
+# Every scenario is one 4-approach intersection. All scenarios advance together
+# as (scenarios, 4) NumPy arrays, one second per step, so thousands of simulated
+# hours run in seconds:
+#   - arrivals: Poisson per approach, rates replayed from a counts CSV
+#   - discharge: the green approach releases `saturation` vehicles/s
+#   - switching: changing the green costs `switch_loss` seconds of all-red
+#   - every `decision_interval` seconds the policy picks the green approach
+#     from the current queues (all scenarios in ONE policy call); the first
+#     decision only sets the initial green, it is not a switch
+#
+# Policies are only comparable with spare capacity: at a utilisation (demand /
+# saturation) of 1 or more the queues grow without bound under any policy.
+#
+# Usage:
+#   python simulator.py                                  (dataset_sintetico_entrenamiento.csv)
+#   python simulator.py --counts grabacion_en_vivo.csv   (recorded live counts)
+#   python simulator.py --scenarios 2000 --hours 2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traffic_app'))
+from phase_model import FEATURES, load_model, model_predict, argmax_rule
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'traffic_reducer_dataset', 'modelo_entrenado', 'dataset_sintetico_entrenamiento.csv')
+
+
+def load_counts(path):
+    """(rows, 4) counts per approach; accepts Norte/Sur/... or norte/sur/... columns."""
+    df = pd.read_csv(path).rename(columns=str.capitalize)
+    return df[FEATURES].to_numpy(dtype=float)
+
+
+def utilisation(counts, scenarios=1000, hours=1.0, row_seconds=300, demand_scale=0.1, saturation=0.5):
+    """Expected demand / discharge capacity over the rows the scenarios replay (ignores all-red time)."""
+    n_rows = len(counts)
+    periods = int(np.ceil(hours * 3600 / row_seconds))
+    visited = (np.arange(scenarios)[:, None] + np.arange(periods)) % n_rows
+    return float(counts[visited].sum(axis=-1).mean() * demand_scale / 60.0 / saturation)
+
+
+def simulate(policy, counts, scenarios=1000, hours=1.0, decision_interval=10, row_seconds=300,
+             demand_scale=0.1, saturation=0.5, switch_loss=4, seed=0):
+    """
+    Runs `scenarios` intersections for `hours` under `policy(queues) -> (scenarios,) green index`.
+    Row r of `counts` is read as vehicles/min per approach (times `demand_scale`);
+    scenario i replays rows i, i+1, ... changing every `row_seconds`.
+    """
+    rng = np.random.default_rng(seed)
+    steps = int(hours * 3600)
+    n_rows = len(counts)
+    rates = counts * demand_scale / 60.0 # vehicles/s
+    offsets = np.arange(scenarios) % n_rows
+
+    queue = np.zeros((scenarios, 4))
+    green = np.zeros(scenarios, dtype=np.int64)
+    lost = np.zeros(scenarios)                 # Remaining all-red seconds
+    queue_seconds = np.zeros(scenarios)        # Sum of queue over time = total delay
+    arrived = np.zeros(scenarios)
+    departed = np.zeros(scenarios)
+    max_queue = np.zeros(scenarios)
+    switches = np.zeros(scenarios)
+    rows = np.arange(scenarios)
+
+    for t in range(steps):
+        if t % decision_interval == 0:
+            choice = np.asarray(policy(queue), dtype=np.int64)
+            if t:  # t = 0 picks the initial green: no all-red, not a switch
+                changed = choice != green
+                lost[changed] = switch_loss
+                switches += changed
+            green = choice
+
+        lam = rates[(offsets + t // row_seconds) % n_rows]
+        arrivals = rng.poisson(lam)
+        queue += arrivals
+        arrived += arrivals.sum(axis=1)
+
+        # Only the green approach discharges, and not during all-red
+        can_go = lost <= 0
+        out = np.minimum(queue[rows, green], saturation) * can_go
+        queue[rows, green] -= out
+        departed += out
+        lost -= 1
+
+        queue_seconds += queue.sum(axis=1)
+        np.maximum(max_queue, queue.max(axis=1), out=max_queue)
+
+    return {
+        'throughput_veh_h': float(departed.mean() / hours),
+        'mean_delay_s': float(queue_seconds.sum() / max(arrived.sum(), 1)), # Little's law
+        'max_queue': float(max_queue.max()),
+        'mean_max_queue': float(max_queue.mean()),
+        'switches_per_h': float(switches.mean() / hours),
+        'simulated_hours': float(scenarios * hours)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare phase policies on a simulated intersection")
+    parser.add_argument('--counts', default=DATASET, help="CSV with Norte,Sur,Este,Oeste columns")
+    parser.add_argument('--scenarios', type=int, default=1000)
+    parser.add_argument('--hours', type=float, default=1.0)
+    parser.add_argument('--decision-interval', type=int, default=10, help="seconds between decisions")
+    parser.add_argument('--row-seconds', type=int, default=300, help="seconds each CSV row lasts")
+    parser.add_argument('--demand-scale', type=float, default=0.1, help="CSV counts -> vehicles/min")
+    parser.add_argument('--saturation', type=float, default=0.5, help="vehicles/s on green")
+    parser.add_argument('--switch-loss', type=int, default=4, help="all-red seconds per change")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    counts = load_counts(args.counts)
+    params = dict(scenarios=args.scenarios, hours=args.hours, decision_interval=args.decision_interval,
+                  row_seconds=args.row_seconds, demand_scale=args.demand_scale,
+                  saturation=args.saturation, switch_loss=args.switch_loss, seed=args.seed)
+
+    policies = {'argmax': argmax_rule}
+    model = load_model()
+    if model is not None:
+        policies['modelo_ia'] = lambda queue: model_predict(model, queue)
+
+    print(f"{len(counts)} demand rows from {args.counts}")
+    rho = utilisation(counts, args.scenarios, args.hours, args.row_seconds, args.demand_scale, args.saturation)
+    print(f"Utilisation (demand / saturation): {rho:.2f}")
+    if rho >= 1:
+        print("WARNING: demand is at or above discharge capacity; queues grow under every policy "
+              "and the comparison is meaningless. Lower --demand-scale or raise --saturation.")
+    for name, policy in policies.items():
+        start = time.perf_counter()
+        r = simulate(policy, counts, **params)
+        elapsed = time.perf_counter() - start
+        print(f"{name:10s} | throughput {r['throughput_veh_h']:8.1f} veh/h | mean delay {r['mean_delay_s']:7.1f} s "
+              f"| max queue {r['max_queue']:6.1f} (avg {r['mean_max_queue']:5.1f}) | switches {r['switches_per_h']:5.1f}/h "
+              f"| {r['simulated_hours']:.0f} h simulated in {elapsed:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
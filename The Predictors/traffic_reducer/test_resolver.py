@@ -0,0 +1,54 @@
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import functools
+import http.server
+
+# Checks the StreamResolver against a local HTTP server serving a sample HLS playlist
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traffic_app'))
+from stream_resolver import StreamResolver
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360
+low/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720
+high/index.m3u8?expire={expire}
+"""
+
+root = tempfile.mkdtemp()
+with open(os.path.join(root, 'master.m3u8'), 'w') as f:
+    f.write(MASTER.format(expire=int(time.time()) + 2))
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=root))
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base = f"http://127.0.0.1:{server.server_address[1]}"
+
+resolver = StreamResolver(refresh_interval=0.2, refresh_margin=1, base_delay=0.2)
+
+url = resolver.get(f"{base}/master.m3u8")
+print(f"Resolved: {url}")
+assert url.startswith(f"{base}/high/index.m3u8"), "should pick the highest bandwidth variant"
+
+resolver.get(f"{base}/master.m3u8")
+assert resolver.hits == 1 and resolver.misses == 1, "second get() should be a cache hit"
+
+# The variant URL expires in 2s: the background thread must refresh it before that
+time.sleep(1.5)
+assert resolver.refreshes >= 1, "expiring URL was not refreshed in the background"
+print(f"Background refreshes: {resolver.refreshes}")
+
+# Failures back off instead of re-resolving on every call
+assert resolver.get(f"{base}/missing.m3u8") is None
+assert resolver.get(f"{base}/missing.m3u8") is None
+assert resolver.failures == 1, "second call should be inside the backoff window"
+
+assert resolver.get("rtsp://127.0.0.1/cam1") == "rtsp://127.0.0.1/cam1"
+print("Stats:", resolver.get_stats())
+print("OK")
@@ -1,70 +1,128 @@
 
 from flask import Flask, render_template, request, jsonify, Response
-import pickle
-import joblib
 import pandas as pd
 import numpy as np
 import os
+import io
+import json
 import random
-from video_processor import TrafficCamera
+from intersections import IntersectionRegistry
+from phase_model import FEATURES, load_model, model_predict
 
-app = Flask(__name__)
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 
-# Load Model logic
-MODEL_PATH = r"c:\Users\zadkiel\Downloads\traffic_reducer_dataset-20251211T152732Z-3-001\traffic_reducer_dataset\modelo_entrenado\modelo_semaforo_ia.pkl"
+app = Flask(__name__)
+sock = Sock(app) if Sock else None
 
-def load_model():
-    print(f"Loading model from {MODEL_PATH}...")
-    try:
-        with open(MODEL_PATH, 'rb') as f:
-            return pickle.load(f)
-    except:
-        try:
-            return joblib.load(MODEL_PATH)
-        except Exception as e:
-            print(f"Error loading model: {e}")
-            return None
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APPROACHES = ['norte', 'sur', 'este', 'oeste']
 
 model = load_model()
 
-# Initialize Camera
+# Initialize Intersections
 YOUTUBE_URL = "https://www.youtube.com/watch?v=ByED80IKdIU" # User's video
-camera = TrafficCamera(YOUTUBE_URL)
-camera.start()
+INTERSECTIONS_CONFIG = os.path.join(BASE_DIR, 'intersections.json')
+
+if os.path.exists(INTERSECTIONS_CONFIG):
+    registry = IntersectionRegistry.from_config(INTERSECTIONS_CONFIG)
+else:
+    registry = IntersectionRegistry()
+    registry.add('principal', YOUTUBE_URL)
+
+# The phase model and the UI are built for the four approaches: reject other zone layouts
+for intersection_id in registry.ids():
+    zone_names = registry.get(intersection_id).zone_names
+    if sorted(zone_names) != sorted(APPROACHES):
+        raise ValueError(f"Intersection '{intersection_id}': zones {zone_names} do not map onto {APPROACHES}")
+
+DEFAULT_INTERSECTION = registry.ids()[0]
+
+def get_camera(intersection_id=None):
+    return registry.get(intersection_id or DEFAULT_INTERSECTION)
+
+def live_decision(camera, flow=None):
+    """Phase decision from the tracker: longest queue wins, arrival rate breaks ties."""
+    flow = flow or camera.get_flow()
+    # Tracked vehicles per approach: stable, unlike raw per-frame box counts
+    values = [float(flow[a]['vehicles']) for a in APPROACHES]
+    demand = [(flow[a]['queue_length'], flow[a]['vehicles_per_min'], values[i])
+              for i, a in enumerate(APPROACHES)]
+    result = max(range(4), key=lambda i: demand[i]) if any(any(d) for d in demand) else 0
+    return result, values, flow
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
-def generate_frames():
+def generate_frames(camera):
+    last_seq = 0
     while True:
-        frame_bytes = camera.get_frame()
-        if frame_bytes:
+        # Blocks until the detector publishes a new result (no busy loop)
+        seq, frame_bytes = camera.wait_for_frame(last_seq, timeout=1.0)
+        if frame_bytes and seq != last_seq:
+            last_seq = seq
             yield (b'--frame\r\n'
                    b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
 @app.route('/video_feed')
-def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+@app.route('/video_feed/<intersection_id>')
+def video_feed(intersection_id=None):
+    camera = get_camera(intersection_id)
+    if camera is None:
+        return jsonify({'error': 'Unknown intersection'}), 404
+    return Response(generate_frames(camera), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/intersections', methods=['GET'])
+def intersections():
+    return jsonify(registry.list())
+
+@app.route('/counts/<intersection_id>', methods=['GET'])
+def counts(intersection_id):
+    camera = get_camera(intersection_id)
+    if camera is None:
+        return jsonify({'error': 'Unknown intersection'}), 404
+    return jsonify(camera.get_counts())
+
+@app.route('/flow/<intersection_id>', methods=['GET'])
+def flow_metrics(intersection_id):
+    camera = get_camera(intersection_id)
+    if camera is None:
+        return jsonify({'error': 'Unknown intersection'}), 404
+    return jsonify(camera.get_flow())
+
+@app.route('/stats', methods=['GET'])
+@app.route('/stats/<intersection_id>', methods=['GET'])
+def stats(intersection_id=None):
+    # Per-stage latency, throughput and queue depth of the camera pipelines
+    if intersection_id is None:
+        return jsonify(registry.get_stats())
+    camera = get_camera(intersection_id)
+    if camera is None:
+        return jsonify({'error': 'Unknown intersection'}), 404
+    return jsonify(camera.get_stats())
 
 @app.route('/predict', methods=['POST'])
-def predict():
+@app.route('/predict/<intersection_id>', methods=['POST'])
+def predict(intersection_id=None):
+    camera = get_camera(intersection_id)
+    if camera is None:
+        return jsonify({'error': 'Unknown intersection'}), 404
     if not model:
         return jsonify({'error': 'Model not loaded'}), 500
     
-    data = request.json
+    data = request.json or {}
     try:
         # Check if we should use Real Camera Data
         # If frontend sends specific flag or just always use camera in this mode?
         # Let's check a "mode" data param
         use_live = data.get('live_mode', False)
         
+        flow = None
         if use_live:
-            counts = camera.get_counts()
-            norte = float(counts['norte'])
-            sur = float(counts['sur'])
-            este = float(counts['este'])
-            oeste = float(counts['oeste'])
+            live_result, (norte, sur, este, oeste), flow = live_decision(camera)
         else:
             norte = float(data.get('norte', 0))
             sur = float(data.get('sur', 0))
@@ -80,7 +138,9 @@ def predict():
         
         # If total traffic is very low, default to 0 (Norte) or keep previous? 
         # For responsiveness, just pick max.
-        if sum(traffic_values) > 0:
+        if flow is not None:
+            result = live_result
+        elif sum(traffic_values) > 0:
             result = int(np.argmax(traffic_values))
         else:
             result = 0 # Default if empty
@@ -93,11 +153,88 @@ def predict():
             'prediction': result,
             'traffic_data': {
                 'norte': norte, 'sur': sur, 'este': este, 'oeste': oeste
-            }
+            },
+            'flow': flow
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def read_batch():
+    """
+    Count vectors from the request, as an (N, 4) DataFrame (+ expected winners if present):
+      - uploaded CSV file ('file') or a text/csv body shaped like dataset_sintetico_entrenamiento.csv
+      - JSON {"counts": [[n, s, e, o], ...]} or {"counts": [{"norte": .., ...}, ...]}
+    """
+    if 'file' in request.files:
+        df = pd.read_csv(request.files['file'])
+    elif request.mimetype == 'text/csv':
+        df = pd.read_csv(io.BytesIO(request.get_data()))
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get('counts') if isinstance(data, dict) else data
+        if not rows:
+            raise ValueError("Send a CSV file or JSON {'counts': [[norte, sur, este, oeste], ...]}")
+        if isinstance(rows[0], dict):
+            df = pd.DataFrame(rows).rename(columns=str.capitalize)
+        else:
+            df = pd.DataFrame(rows, columns=FEATURES)
+
+    missing = [c for c in FEATURES if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    return df
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    if not model:
+        return jsonify({'error': 'Model not loaded'}), 500
+    try:
+        df = read_batch()
+        decisions = model_predict(model, df[FEATURES].to_numpy(dtype=float))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    if request.args.get('format') == 'csv':
+        out = df.copy()
+        out['DECISION'] = decisions
+        return Response(out.to_csv(index=False), mimetype='text/csv')
+
+    response = {'count': int(len(decisions)), 'predictions': decisions.tolist()}
+    if 'GANADOR_ESPERADO' in df.columns:
+        response['accuracy'] = round(float((decisions == df['GANADOR_ESPERADO'].to_numpy()).mean()), 4)
+    return jsonify(response)
+
+if sock:
+    @sock.route('/ws/phase')
+    @sock.route('/ws/phase/<intersection_id>')
+    def phase_socket(ws, intersection_id=None):
+        """Pushes a phase decision every time the live counts change (no polling)."""
+        camera = get_camera(intersection_id)
+        if camera is None:
+            ws.send(json.dumps({'error': 'Unknown intersection'}))
+            return
+        last_seq, last_values = 0, None
+        # Checked after every wait (at most 5 s): a closed tab ends the handler
+        # even when the scene is steady or the camera stalled and nothing is sent
+        while ws.connected:
+            seq, flow = camera.wait_for_flow(last_seq, timeout=5.0)
+            if seq == last_seq:
+                continue
+            last_seq = seq
+            result, values, flow = live_decision(camera, flow)
+            if (result, values) == last_values:
+                continue
+            last_values = (result, values)
+            camera.set_phase(result)
+            try:
+                ws.send(json.dumps({
+                    'prediction': result,
+                    'traffic_data': dict(zip(APPROACHES, values)),
+                    'flow': flow
+                }))
+            except Exception:
+                return  # Client went away between the check and the send
+
 @app.route('/simulate', methods=['GET'])
 def simulate():
     # Generate random traffic data for live simulation
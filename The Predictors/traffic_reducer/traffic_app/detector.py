@@ -0,0 +1,118 @@
+from ultralytics import YOLO
+import threading
+import time
+
+VEHICLE_CLASSES = [2, 3, 5, 7] # car, motorcycle, bus, truck
+
+
+class BatchedDetector:
+    """
+    One YOLO model shared by every intersection.
+    Each camera's detection thread calls detect(); requests from all cameras
+    are gathered into a single batched model call, then every caller gets
+    its own result back.
+
+    - max_batch_size: max frames per model call
+    - latency_budget: max seconds a request waits for the batch to fill up
+    """
+    def __init__(self, model_path='yolov8n.pt', max_batch_size=16, latency_budget=0.02):
+        self.model = YOLO(model_path)
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.latency_budget = latency_budget
+
+        # Newest pending request per camera: {key: request}
+        self.pending = {}
+        self.cond = threading.Condition()
+        self.running = True
+
+        # Stats (set before the worker thread starts updating them)
+        self.batches = 0
+        self.frames = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def detect(self, key, frame, timeout=10.0):
+        """Blocking: returns the YOLO result for `frame` (or None on timeout/replace)."""
+        request = {'frame': frame, 'done': threading.Event(), 'result': None, 'submitted_at': time.time()}
+        with self.cond:
+            previous = self.pending.get(key)
+            if previous is not None:
+                # Latest wins: the older caller gets None and moves on
+                previous['done'].set()
+            self.pending[key] = request
+            self.cond.notify_all()
+
+        request['done'].wait(timeout)
+        return request['result']
+
+    def _collect_batch(self):
+        with self.cond:
+            while self.running and not self.pending:
+                self.cond.wait(timeout=1.0)
+            if not self.running:
+                return []
+
+            # Give the other cameras a moment to join the batch
+            oldest = min(r['submitted_at'] for r in self.pending.values())
+            deadline = oldest + self.latency_budget
+            while self.running and len(self.pending) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self.cond.wait(timeout=remaining)
+
+            keys = sorted(self.pending, key=lambda k: self.pending[k]['submitted_at'])[:self.max_batch_size]
+            return [self.pending.pop(k) for k in keys]
+
+    def _run(self):
+        while self.running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            start = time.time()
+            try:
+                results = self.model([r['frame'] for r in batch], verbose=False, classes=VEHICLE_CLASSES)
+            except Exception as e:
+                print(f"[Detector] Batch error: {e}")
+                results = [None] * len(batch)
+
+            for request, result in zip(batch, results):
+                request['result'] = [result] if result is not None else None
+                request['done'].set()
+
+            self.batches += 1
+            self.frames += len(batch)
+            self.last_batch_size = len(batch)
+            self.last_batch_ms = (time.time() - start) * 1000
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+
+    def get_stats(self):
+        with self.cond:
+            pending = len(self.pending)
+        return {
+            'batches': self.batches,
+            'frames': self.frames,
+            'avg_batch_size': round(self.frames / self.batches, 2) if self.batches else 0,
+            'last_batch_size': self.last_batch_size,
+            'last_batch_ms': round(self.last_batch_ms, 1),
+            'pending': pending
+        }
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+def get_shared_detector(model_path='yolov8n.pt', **kwargs):
+    """One detector per model file for the whole process."""
+    with _shared_lock:
+        if model_path not in _shared:
+            _shared[model_path] = BatchedDetector(model_path, **kwargs)
+        return _shared[model_path]
@@ -0,0 +1,38 @@
+import os
+import pickle
+import joblib
+import numpy as np
+import pandas as pd
+
+# Load Model logic
+MODEL_PATH = os.environ.get('TRAFFIC_MODEL_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'traffic_reducer_dataset', 'modelo_entrenado', 'modelo_semaforo_ia.pkl'))
+FEATURES = ['Norte', 'Sur', 'Este', 'Oeste'] # Same columns as dataset_sintetico_entrenamiento.csv
+
+
+def load_model(path=MODEL_PATH):
+    print(f"Loading model from {path}...")
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except:
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            return None
+
+
+def model_predict(model, matrix):
+    """Run an (N, 4) matrix of counts through the model in ONE call."""
+    matrix = np.asarray(matrix, dtype=float).reshape(-1, 4)
+    if getattr(model, 'feature_names_in_', None) is not None:
+        # Fitted on a DataFrame: pass the same named columns
+        matrix = pd.DataFrame(matrix, columns=FEATURES)
+    # Fitted on a bare array: named columns would only raise a warning on every call
+    return np.asarray(model.predict(matrix)).astype(int)
+
+
+def argmax_rule(matrix):
+    """The live rule of /predict: most vehicles wins (Norte on empty input)."""
+    return np.argmax(np.asarray(matrix, dtype=float).reshape(-1, 4), axis=1)
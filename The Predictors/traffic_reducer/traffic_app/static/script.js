@@ -33,6 +33,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const liveToggle = document.getElementById('live-mode-toggle');
 
     let liveInterval = null;
+    let liveSocket = null;
 
     // Initialize
     updatePrediction();
@@ -60,16 +61,43 @@ document.addEventListener('DOMContentLoaded', () => {
         // Disable inputs
         Object.values(inputs).forEach(inp => inp.disabled = true);
 
-        // Immediate update then interval
-        fetchSimulation();
-        liveInterval = setInterval(fetchSimulation, 2000);
+        // Server pushes a decision whenever the camera counts change
+        const protocol = location.protocol === 'https:' ? 'wss' : 'ws';
+        liveSocket = new WebSocket(`${protocol}://${location.host}/ws/phase`);
+        liveSocket.onmessage = (event) => applyLiveDecision(JSON.parse(event.data));
+        liveSocket.onerror = () => {
+            // No WebSocket support on the server: fall back to polling
+            liveSocket = null;
+            if (liveToggle.checked && !liveInterval) {
+                fetchSimulation();
+                liveInterval = setInterval(fetchSimulation, 2000);
+            }
+        };
     }
 
     function stopLiveMode() {
+        if (liveSocket) {
+            liveSocket.close();
+            liveSocket = null;
+        }
         clearInterval(liveInterval);
+        liveInterval = null;
         Object.values(inputs).forEach(inp => inp.disabled = false);
     }
 
+    function applyLiveDecision(data) {
+        if (data.error) {
+            console.error(data.error);
+            return;
+        }
+        Object.keys(data.traffic_data).forEach(key => {
+            inputs[key].value = data.traffic_data[key];
+            valueDisplays[key].textContent = data.traffic_data[key];
+            updateVisualDensity(key, data.traffic_data[key]);
+        });
+        setLights(data.prediction);
+    }
+
     function fetchSimulation() {
         fetch('/simulate')
             .then(res => res.json())
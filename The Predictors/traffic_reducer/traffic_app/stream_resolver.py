@@ -0,0 +1,212 @@
+import os
+import re
+import random
+import threading
+import time
+import urllib.request
+from urllib.parse import urljoin, urlparse, parse_qs
+
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+
+def resolve_file(source):
+    return os.path.abspath(source), None # Local files never expire
+
+
+def resolve_passthrough(source):
+    return source, None # rtsp:// etc. are opened as given
+
+
+def resolve_hls(source, timeout=10):
+    """
+    Fetch the playlist; for a master playlist pick the highest-bandwidth variant.
+    Expiry comes from the URL itself when the CDN puts one there.
+    """
+    with urllib.request.urlopen(source, timeout=timeout) as response:
+        text = response.read().decode('utf-8', errors='replace')
+    if not text.lstrip().startswith('#EXTM3U'):
+        raise ValueError(f"Not an HLS playlist: {source}")
+
+    best_url, best_bw = source, -1
+    lines = [l.strip() for l in text.splitlines()]
+    for i, line in enumerate(lines):
+        if line.startswith('#EXT-X-STREAM-INF'):
+            match = re.search(r'BANDWIDTH=(\d+)', line)
+            bandwidth = int(match.group(1)) if match else 0
+            uri = next((l for l in lines[i + 1:] if l and not l.startswith('#')), None)
+            if uri and bandwidth > best_bw:
+                best_url, best_bw = urljoin(source, uri), bandwidth
+    return best_url, url_expiry(best_url)
+
+
+def resolve_youtube(source):
+    if yt_dlp is None:
+        raise RuntimeError("yt-dlp is not installed")
+    # Force HLS (m3u8) which is much friendlier to OpenCV than DASH
+    ydl_opts = {
+        'format': 'best[protocol^=m3u8]',
+        'quiet': True,
+        'noplaylist': True
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(source, download=False)
+    return info['url'], url_expiry(info['url'])
+
+
+def url_expiry(url):
+    """Expiry timestamp embedded in signed URLs (YouTube: .../expire/<ts>/... or ?expire=<ts>)."""
+    match = re.search(r'/expire/(\d+)', url)
+    if match:
+        return float(match.group(1))
+    values = parse_qs(urlparse(url).query).get('expire')
+    return float(values[0]) if values else None
+
+
+class StreamResolver:
+    """
+    Turns a camera source into a URL OpenCV can open, with a TTL cache.
+    - Resolved URLs are reused until they expire (yt-dlp runs once, not on every reconnect)
+    - A background thread re-resolves entries `refresh_margin` seconds before expiry
+    - Failures are retried with exponential backoff + jitter instead of hammering the extractor
+    - Backends are pluggable: register(name, matcher, resolve_fn); resolve_fn(source) -> (url, expires_at or None)
+
+    Default backends: local file, rtsp/rtmp/udp passthrough, .m3u8 playlists, YouTube (yt-dlp).
+    """
+    def __init__(self, ttl=3600, refresh_margin=300, base_delay=2.0, max_delay=300.0, refresh_interval=30):
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.refresh_interval = refresh_interval
+
+        self.backends = []
+        self.register('file', lambda s: os.path.isfile(s), resolve_file)
+        self.register('stream', lambda s: urlparse(s).scheme in ('rtsp', 'rtsps', 'rtmp', 'udp', 'tcp'), resolve_passthrough)
+        self.register('hls', lambda s: urlparse(s).path.lower().endswith('.m3u8'), resolve_hls)
+        self.register('youtube', lambda s: urlparse(s).scheme in ('http', 'https'), resolve_youtube)
+
+        # {source: {'url', 'expires', 'backend', 'failures', 'retry_at', 'error'}}
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.source_locks = {}
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self.thread.start()
+
+    def register(self, name, matcher, resolve_fn, first=False):
+        backend = (name, matcher, resolve_fn)
+        if first:
+            self.backends.insert(0, backend)
+        else:
+            self.backends.append(backend)
+
+    def _backend_for(self, source):
+        for name, matcher, resolve_fn in self.backends:
+            if matcher(source):
+                return name, resolve_fn
+        raise ValueError(f"No resolver for source: {source}")
+
+    def _source_lock(self, source):
+        with self.lock:
+            return self.source_locks.setdefault(source, threading.Lock())
+
+    def get(self, source):
+        """Cached URL for `source` (resolving it if needed). None while backing off."""
+        now = time.time()
+        with self.lock:
+            entry = self.cache.get(source)
+            if entry and entry['url'] and (entry['expires'] is None or entry['expires'] > now):
+                self.hits += 1
+                return entry['url']
+            if entry and entry['retry_at'] > now:
+                return None # Still backing off after a failure
+            self.misses += 1
+        return self._resolve(source)
+
+    def invalidate(self, source):
+        """Forget the URL (e.g. the stream stopped working); the next get() re-resolves."""
+        with self.lock:
+            entry = self.cache.get(source)
+            if entry:
+                entry['url'] = None
+
+    def _resolve(self, source, force=False):
+        # One resolution per source at a time; concurrent callers share its result
+        with self._source_lock(source):
+            with self.lock:
+                entry = self.cache.get(source)
+                if not force and entry and entry['url'] and (entry['expires'] is None or entry['expires'] > time.time()):
+                    return entry['url']
+
+            name, resolve_fn = self._backend_for(source)
+            try:
+                url, expires = resolve_fn(source)
+            except Exception as e:
+                with self.lock:
+                    entry = self.cache.setdefault(source, {'url': None, 'expires': None, 'failures': 0})
+                    entry['failures'] += 1
+                    delay = min(self.max_delay, self.base_delay * (2 ** (entry['failures'] - 1)))
+                    delay *= random.uniform(0.5, 1.5) # Jitter: cameras don't retry in lockstep
+                    entry.update(backend=name, retry_at=time.time() + delay, error=str(e))
+                    self.failures += 1
+                print(f"[Resolver] {name} failed for {source}: {e}. Retry in {delay:.0f}s")
+                return None # A still-valid cached URL keeps being served by get()
+
+            if expires is None and name not in ('file', 'stream'):
+                expires = time.time() + self.ttl
+            with self.lock:
+                self.cache[source] = {'url': url, 'expires': expires, 'backend': name,
+                                      'failures': 0, 'retry_at': 0, 'error': None}
+            return url
+
+    def _refresh_loop(self):
+        while self.running:
+            time.sleep(self.refresh_interval)
+            now = time.time()
+            with self.lock:
+                due = [s for s, e in self.cache.items()
+                       if e['expires'] is not None and e['expires'] - self.refresh_margin <= now
+                       and e.get('retry_at', 0) <= now]
+            for source in due:
+                # Cameras keep using the current URL while this runs
+                self.refreshes += 1
+                self._resolve(source, force=True)
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self):
+        now = time.time()
+        with self.lock:
+            entries = {
+                s: {
+                    'backend': e.get('backend'),
+                    'resolved': e['url'] is not None,
+                    'expires_in_s': round(e['expires'] - now) if e['expires'] else None,
+                    'failures': e['failures'],
+                    'error': e.get('error')
+                } for s, e in self.cache.items()
+            }
+        return {'hits': self.hits, 'misses': self.misses, 'refreshes': self.refreshes,
+                'failures': self.failures, 'sources': entries}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_shared_resolver(**kwargs):
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = StreamResolver(**kwargs)
+        return _shared
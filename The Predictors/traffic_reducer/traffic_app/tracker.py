@@ -0,0 +1,208 @@
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """IoU between every box of `a` (N, 4) and `b` (M, 4), xyxy format -> (N, M)."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class RollingWindow:
+    """
+    Ring of (timestamp, value) events; old events fall off the window.
+    `capacity` is only the starting size: when the slot about to be reused still
+    holds an event newer than `window_seconds`, the ring doubles instead of
+    overwriting it, so counts are never capped (memory follows the peak rate).
+    """
+    def __init__(self, window_seconds=60, capacity=512):
+        self.window_seconds = window_seconds
+        self.times = np.full(capacity, -np.inf)
+        self.values = np.zeros(capacity)
+        self.pos = 0
+
+    def push(self, t, value=1.0):
+        if self.times[self.pos] >= t - self.window_seconds:
+            self._grow()
+        self.times[self.pos] = t
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.times)
+
+    def _grow(self):
+        # Unroll the ring oldest-first, then append the free half
+        n = len(self.times)
+        self.times = np.concatenate([self.times[self.pos:], self.times[:self.pos], np.full(n, -np.inf)])
+        self.values = np.concatenate([self.values[self.pos:], self.values[:self.pos], np.zeros(n)])
+        self.pos = n
+
+    def stats(self, since):
+        """(count, mean value) of the events newer than `since`."""
+        recent = self.times >= since
+        count = int(np.count_nonzero(recent))
+        return count, float(self.values[recent].mean()) if count else 0.0
+
+
+class VehicleTracker:
+    """
+    IoU tracker with persistent IDs plus per-approach flow metrics.
+    All track state lives in parallel NumPy arrays (one row per track).
+
+    Per approach (zone label 1..n, 0 = outside every zone):
+      vehicles_per_min -> confirmed tracks entering the zone in the last window
+      queue_length     -> confirmed tracks in the zone that are (almost) stopped
+      avg_dwell_s      -> mean time spent in the zone by tracks that left it
+
+    - min_hits: detections needed before a track counts (filters flicker)
+    - max_missed: frames a track survives without a matching detection
+    - stop_speed: px/frame under which a vehicle is considered queued
+    - capacity: initial events per rolling window (grows as needed, no rate cap)
+    """
+    def __init__(self, zone_names, iou_threshold=0.3, max_missed=15, min_hits=3,
+                 window_seconds=60, stop_speed=2.0, capacity=512):
+        self.zone_names = list(zone_names)
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.min_hits = min_hits
+        self.window_seconds = window_seconds
+        self.stop_speed = stop_speed
+        self.next_id = 1
+
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4))
+        self.hits = np.zeros(0, dtype=np.int32)
+        self.missed = np.zeros(0, dtype=np.int32)
+        self.zone = np.zeros(0, dtype=np.uint8)      # Current zone label
+        self.entered = np.zeros(0, dtype=np.uint8)   # Zone whose entry was already counted
+        self.zone_since = np.zeros(0)                 # When the track entered its zone
+        self.last_seen = np.zeros(0)
+        self.speed = np.zeros(0)                      # EMA of center displacement (px/frame)
+
+        n = len(self.zone_names) + 1
+        self.entries = [RollingWindow(window_seconds, capacity) for _ in range(n)]
+        self.dwells = [RollingWindow(window_seconds, capacity) for _ in range(n)]
+
+    def _match(self, boxes):
+        """Greedy IoU matching -> (track_idx, det_idx) arrays."""
+        iou = iou_matrix(self.boxes, boxes)
+        if iou.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        rows, cols = np.nonzero(iou >= self.iou_threshold)
+        order = np.argsort(-iou[rows, cols])
+        used_t, used_d = set(), set()
+        matched_t, matched_d = [], []
+        for t, d in zip(rows[order], cols[order]):
+            if t in used_t or d in used_d:
+                continue
+            used_t.add(t)
+            used_d.add(d)
+            matched_t.append(t)
+            matched_d.append(d)
+        return np.array(matched_t, dtype=np.int64), np.array(matched_d, dtype=np.int64)
+
+    def _leave(self, idx, times):
+        """Record a dwell for counted tracks leaving their zone (`times`: exit time per idx)."""
+        for i, t in zip(idx, times):
+            z = self.zone[i]
+            if z and self.entered[i] == z:
+                self.dwells[z].push(t, t - self.zone_since[i])
+
+    def update(self, boxes, labels, now):
+        """
+        boxes: (N, 4) xyxy of this frame's detections, labels: (N,) zone label per box.
+        Returns the (N,) track id of every detection.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        labels = np.asarray(labels, dtype=np.uint8)
+        track_idx, det_idx = self._match(boxes)
+
+        # Matched tracks: move, update speed and zone
+        if len(track_idx):
+            old_c = (self.boxes[track_idx, :2] + self.boxes[track_idx, 2:]) / 2
+            new_c = (boxes[det_idx, :2] + boxes[det_idx, 2:]) / 2
+            step = np.hypot(*(new_c - old_c).T)
+            self.speed[track_idx] = np.where(self.hits[track_idx] > 1, 0.7 * self.speed[track_idx] + 0.3 * step, step)
+            self.boxes[track_idx] = boxes[det_idx]
+            self.hits[track_idx] += 1
+            self.missed[track_idx] = 0
+            self.last_seen[track_idx] = now
+
+            new_zone = labels[det_idx]
+            changed = track_idx[new_zone != self.zone[track_idx]]
+            self._leave(changed, np.full(len(changed), now))
+            self.zone_since[changed] = now
+            self.zone[track_idx] = new_zone
+
+        # Unmatched tracks age; dead ones are dropped
+        unmatched = np.ones(len(self.ids), dtype=bool)
+        unmatched[track_idx] = False
+        self.missed[unmatched] += 1
+        dead = self.missed > self.max_missed
+        if dead.any():
+            dead_idx = np.nonzero(dead)[0]
+            self._leave(dead_idx, self.last_seen[dead_idx])
+            keep = ~dead
+            for name in ('ids', 'boxes', 'hits', 'missed', 'zone', 'entered', 'zone_since', 'last_seen', 'speed'):
+                setattr(self, name, getattr(self, name)[keep])
+            # Indices shifted: remap the matched rows
+            remap = np.cumsum(keep) - 1
+            track_idx = remap[track_idx]
+
+        # Unmatched detections start new tracks
+        det_ids = np.zeros(len(boxes), dtype=np.int64)
+        new = np.ones(len(boxes), dtype=bool)
+        new[det_idx] = False
+        n_new = int(new.sum())
+        if n_new:
+            new_ids = np.arange(self.next_id, self.next_id + n_new)
+            self.next_id += n_new
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.boxes = np.concatenate([self.boxes, boxes[new]])
+            self.hits = np.concatenate([self.hits, np.ones(n_new, dtype=np.int32)])
+            self.missed = np.concatenate([self.missed, np.zeros(n_new, dtype=np.int32)])
+            self.zone = np.concatenate([self.zone, labels[new]])
+            self.entered = np.concatenate([self.entered, np.zeros(n_new, dtype=np.uint8)])
+            self.zone_since = np.concatenate([self.zone_since, np.full(n_new, now)])
+            self.last_seen = np.concatenate([self.last_seen, np.full(n_new, now)])
+            self.speed = np.concatenate([self.speed, np.zeros(n_new)])
+            det_ids[new] = new_ids
+        det_ids[det_idx] = self.ids[track_idx]
+
+        # Count an entry once a track is confirmed inside a zone
+        confirmed = self.hits >= self.min_hits
+        entering = np.nonzero(confirmed & (self.zone > 0) & (self.entered != self.zone))[0]
+        for i in entering:
+            self.entries[self.zone[i]].push(now)
+        self.entered[entering] = self.zone[entering]
+
+        return det_ids
+
+    def flow(self, now):
+        """Stable per-approach metrics: {zone: {vehicles, vehicles_per_min, queue_length, avg_dwell_s}}."""
+        since = now - self.window_seconds
+        active = (self.hits >= self.min_hits) & (self.missed == 0)
+        stopped = active & (self.speed < self.stop_speed)
+        in_zone = np.bincount(self.zone[active], minlength=len(self.zone_names) + 1)
+        queued = np.bincount(self.zone[stopped], minlength=len(self.zone_names) + 1)
+
+        metrics = {}
+        for label, name in enumerate(self.zone_names, start=1):
+            entries, _ = self.entries[label].stats(since)
+            dwell_count, dwell_mean = self.dwells[label].stats(since)
+            metrics[name] = {
+                'vehicles': int(in_zone[label]),
+                'vehicles_per_min': round(entries * 60.0 / self.window_seconds, 1),
+                'queue_length': int(queued[label]),
+                'avg_dwell_s': round(dwell_mean, 1) if dwell_count else None
+            }
+        return metrics
+
+    def active_tracks(self):
+        return int(np.count_nonzero(self.missed == 0))
@@ -1,96 +1,161 @@
-
 import os
 # Set environment variables BEFORE cv2 usage to suppress logs
 os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = 'loglevel;quiet|timeout;20000|rtsp_transport;tcp'
 os.environ['OPENCV_LOG_LEVEL'] = 'OFF'
 
 import cv2
-import yt_dlp
-from ultralytics import YOLO
 import threading
 import time
 import numpy as np
 
-class TrafficCamera:
-    def __init__(self, youtube_url, model_path='yolov8n.pt'):
-        self.youtube_url = youtube_url
-        self.model = YOLO(model_path)
-        self.video_url = None
-        self.cap = None
-        self.lock = threading.Lock()
-        
-        # Shared state for traffic counts
-        self.traffic_state = {
-            'norte': 0, 'sur': 0, 'este': 0, 'oeste': 0,
-            'frame': None
-        }
-        
-        self.zones = {
-            # Norte: Width reduced by half, Left Edge kept intact (0.0 -> 0.12, 0.25 -> 0.40)
-            'norte': np.array([[0.00, 0.00], [0.12, 0.00], [0.40, 0.50], [0.25, 0.50]]),
-            
-            # Sur: Pushed down significantly (0.75) to make room
-            'sur':   np.array([[0.35, 0.75], [0.90, 0.75], [0.90, 1.0], [0.30, 1.0]]),
-            
-            # Este: Moved down (Starts 0.40) to align with new pattern
-            'este':  np.array([[0.65, 0.40], [1.0, 0.40], [1.0, 0.70], [0.65, 0.70]]),
-            
-            # Oeste: Moved down (Starts 0.55) to avoid Norte overlap
-            'oeste': np.array([[0.0, 0.55], [0.25, 0.55], [0.25, 0.85], [0.0, 0.85]])
-        }
-        
-        self.current_phase = "INIT" # Store current light phase
+try:
+    from .detector import get_shared_detector
+    from .tracker import VehicleTracker
+    from .stream_resolver import get_shared_resolver
+except ImportError:
+    from detector import get_shared_detector
+    from tracker import VehicleTracker
+    from stream_resolver import get_shared_resolver
 
-        self.running = False
-        self.thread = threading.Thread(target=self._process_stream)
-        self.thread.daemon = True
 
-    def set_phase(self, phase_id):
-        # 0=NS Green, 1=EW Green (simplified mapping based on typical model output)
-        if phase_id == 0:
-            self.current_phase = "NS: GREEN | EW: RED"
-        elif phase_id == 1:
-            self.current_phase = "NS: RED | EW: GREEN"
-        else:
-            self.current_phase = f"PHASE: {phase_id}"
+class FrameSlot:
+    """
+    Single-slot mailbox between two stages.
+    The producer always overwrites the slot, so the consumer gets the newest
+    frame and never works through a backlog of stale ones.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.seq = 0
+        self.consumed_seq = 0
+        self.overwritten = 0  # Frames replaced before the consumer took them
 
-    def _get_stream_url(self):
-        # Force HLS (m3u8) and IPv4 for stability
-        ydl_opts = {
-            'format': 'best[protocol^=m3u8]', 
-            'quiet': True,
-            'noplaylist': True,
-            'force_ipv4': True 
+    def put(self, item):
+        with self.cond:
+            if self.seq > self.consumed_seq:
+                self.overwritten += 1
+            self.item = item
+            self.seq += 1
+            self.cond.notify_all()
+
+    def get_newer(self, after_seq, timeout=1.0):
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > after_seq, timeout=timeout)
+            if self.seq <= after_seq:
+                return after_seq, None
+            self.consumed_seq = self.seq
+            return self.seq, self.item
+
+    def depth(self):
+        with self.cond:
+            return 1 if self.seq > self.consumed_seq else 0
+
+
+class StageStats:
+    """Moving-average latency and throughput for one pipeline stage."""
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.count = 0
+        self.latency_ms = 0.0
+        self.fps = 0.0
+        self.last_time = None
+
+    def record(self, seconds):
+        now = time.time()
+        ms = seconds * 1000
+        self.latency_ms = ms if self.count == 0 else (1 - self.alpha) * self.latency_ms + self.alpha * ms
+        if self.last_time is not None and now > self.last_time:
+            inst_fps = 1.0 / (now - self.last_time)
+            self.fps = inst_fps if self.count == 1 else (1 - self.alpha) * self.fps + self.alpha * inst_fps
+        self.last_time = now
+        self.count += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'latency_ms': round(self.latency_ms, 1),
+            'fps': round(self.fps, 1)
         }
+
+
+DEFAULT_ZONES = {
+    # Norte: Width reduced by half, Left Edge kept intact (0.0 -> 0.12, 0.25 -> 0.40)
+    'norte': [[0.00, 0.00], [0.12, 0.00], [0.40, 0.50], [0.25, 0.50]],
+
+    # Sur: Pushed down significantly (0.75) to make room
+    'sur':   [[0.35, 0.75], [0.90, 0.75], [0.90, 1.0], [0.30, 1.0]],
+
+    # Este: Moved down (Starts 0.40) to align with new pattern
+    'este':  [[0.65, 0.40], [1.0, 0.40], [1.0, 0.70], [0.65, 0.70]],
+
+    # Oeste: Moved down (Starts 0.55) to avoid Norte overlap
+    'oeste': [[0.0, 0.55], [0.25, 0.55], [0.25, 0.85], [0.0, 0.85]]
+}
+
+
+class TrafficCamera:
+    """
+    One intersection: its own source, zones and phase state.
+    `source` is a YouTube URL, an HLS/RTSP URL or a local video file (looped, for
+    offline load tests); it is turned into an openable URL by the shared StreamResolver.
+    YOLO runs on a detector shared by every intersection (see detector.py).
+
+    Staged pipeline:
+      capture thread  -> keeps only the latest HLS frame (no buffered lag)
+      detection thread -> resize + YOLO + zone counts on the newest frame
+      encoder (on demand) -> draws overlays and JPEG-encodes once per detection,
+                             only when someone asks for a frame
+    """
+    def __init__(self, source, model_path='yolov8n.pt', detector=None, zones=None, name='principal', resolver=None):
+        self.name = name
+        self.source = source
+        self.is_file = os.path.isfile(source)
+        self.detector = detector or get_shared_detector(model_path)
+        self.resolver = resolver or get_shared_resolver()
         self.video_url = None
         self.cap = None
         self.lock = threading.Lock()
-        
+
         # Shared state for traffic counts
         self.traffic_state = {
             'norte': 0, 'sur': 0, 'este': 0, 'oeste': 0,
             'frame': None
         }
-        
-        self.zones = {
-            # Norte: Even wider to West (0.15) and deeper South (0.50)
-            'norte': np.array([[0.15, 0.00], [0.65, 0.00], [0.60, 0.50], [0.25, 0.50]]),
-            
-            # Sur: Pushed down significantly (0.75) to make room
-            'sur':   np.array([[0.35, 0.75], [0.90, 0.75], [0.90, 1.0], [0.30, 1.0]]),
-            
-            # Este: Moved down (Starts 0.40) to align with new pattern
-            'este':  np.array([[0.65, 0.40], [1.0, 0.40], [1.0, 0.70], [0.65, 0.70]]),
-            
-            # Oeste: Moved down (Starts 0.55) to avoid Norte overlap
-            'oeste': np.array([[0.0, 0.55], [0.25, 0.55], [0.25, 0.85], [0.0, 0.85]])
-        }
-        
+
+        self.zones = {name: np.array(poly, dtype=np.float64) for name, poly in (zones or DEFAULT_ZONES).items()}
+
+        # Rasterized zones: label mask rebuilt only when zones or frame size change
+        self.zone_names = list(self.zones)
+        self.zones_version = 0
+        self.zone_mask = None
+        self.zone_mask_key = None  # (w, h, zones_version)
+        self.zone_pixels = {}      # {zone_name: polygon in pixels} for drawing
+
+        # Persistent track IDs -> stable per-approach flow (vehicles/min, queue, dwell)
+        self.tracker = VehicleTracker(self.zone_names)
+        self.flow = self.tracker.flow(time.time())
+
         self.current_phase = "INIT" # Store current light phase
 
+        # Stage hand-off
+        self.capture_slot = FrameSlot()        # (frame, captured_at)
+        self.detection_cond = threading.Condition(self.lock)
+        self.detection = None                  # Latest detection result (see _detect)
+        self.encode_lock = threading.Lock()
+        self.encoded_seq = 0
+
+        # Per-stage stats
+        self.stats = {
+            'capture': StageStats(),
+            'detection': StageStats(),
+            'tracking': StageStats(),
+            'encode': StageStats()
+        }
+
         self.running = False
-        self.thread = threading.Thread(target=self._process_stream)
-        self.thread.daemon = True
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.detection_thread = threading.Thread(target=self._detection_loop, daemon=True)
 
     def set_phase(self, phase_id):
         # 0=NS Green, 1=EW Green (simplified mapping based on typical model output)
@@ -101,29 +166,58 @@ class TrafficCamera:
         else:
             self.current_phase = f"PHASE: {phase_id}"
 
+    def set_zones(self, zones):
+        """Replace the approach zones (normalized polygons). Invalidates the mask."""
+        with self.lock:
+            self.zones = {name: np.asarray(poly, dtype=np.float64) for name, poly in zones.items()}
+            self.zone_names = list(self.zones)
+            self.zones_version += 1
+            self.tracker = VehicleTracker(self.zone_names)
+
+    def _get_zone_mask(self, w, h):
+        """
+        Label mask of the frame: 0 = no zone, i+1 = self.zone_names[i].
+        Rasterized once per (resolution, zones) instead of a pointPolygonTest
+        per box and zone on every frame.
+        """
+        key = (w, h, self.zones_version)
+        if self.zone_mask_key != key:
+            mask = np.zeros((h, w), dtype=np.uint8)
+            pixels = {}
+            # Paint in reverse so the first zone wins where polygons overlap,
+            # like the old "first match + break" loop
+            for label in range(len(self.zone_names), 0, -1):
+                name = self.zone_names[label - 1]
+                pts = (self.zones[name] * [w, h]).astype(np.int32)
+                pixels[name] = pts
+                cv2.fillPoly(mask, [pts], label)
+                # fillPoly leaves out part of the boundary that pointPolygonTest counted as inside
+                cv2.polylines(mask, [pts], True, label, 1)
+            self.zone_mask = mask
+            self.zone_pixels = {name: pixels[name] for name in self.zone_names}
+            self.zone_mask_key = key
+        return self.zone_mask
+
     def start(self):
         self.running = True
-        self.thread.start()
+        self.capture_thread.start()
+        self.detection_thread.start()
+
+    def stop(self):
+        self.running = False
+        with self.capture_slot.cond:
+            self.capture_slot.cond.notify_all()
 
     def _get_stream_url(self):
-        # Force HLS (m3u8) which is much friendlier to OpenCV than DASH
-        ydl_opts = {
-            'format': 'best[protocol^=m3u8]', 
-            'quiet': True,
-            'noplaylist': True
-        }
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.youtube_url, download=False)
-                # print(f"Format Found: {info.get('format_id')}")
-                return info['url']
-        except Exception as e:
-            print(f"yt-dlp error: {e}")
-            return None
-
-    def _process_stream(self):
-        print("Initializing Traffic Camera Stream...")
-        
+        # Cached: yt-dlp only runs again when the URL expires or stops working
+        return self.resolver.get(self.source)
+
+    # --- Stage 1: capture ---
+
+    def _capture_loop(self):
+        print(f"[{self.name}] Initializing Traffic Camera Stream...")
+        frame_interval = 0
+
         # Limit FFMPEG verbosity and optimize for HLS stream stability
         # 'loglevel;quiet' hides errors, but 'timeout;20000' keeps connection alive longer
         os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = 'loglevel;quiet|timeout;20000|rtsp_transport;tcp'
@@ -135,92 +229,208 @@ class TrafficCamera:
                 if stream_url:
                     # Generic CAP_ANY or CAP_FFMPEG
                     self.cap = cv2.VideoCapture(stream_url, cv2.CAP_FFMPEG)
-                
+
                 if not self.cap or not self.cap.isOpened():
-                    print("Connection failed. Retrying in 5s...")
+                    if stream_url:
+                        self.resolver.invalidate(self.source) # Probably an expired URL
+                    print(f"[{self.name}] Connection failed. Retrying in 5s...")
                     time.sleep(5)
                     continue
                 else:
-                    print("Stream Connected.")
+                    print(f"[{self.name}] Stream Connected.")
+                    if self.is_file:
+                        # Play files at their own speed, like a live camera
+                        fps = self.cap.get(cv2.CAP_PROP_FPS) or 25
+                        frame_interval = 1.0 / fps
 
+            start = time.time()
             success, frame = self.cap.read()
+            if not success and self.is_file:
+                # Loop the file
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                success, frame = self.cap.read()
             if not success:
-                print("Read failed (Stream ended or lost). Reconnecting...")
+                print(f"[{self.name}] Read failed (Stream ended or lost). Reconnecting...")
+                if not self.is_file:
+                    self.resolver.invalidate(self.source)
                 self.cap.release()
                 self.cap = None
                 time.sleep(1) # Brief pause before retry
                 continue
 
-            # Resize frame
-            frame = cv2.resize(frame, (854, 480)) # 480p is good balance
-            h, w, _ = frame.shape
-
-            # Run YOLO
-            results = self.model(frame, verbose=False, classes=[2, 3, 5, 7]) # car, motorcycle, bus, truck
-
-            counts = {'norte': 0, 'sur': 0, 'este': 0, 'oeste': 0}
-            
-            # Draw Zones
-            for zone_name, poly in self.zones.items():
-                pts = (poly * [w, h]).astype(np.int32)
-                color = (0, 255, 255) # Yellow default
-                # simple logic: highlight zone if it has active green light? 
-                # (omitted for now to keep simple)
-                cv2.polylines(frame, [pts], True, color, 1)
-                
-                # Label Zones
-                M = cv2.moments(pts)
-                if M['m00'] != 0:
-                    cx = int(M['m10'] / M['m00']) - 20
-                    cy = int(M['m01'] / M['m00'])
-                    cv2.putText(frame, zone_name.upper(), (cx, cy), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-
-            # Process Detections
-            for r in results:
-                boxes = r.boxes
-                for box in boxes:
-                    # Bounding Box
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    cx, cy = int((x1+x2)/2), int((y1+y2)/2)
-                    
-                    # Draw car center
-                    cv2.circle(frame, (cx, cy), 3, (0, 0, 255), -1)
-
-                    # Check which zone
-                    for zone_name, poly in self.zones.items():
-                        if cv2.pointPolygonTest((poly * [w, h]).astype(np.int32), (cx, cy), False) >= 0:
-                            counts[zone_name] += 1
-                            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
-                            break
-            
-            # Draw Counts on Frame
-            cv2.putText(frame, f"N:{counts['norte']} S:{counts['sur']} E:{counts['este']} W:{counts['oeste']}", 
-                        (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            # Draw AI Decision (Phase)
-            cv2.putText(frame, f"AI DECISION: {self.current_phase}", 
-                        (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 165, 255), 2)
+            self.stats['capture'].record(time.time() - start)
+            # Always overwrite: the detector only ever sees the live frame
+            self.capture_slot.put((frame, time.time()))
 
+            if frame_interval:
+                time.sleep(max(0.0, frame_interval - (time.time() - start)))
+
+    # --- Stage 2: detection ---
+
+    def _detection_loop(self):
+        last_seq = 0
+        while self.running:
+            seq, item = self.capture_slot.get_newer(last_seq, timeout=1.0)
+            if item is None:
+                continue
+            last_seq = seq
+
+            frame, captured_at = item
+            start = time.time()
+            try:
+                detection = self._detect(seq, frame, captured_at)
+            except Exception as e:
+                print(f"[{self.name}] Detection error: {e}")
+                continue
+            self.stats['detection'].record(time.time() - start)
+
+            counts = detection['counts']
             # Print to Terminal (User Request)
-            print(f"[DETECTED] N:{counts['norte']} S:{counts['sur']} E:{counts['este']} W:{counts['oeste']} | Phase: {self.current_phase}")
+            print(f"[DETECTED][{self.name}] N:{counts.get('norte', 0)} S:{counts.get('sur', 0)} E:{counts.get('este', 0)} W:{counts.get('oeste', 0)} | Phase: {self.current_phase}")
 
             # Update State
-            with self.lock:
+            with self.detection_cond:
                 # User requested REAL detection counts (1 detected = 1 count)
-                SCALE_FACTOR = 1 
-                
+                SCALE_FACTOR = 1
+
                 scaled_counts = {k: v * SCALE_FACTOR for k, v in counts.items()}
                 self.traffic_state.update(scaled_counts)
-                
-                _, buffer = cv2.imencode('.jpg', frame)
-                self.traffic_state['frame'] = buffer.tobytes()
+                self.flow = detection['flow']
+                self.detection = detection
+                self.detection_cond.notify_all()
 
-            # Limit FPS to save CPU
-            # time.sleep(0.1)
+    def _detect(self, seq, frame, captured_at):
+        # Resize frame
+        frame = cv2.resize(frame, (854, 480)) # 480p is good balance
+        h, w, _ = frame.shape
+
+        # Run YOLO
+        results = self.detector.detect(self.name, frame) # car, motorcycle, bus, truck
+        if results is None:
+            raise RuntimeError("no detector result")
 
-    def get_frame(self):
         with self.lock:
-            return self.traffic_state['frame']
+            mask = self._get_zone_mask(w, h)
+            zone_names = self.zone_names
+            zone_pixels = self.zone_pixels
+            tracker = self.tracker
+
+        # All boxes at once: (N, 4) float array
+        xyxy = np.concatenate([r.boxes.xyxy.cpu().numpy() for r in results]) if results else np.empty((0, 4))
+        xyxy = xyxy.reshape(-1, 4)
+        boxes = xyxy.astype(np.int32)
+        centers = np.empty((len(xyxy), 2), dtype=np.int32)
+        centers[:, 0] = (xyxy[:, 0] + xyxy[:, 2]) / 2
+        centers[:, 1] = (xyxy[:, 1] + xyxy[:, 3]) / 2
+
+        # Zone membership for every center with one fancy-index lookup
+        cx = np.clip(centers[:, 0], 0, w - 1)
+        cy = np.clip(centers[:, 1], 0, h - 1)
+        labels = mask[cy, cx]
+
+        per_zone = np.bincount(labels, minlength=len(zone_names) + 1)
+        counts = {name: int(per_zone[i + 1]) for i, name in enumerate(zone_names)}
+
+        # Tracking: same boxes, persistent IDs and rolling flow metrics
+        track_start = time.time()
+        track_ids = tracker.update(xyxy, labels, track_start)
+        flow = tracker.flow(track_start)
+        self.stats['tracking'].record(time.time() - track_start)
+
+        return {
+            'seq': seq,
+            'frame': frame,
+            'boxes': boxes,
+            'centers': centers,
+            'labels': labels,
+            'track_ids': track_ids,
+            'flow': flow,
+            'zone_pixels': zone_pixels,
+            'counts': counts,
+            'captured_at': captured_at,
+            'detected_at': time.time()
+        }
+
+    # --- Stage 3: on-demand encoding ---
+
+    def _draw(self, frame, detection):
+        h, w, _ = frame.shape
+        counts = detection['counts']
+
+        # Draw Zones
+        for zone_name, pts in detection['zone_pixels'].items():
+            color = (0, 255, 255) # Yellow default
+            # simple logic: highlight zone if it has active green light?
+            # (omitted for now to keep simple)
+            cv2.polylines(frame, [pts], True, color, 1)
+
+            # Label Zones
+            M = cv2.moments(pts)
+            if M['m00'] != 0:
+                cx = int(M['m10'] / M['m00']) - 20
+                cy = int(M['m01'] / M['m00'])
+                cv2.putText(frame, zone_name.upper(), (cx, cy), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+        for (x1, y1, x2, y2), (cx, cy), label, track_id in zip(detection['boxes'], detection['centers'],
+                                                              detection['labels'], detection['track_ids']):
+            # Draw car center
+            cv2.circle(frame, (int(cx), int(cy)), 3, (0, 0, 255), -1)
+            if label:
+                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
+                cv2.putText(frame, f"#{track_id}", (int(x1), int(y1) - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+
+        # Draw Counts on Frame
+        cv2.putText(frame, f"N:{counts.get('norte', 0)} S:{counts.get('sur', 0)} E:{counts.get('este', 0)} W:{counts.get('oeste', 0)}",
+                    (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+        # Draw AI Decision (Phase)
+        cv2.putText(frame, f"AI DECISION: {self.current_phase}",
+                    (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 165, 255), 2)
+
+    def _encode_latest(self):
+        # Only one encode per detection, however many viewers ask
+        with self.encode_lock:
+            with self.lock:
+                detection = self.detection
+            if detection is None:
+                return 0, None
+            if detection['seq'] == self.encoded_seq:
+                return self.encoded_seq, self.traffic_state['frame']
+
+            start = time.time()
+            # The detection frame is private to this result, safe to draw on
+            self._draw(detection['frame'], detection)
+            _, buffer = cv2.imencode('.jpg', detection['frame'])
+            frame_bytes = buffer.tobytes()
+            self.stats['encode'].record(time.time() - start)
+
+            with self.lock:
+                self.traffic_state['frame'] = frame_bytes
+            self.encoded_seq = detection['seq']
+            return self.encoded_seq, frame_bytes
+
+    def get_frame(self):
+        return self._encode_latest()[1]
+
+    def wait_for_frame(self, after_seq, timeout=1.0):
+        """Blocks until a detection newer than `after_seq` exists; returns (seq, jpeg)."""
+        with self.detection_cond:
+            self.detection_cond.wait_for(
+                lambda: self.detection is not None and self.detection['seq'] > after_seq,
+                timeout=timeout
+            )
+        return self._encode_latest()
+
+    def wait_for_flow(self, after_seq, timeout=1.0):
+        """Blocks until a detection newer than `after_seq` exists; returns (seq, flow)."""
+        with self.detection_cond:
+            self.detection_cond.wait_for(
+                lambda: self.detection is not None and self.detection['seq'] > after_seq,
+                timeout=timeout
+            )
+            if self.detection is None:
+                return after_seq, self.flow
+            return self.detection['seq'], self.flow
 
     def get_counts(self):
         with self.lock:
@@ -230,3 +440,22 @@ class TrafficCamera:
                 'este': self.traffic_state['este'],
                 'oeste': self.traffic_state['oeste']
             }
+
+    def get_flow(self):
+        """Per-approach {vehicles, vehicles_per_min, queue_length, avg_dwell_s} from the tracker."""
+        with self.lock:
+            return self.flow
+
+    def get_stats(self):
+        with self.lock:
+            detection = self.detection
+        now = time.time()
+        stats = {name: s.as_dict() for name, s in self.stats.items()}
+        stats['capture']['dropped'] = self.capture_slot.overwritten
+        stats['detection']['queue_depth'] = self.capture_slot.depth()
+        if detection is not None:
+            # How old the scene behind the current counts is
+            stats['detection']['frame_age_ms'] = round((now - detection['captured_at']) * 1000, 1)
+        stats['encode']['last_seq'] = self.encoded_seq
+        stats['tracking']['active_tracks'] = self.tracker.active_tracks()
+        return stats